@@ -13,23 +13,39 @@ import sys
 from pathlib import Path
 
 base_package_path = Path(__file__).parent
-print(f"adding base_package_path: {base_package_path} : to sys.path")
 sys.path.insert(0, str(base_package_path))  # add parent directory to sys.path
 
-from skellycam.system.environment.default_paths import get_log_file_path
-from skellycam.system.log_config.logsetup import configure_logging
+# Everything below is imported on first use (PEP 562), so that `import skellycam` stays cheap - a headless capture
+# script shouldn't pay for Qt, pyqtgraph, matplotlib, etc. Logging is configured by the entry points
+# (`skellycam.__main__`, `qt_gui_main`), not on import.
+_LAZY_IMPORTS = {
+    # core
+    "Camera": "skellycam.opencv.camera.camera",
+    "CameraConfig": "skellycam.opencv.camera.models.camera_config",
+    "CameraGroup": "skellycam.opencv.group.camera_group",
+    "VideoRecorder": "skellycam.opencv.video_recorder.video_recorder",
+    "save_synchronized_videos": "skellycam.opencv.video_recorder.save_synchronized_videos",
+    "detect_cameras": "skellycam.detection.detect_cameras",
+    # gui
+    "SkellyCamParameterTreeWidget": "skellycam.gui.qt.widgets.skelly_cam_config_parameter_tree_widget",
+    "SkellyCamControllerWidget": "skellycam.gui.qt.widgets.skelly_cam_controller_widget",
+    "SkellyCamWidget": "skellycam.gui.qt.skelly_cam_widget",
+    "SkellyCamDirectoryViewWidget": "skellycam.gui.qt.widgets.skelly_cam_directory_view_widget",
+}
 
-configure_logging(log_file_path=get_log_file_path())
+__all__ = list(_LAZY_IMPORTS.keys())
 
-import logging
 
-logger = logging.getLogger(__name__)
-logger.info(f"Initializing {__package_name__} package, version: {__version__}, from file: {__file__}")
+def __getattr__(name: str):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-from skellycam.opencv.camera.camera import Camera
-from skellycam.opencv.camera.models.camera_config import CameraConfig
+    import importlib
 
-from skellycam.gui.qt.widgets.skelly_cam_config_parameter_tree_widget import SkellyCamParameterTreeWidget
-from skellycam.gui.qt.widgets.skelly_cam_controller_widget import SkellyCamControllerWidget
-from skellycam.gui.qt.skelly_cam_widget import SkellyCamWidget
-from skellycam.gui.qt.widgets.skelly_cam_directory_view_widget import SkellyCamDirectoryViewWidget
+    value = getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    globals()[name] = value  # only pay for the lookup once
+    return value
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + __all__)
@@ -8,11 +8,26 @@ import argparse
 
 def parse_args():
     parser = argparse.ArgumentParser(description="SkellyCam")
+    subparsers = parser.add_subparsers(dest="command")
+
+    from skellycam.cli.record_command import add_record_command_arguments
+
+    record_parser = subparsers.add_parser(
+        "record",
+        help="record without the GUI, for a duration or until SIGINT/SIGTERM, then print a JSON summary",
+    )
+    add_record_command_arguments(record_parser)
     return parser.parse_args()
 
 def run():
-    parse_args()
-    
+    args = parse_args()
+
+    # the Qt imports stay below this branch, so `skellycam record` never loads them
+    if args.command == "record":
+        from skellycam.cli.record_command import run_record_command
+
+        sys.exit(run_record_command(args))
+
     try:
         from skellycam.gui.qt.main import qt_gui_main
     except Exception as e:
@@ -26,7 +41,7 @@ def run():
 
 
 if __name__ == "__main__":
-    print(f"Running `skellycam.__main__` from - {__file__}")
+    print(f"Running `skellycam.__main__` from - {__file__}", file=sys.stderr)
 
     if platform.system() == "Windows":
         # set up so you can change the taskbar icon - https://stackoverflow.com/a/74531530/14662833
@@ -0,0 +1,355 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+import psutil
+from pydantic import BaseModel
+
+from skellycam.cli.recording_statistics import CameraRecordingStatistics, RecordingStatisticsTracker
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.group.strategies.strategies import Strategy
+from skellycam.opencv.sources.replay_video_capture import create_replay_camera_ids
+from skellycam.opencv.sources.synthetic_video_capture import create_synthetic_camera_ids
+from skellycam.system.environment.default_paths import (
+    LOGS_INFO_AND_SETTINGS_FOLDER_NAME,
+    get_default_skellycam_base_folder_path,
+    get_iso6201_time_string,
+)
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_NAMES = {
+    "process": Strategy.X_CAM_PER_PROCESS,
+    "same-process": Strategy.SAME_PROCESS,
+}
+
+# a trial "sustains" its load if every camera keeps up with its target framerate without losing frames
+MINIMUM_THROUGHPUT_RATIO = 0.95
+MAXIMUM_DROP_RATE = 0.01
+WARMUP_SECONDS = 1.0
+
+
+class CapacityTrialConfig(BaseModel):
+    number_of_cameras: int
+    resolution_width: int
+    resolution_height: int
+    framerate: int
+    strategy: str  # a key of `STRATEGY_NAMES`
+    cameras_per_process: Optional[int] = None  # `process` strategy only
+    replay_folder_path: Optional[str] = None  # replay a recording instead of synthetic cameras
+
+    @property
+    def resolution_key(self) -> str:
+        return f"{self.resolution_width}x{self.resolution_height}"
+
+
+class ProcessCpuUsage(BaseModel):
+    pid: int
+    name: str
+    cpu_percent: float  # of one core
+    rss_megabytes: float
+
+
+class CapacityTrialResult(BaseModel):
+    config: CapacityTrialConfig
+    sustained: bool = False
+    startup_duration_seconds: Optional[float] = None
+    minimum_frames_per_second: float = 0.0
+    mean_frames_per_second: float = 0.0
+    throughput_ratio: float = 0.0  # slowest camera's framerate / target framerate
+    drop_rate: float = 0.0  # frames lost between the capture threads and the consumer
+    mean_latency_ms: Optional[float] = None
+    p95_latency_ms: Optional[float] = None
+    total_cpu_percent: float = 0.0
+    process_cpu_usage: List[ProcessCpuUsage] = []
+    error: Optional[str] = None
+
+
+class CapacityRecommendation(BaseModel):
+    resolution: str
+    framerate: int
+    maximum_sustained_cameras: int
+    strategy: Optional[str] = None
+    cameras_per_process: Optional[int] = None
+    total_cpu_percent: Optional[float] = None
+
+
+class CapacityReport(BaseModel):
+    machine: Dict[str, str]
+    trial_duration_seconds: float
+    trials: List[CapacityTrialResult]
+    recommendations: List[CapacityRecommendation]
+
+
+def run_capacity_trial(trial_config: CapacityTrialConfig, duration_seconds: float) -> CapacityTrialResult:
+    """Run one configuration, pulling frames the way a consumer (GUI, recorder) would, and measure how it holds up"""
+    logger.info(f"Capacity trial: {trial_config}")
+    camera_config_dictionary = {
+        camera_id: CameraConfig(camera_id=camera_id,
+                                resolution_width=trial_config.resolution_width,
+                                resolution_height=trial_config.resolution_height,
+                                framerate=trial_config.framerate)
+        for camera_id in _create_trial_camera_ids(trial_config)
+    }
+    camera_group = CameraGroup(strategy=STRATEGY_NAMES[trial_config.strategy],
+                               camera_config_dictionary=camera_config_dictionary,
+                               cameras_per_process=trial_config.cameras_per_process)
+    try:
+        camera_group.start()
+        _consume_frames(camera_group, duration_seconds=WARMUP_SECONDS)
+
+        cpu_times_before = _get_cpu_times()
+        measurement_start_time = time.perf_counter()
+        camera_statistics_dictionary = _consume_frames(camera_group, duration_seconds=duration_seconds)
+        process_cpu_usage = _get_process_cpu_usage(cpu_times_before,
+                                                   elapsed_seconds=time.perf_counter() - measurement_start_time)
+    except Exception as e:
+        logger.exception(f"Capacity trial failed: {e}")
+        return CapacityTrialResult(config=trial_config, error=str(e))
+    finally:
+        camera_group.close()
+
+    return _create_trial_result(trial_config=trial_config,
+                                camera_statistics=list(camera_statistics_dictionary.values()),
+                                process_cpu_usage=process_cpu_usage,
+                                startup_duration_seconds=camera_group.startup_duration_seconds)
+
+
+def run_capacity_sweep(trial_configs: List[CapacityTrialConfig], duration_seconds: float) -> CapacityReport:
+    trial_results = []
+    for trial_config in trial_configs:
+        trial_result = run_capacity_trial(trial_config, duration_seconds=duration_seconds)
+        logger.info(f"{trial_config.number_of_cameras} x {trial_config.resolution_key} @ {trial_config.framerate} fps "
+                    f"({trial_config.strategy}, {trial_config.cameras_per_process} per process): "
+                    f"sustained={trial_result.sustained}, throughput={trial_result.throughput_ratio:.2f}, "
+                    f"drops={trial_result.drop_rate:.3f}, cpu={trial_result.total_cpu_percent:.0f}%")
+        trial_results.append(trial_result)
+
+    return CapacityReport(machine=_get_machine_description(),
+                          trial_duration_seconds=duration_seconds,
+                          trials=trial_results,
+                          recommendations=recommend_configurations(trial_results))
+
+
+def recommend_configurations(trial_results: List[CapacityTrialResult]) -> List[CapacityRecommendation]:
+    """
+    For each resolution/framerate: the most cameras any configuration sustained, and the cheapest (CPU-wise)
+    strategy/cameras-per-process that did it
+    """
+    results_by_mode: Dict[Tuple[str, int], List[CapacityTrialResult]] = {}
+    for trial_result in trial_results:
+        mode_key = (trial_result.config.resolution_key, trial_result.config.framerate)
+        results_by_mode.setdefault(mode_key, []).append(trial_result)
+
+    recommendations = []
+    for (resolution, framerate), mode_results in sorted(results_by_mode.items()):
+        sustained_results = [trial_result for trial_result in mode_results if trial_result.sustained]
+        if len(sustained_results) == 0:
+            recommendations.append(CapacityRecommendation(resolution=resolution,
+                                                          framerate=framerate,
+                                                          maximum_sustained_cameras=0))
+            continue
+
+        best_result = min(sustained_results,
+                          key=lambda trial_result: (-trial_result.config.number_of_cameras,
+                                                    trial_result.total_cpu_percent))
+        recommendations.append(CapacityRecommendation(resolution=resolution,
+                                                      framerate=framerate,
+                                                      maximum_sustained_cameras=best_result.config.number_of_cameras,
+                                                      strategy=best_result.config.strategy,
+                                                      cameras_per_process=best_result.config.cameras_per_process,
+                                                      total_cpu_percent=best_result.total_cpu_percent))
+    return recommendations
+
+
+def create_trial_configs(camera_counts: List[int],
+                         resolutions: List[Tuple[int, int]],
+                         framerates: List[int],
+                         strategies: List[str],
+                         cameras_per_process_options: List[int],
+                         replay_folder_path: str = None) -> List[CapacityTrialConfig]:
+    trial_configs = []
+    for resolution_width, resolution_height in resolutions:
+        for framerate in framerates:
+            for strategy in strategies:
+                for cameras_per_process in (cameras_per_process_options if strategy == "process" else [None]):
+                    for number_of_cameras in sorted(camera_counts):
+                        trial_configs.append(CapacityTrialConfig(number_of_cameras=number_of_cameras,
+                                                                 resolution_width=resolution_width,
+                                                                 resolution_height=resolution_height,
+                                                                 framerate=framerate,
+                                                                 strategy=strategy,
+                                                                 cameras_per_process=cameras_per_process,
+                                                                 replay_folder_path=replay_folder_path))
+    return trial_configs
+
+
+def save_capacity_report(capacity_report: CapacityReport, report_file_path: str = None) -> str:
+    if report_file_path is None:
+        report_file_path = str(Path(get_default_skellycam_base_folder_path())
+                               / LOGS_INFO_AND_SETTINGS_FOLDER_NAME
+                               / f"capacity_report_{get_iso6201_time_string()}.json")
+    Path(report_file_path).parent.mkdir(parents=True, exist_ok=True)
+    Path(report_file_path).write_text(capacity_report.model_dump_json(indent=4))
+    logger.info(f"Saved capacity report to {report_file_path}")
+    return report_file_path
+
+
+def _create_trial_camera_ids(trial_config: CapacityTrialConfig) -> List[str]:
+    if trial_config.replay_folder_path is None:
+        return create_synthetic_camera_ids(trial_config.number_of_cameras)
+
+    # replays run at their recorded resolution/framerate, and can't have more cameras than were recorded
+    camera_ids = create_replay_camera_ids(trial_config.replay_folder_path, loop=True)
+    if trial_config.number_of_cameras > len(camera_ids):
+        raise ValueError(f"{trial_config.replay_folder_path} only has {len(camera_ids)} cameras to replay")
+    return camera_ids[:trial_config.number_of_cameras]
+
+
+def _consume_frames(camera_group: CameraGroup, duration_seconds: float) -> Dict[str, CameraRecordingStatistics]:
+    statistics_tracker = RecordingStatisticsTracker(camera_group.camera_ids)
+    end_time = time.perf_counter() + duration_seconds
+    while time.perf_counter() < end_time:
+        received_any_frames = False
+        for frame_payload in camera_group.latest_frames().values():
+            if frame_payload is not None:
+                received_any_frames = True
+                statistics_tracker.add_frame(frame_payload)
+        if not received_any_frames:
+            time.sleep(0.001)
+    return statistics_tracker.get_interval_statistics()
+
+
+def _create_trial_result(trial_config: CapacityTrialConfig,
+                         camera_statistics: List[CameraRecordingStatistics],
+                         process_cpu_usage: List[ProcessCpuUsage],
+                         startup_duration_seconds: float) -> CapacityTrialResult:
+    frames_per_second = [statistics.frames_per_second for statistics in camera_statistics]
+    frames_received = sum(statistics.frames_received for statistics in camera_statistics)
+    frames_dropped = sum(statistics.frames_dropped for statistics in camera_statistics)
+    mean_latencies_ms = [statistics.mean_latency_ms for statistics in camera_statistics
+                         if statistics.mean_latency_ms is not None]
+    p95_latencies_ms = [statistics.p95_latency_ms for statistics in camera_statistics
+                        if statistics.p95_latency_ms is not None]
+
+    target_framerate = trial_config.framerate
+    if trial_config.replay_folder_path is not None:
+        target_framerate = _get_recorded_framerate(trial_config.replay_folder_path)
+
+    throughput_ratio = min(frames_per_second) / target_framerate if target_framerate > 0 else 0.0
+    drop_rate = frames_dropped / (frames_received + frames_dropped) if frames_received + frames_dropped > 0 else 0.0
+    return CapacityTrialResult(
+        config=trial_config,
+        sustained=throughput_ratio >= MINIMUM_THROUGHPUT_RATIO and drop_rate <= MAXIMUM_DROP_RATE,
+        startup_duration_seconds=startup_duration_seconds,
+        minimum_frames_per_second=min(frames_per_second),
+        mean_frames_per_second=float(np.mean(frames_per_second)),
+        throughput_ratio=throughput_ratio,
+        drop_rate=drop_rate,
+        mean_latency_ms=float(np.mean(mean_latencies_ms)) if len(mean_latencies_ms) > 0 else None,
+        p95_latency_ms=float(np.max(p95_latencies_ms)) if len(p95_latencies_ms) > 0 else None,
+        total_cpu_percent=sum(process.cpu_percent for process in process_cpu_usage),
+        process_cpu_usage=process_cpu_usage,
+    )
+
+
+def _get_recorded_framerate(replay_folder_path: str) -> float:
+    video_file_path = sorted(Path(replay_folder_path).glob("*.mp4"))[0]
+    video_capture = cv2.VideoCapture(str(video_file_path))
+    framerate = video_capture.get(cv2.CAP_PROP_FPS)
+    video_capture.release()
+    return framerate
+
+
+def _get_benchmarked_processes() -> List[psutil.Process]:
+    """This process and everything it started - capture processes, but also the queue managers and the forkserver"""
+    this_process = psutil.Process()
+    return [this_process] + this_process.children(recursive=True)
+
+
+def _get_cpu_times() -> Dict[int, float]:
+    cpu_times = {}
+    for process in _get_benchmarked_processes():
+        try:
+            process_cpu_times = process.cpu_times()
+            cpu_times[process.pid] = process_cpu_times.user + process_cpu_times.system
+        except psutil.Error:
+            pass
+    return cpu_times
+
+
+def _get_process_cpu_usage(cpu_times_before: Dict[int, float], elapsed_seconds: float) -> List[ProcessCpuUsage]:
+    process_cpu_usage = []
+    for process in _get_benchmarked_processes():
+        try:
+            process_cpu_times = process.cpu_times()
+            cpu_seconds = process_cpu_times.user + process_cpu_times.system - cpu_times_before.get(process.pid, 0.0)
+            process_cpu_usage.append(ProcessCpuUsage(
+                pid=process.pid,
+                name=" ".join(process.cmdline()) or process.name(),
+                cpu_percent=100 * cpu_seconds / elapsed_seconds,
+                rss_megabytes=process.memory_info().rss / 1e6,
+            ))
+        except psutil.Error:
+            pass
+    return process_cpu_usage
+
+
+def _get_machine_description() -> Dict[str, str]:
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "logical_cpu_count": str(os.cpu_count()),
+        "physical_cpu_count": str(psutil.cpu_count(logical=False)),
+        "memory_gigabytes": f"{psutil.virtual_memory().total / 1e9:.1f}",
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+    }
+
+
+def _parse_resolution(resolution_string: str) -> Tuple[int, int]:
+    resolution_width, resolution_height = resolution_string.lower().split("x")
+    return int(resolution_width), int(resolution_height)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Sweep camera count x resolution x framerate x strategy with synthetic (or replayed) cameras, "
+                    "and report what this machine can sustain"
+    )
+    parser.add_argument("--cameras", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--resolutions", nargs="+", default=["640x480", "1280x720"])
+    parser.add_argument("--framerates", type=int, nargs="+", default=[30])
+    parser.add_argument("--strategies", nargs="+", choices=list(STRATEGY_NAMES.keys()), default=["process"])
+    parser.add_argument("--cameras-per-process", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds measured per trial")
+    parser.add_argument("--replay-folder", default=None,
+                        help="replay this synchronized_videos folder instead of using synthetic cameras")
+    parser.add_argument("--report", default=None, help="where to write the JSON report")
+    args = parser.parse_args()
+
+    from skellycam.system.log_config.logsetup import configure_logging
+
+    configure_logging(console_log_level=logging.INFO)
+
+    capacity_report = run_capacity_sweep(
+        trial_configs=create_trial_configs(camera_counts=args.cameras,
+                                           resolutions=[_parse_resolution(resolution)
+                                                        for resolution in args.resolutions],
+                                           framerates=args.framerates,
+                                           strategies=args.strategies,
+                                           cameras_per_process_options=args.cameras_per_process,
+                                           replay_folder_path=args.replay_folder),
+        duration_seconds=args.duration,
+    )
+    report_file_path = save_capacity_report(capacity_report, report_file_path=args.report)
+    print(json.dumps([recommendation.model_dump() for recommendation in capacity_report.recommendations], indent=4))
+    print(f"Full report: {report_file_path}")
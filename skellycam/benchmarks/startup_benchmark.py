@@ -0,0 +1,129 @@
+import json
+import logging
+import multiprocessing
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# modules a headless capture script should never have to import
+HEAVY_MODULES = [
+    "PySide6",
+    "pyqtgraph",
+    "matplotlib",
+    "pandas",
+    "scipy",
+    "skellycam.detection.charuco.charuco_definition",
+]
+
+IMPORT_STATEMENTS: Dict[str, str] = {
+    "package": "import skellycam",
+    "core": "from skellycam import Camera, CameraConfig, CameraGroup, VideoRecorder, save_synchronized_videos",
+    "gui": "from skellycam import SkellyCamWidget",
+}
+
+_MEASURE_IMPORT_SCRIPT = """
+import json, sys, time
+start_time = time.perf_counter()
+{import_statement}
+elapsed_seconds = time.perf_counter() - start_time
+heavy_modules = {heavy_modules!r}
+print(json.dumps({{"elapsed_seconds": elapsed_seconds,
+                  "heavy_modules_loaded": [name for name in heavy_modules if name in sys.modules]}}))
+"""
+
+
+class ImportTimingResult(BaseModel):
+    name: str
+    import_statement: str
+    median_seconds: float
+    min_seconds: float
+    heavy_modules_loaded: List[str]
+
+
+def measure_import(name: str, import_statement: str, repeats: int = 5) -> ImportTimingResult:
+    """Time an import statement in fresh interpreters (so nothing is already cached in `sys.modules`)"""
+    script = _MEASURE_IMPORT_SCRIPT.format(import_statement=import_statement, heavy_modules=HEAVY_MODULES)
+    elapsed_seconds_list = []
+    heavy_modules_loaded = []
+    for _ in range(repeats):
+        completed_process = subprocess.run([sys.executable, "-c", script],
+                                           capture_output=True,
+                                           text=True,
+                                           check=True)
+        result = json.loads(completed_process.stdout.strip().splitlines()[-1])
+        elapsed_seconds_list.append(result["elapsed_seconds"])
+        heavy_modules_loaded = result["heavy_modules_loaded"]
+
+    return ImportTimingResult(
+        name=name,
+        import_statement=import_statement,
+        median_seconds=statistics.median(elapsed_seconds_list),
+        min_seconds=min(elapsed_seconds_list),
+        heavy_modules_loaded=heavy_modules_loaded,
+    )
+
+
+class ProcessStartupResult(BaseModel):
+    start_method: str
+    first_start_seconds: float  # includes starting the forkserver, for `forkserver`
+    median_seconds: float
+
+
+def measure_capture_process_startup(start_method: str, repeats: int = 5) -> ProcessStartupResult:
+    """
+    Time from `Process.start()` until a child is running with the capture modules imported. `forkserver` uses the
+    same preload list as real capture processes
+    """
+    if start_method == "forkserver":
+        from skellycam.opencv.group.strategies.capture_process_context import get_capture_process_context
+
+        context = get_capture_process_context()
+    else:
+        context = multiprocessing.get_context(start_method)
+
+    startup_seconds_list = []
+    for _ in range(repeats):
+        process_started_timestamp_ns = context.Value("q", 0, lock=False)
+        launch_timestamp_ns = time.perf_counter_ns()
+        process = context.Process(target=_mark_capture_process_started, args=(process_started_timestamp_ns,))
+        process.start()
+        process.join()
+        startup_seconds_list.append((process_started_timestamp_ns.value - launch_timestamp_ns) / 1e9)
+
+    return ProcessStartupResult(
+        start_method=start_method,
+        first_start_seconds=startup_seconds_list[0],
+        median_seconds=statistics.median(startup_seconds_list[1:] or startup_seconds_list),
+    )
+
+
+def _mark_capture_process_started(process_started_timestamp_ns):
+    import skellycam.opencv.group.strategies.cam_group_queue_process  # noqa: F401 - what a capture process needs
+
+    process_started_timestamp_ns.value = time.perf_counter_ns()
+
+
+def run_startup_benchmark(repeats: int = 5) -> List[ImportTimingResult]:
+    return [measure_import(name=name, import_statement=import_statement, repeats=repeats)
+            for name, import_statement in IMPORT_STATEMENTS.items()]
+
+
+if __name__ == "__main__":
+    for import_timing_result in run_startup_benchmark():
+        print(f"{import_timing_result.name:>8}: "
+              f"median {import_timing_result.median_seconds * 1e3:8.1f} ms, "
+              f"min {import_timing_result.min_seconds * 1e3:8.1f} ms "
+              f"- `{import_timing_result.import_statement}` "
+              f"- heavy modules loaded: {import_timing_result.heavy_modules_loaded}")
+
+    for start_method in multiprocessing.get_all_start_methods():
+        process_startup_result = measure_capture_process_startup(start_method=start_method)
+        print(f"capture process ({process_startup_result.start_method:>10}): "
+              f"first {process_startup_result.first_start_seconds * 1e3:8.1f} ms, "
+              f"median {process_startup_result.median_seconds * 1e3:8.1f} ms")
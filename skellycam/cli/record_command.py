@@ -0,0 +1,337 @@
+import argparse
+import logging
+import signal
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from skellycam.cli.recording_statistics import (
+    CameraRecordingStatistics,
+    RecordingStatisticsTracker,
+    format_statistics_line,
+)
+from skellycam.diagnostics.profiling import (
+    PROFILE_MODES,
+    ProfilingRequest,
+    parse_profile_modes,
+    set_profiling_environment,
+    start_profiling_from_environment,
+)
+from skellycam.opencv.camera.capture_watchdog import CameraOutageWindow
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.group.capture_process_supervisor import CameraRestartStatistics
+from skellycam.opencv.group.strategies.strategies import Strategy
+from skellycam.opencv.group.sync_quality_monitor import SyncQualityReport
+from skellycam.opencv.video_recorder.video_recorder import VideoRecorder
+from skellycam.system.environment.default_paths import (
+    create_new_synchronized_videos_folder,
+    get_default_session_folder_path,
+    get_log_file_path,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATISTICS_INTERVAL_SECONDS = 5.0
+
+STRATEGY_CHOICES = {
+    "process": Strategy.X_CAM_PER_PROCESS,
+    "same-process": Strategy.SAME_PROCESS,
+}
+
+SYNC_TIMESTAMP_CHOICES = {
+    "retrieve": "timestamp_ns",
+    "pre-grab": "pre_grab_timestamp_ns",
+    "post-grab": "post_grab_timestamp_ns",
+    "driver": "driver_timestamp_ns",
+}
+
+
+class RecordingSummary(BaseModel):
+    success: bool
+    stop_reason: str  # "duration", "signal", "cameras_stopped" or "error"
+    camera_ids: List[str] = []
+    startup_duration_seconds: Optional[float] = None
+    recording_duration_seconds: float = 0.0
+    synchronized_videos_folder_path: Optional[str] = None
+    cameras: Dict[str, CameraRecordingStatistics] = {}
+    sync_quality: Optional[SyncQualityReport] = None
+    outage_windows: List[CameraOutageWindow] = []
+    restarts: Dict[str, CameraRestartStatistics] = {}
+    error: Optional[str] = None
+
+
+class HeadlessRecorder:
+    """
+    Record from a `CameraGroup` without a GUI (or a display) - for a fixed duration, or until SIGINT/SIGTERM.
+    Logs per-camera throughput, drops and latency every `statistics_interval_seconds`
+    """
+
+    def __init__(self,
+                 camera_ids: List[str] = None,
+                 duration_seconds: float = None,
+                 statistics_interval_seconds: float = DEFAULT_STATISTICS_INTERVAL_SECONDS,
+                 output_folder_path: str = None,
+                 save_videos: bool = True,
+                 strategy: Strategy = Strategy.X_CAM_PER_PROCESS,
+                 synchronization_timestamp_attribute: str = "timestamp_ns",
+                 low_latency: bool = False):
+        self._camera_ids = camera_ids
+        self._duration_seconds = duration_seconds
+        self._statistics_interval_seconds = statistics_interval_seconds
+        self._output_folder_path = output_folder_path
+        self._save_videos = save_videos
+        self._strategy = strategy
+        self._synchronization_timestamp_attribute = synchronization_timestamp_attribute
+        self._low_latency = low_latency
+
+        self._stop_event = threading.Event()
+        self._stop_reason = None
+        self._camera_group: CameraGroup = None
+        self._video_recorder_dictionary: Dict[str, VideoRecorder] = {}
+
+    def stop(self, stop_reason: str = "signal"):
+        if not self._stop_event.is_set():
+            self._stop_reason = stop_reason
+            self._stop_event.set()
+
+    def record(self) -> RecordingSummary:
+        recording_duration_seconds = 0.0
+        statistics_tracker = None
+        try:
+            self._camera_group = CameraGroup(camera_ids_list=self._camera_ids, strategy=self._strategy)
+            self._camera_ids = [str(camera_id) for camera_id in self._camera_group.camera_ids]
+            if len(self._camera_ids) == 0:
+                raise RuntimeError("No cameras found")
+            self._video_recorder_dictionary = {camera_id: VideoRecorder() for camera_id in self._camera_ids}
+            if self._low_latency:
+                for camera_config in self._camera_group.camera_config_dictionary.values():
+                    camera_config.low_latency = True
+
+            recording_start_time_seconds = None
+            try:
+                # in here - capture processes launched before starting fails still have to be told to exit
+                self._camera_group.start()
+
+                statistics_tracker = RecordingStatisticsTracker(self._camera_ids)
+                recording_start_time_seconds = time.perf_counter()
+                self._run_frame_loop(statistics_tracker, recording_start_time_seconds)
+            finally:
+                if recording_start_time_seconds is not None:
+                    recording_duration_seconds = time.perf_counter() - recording_start_time_seconds
+                self._camera_group.close()
+
+            synchronized_videos_folder_path = self._save_synchronized_videos()
+        except Exception as e:
+            logger.error(f"Headless recording failed: {e}")
+            traceback.print_exc()
+            return self._create_summary(success=False,
+                                        stop_reason="error",
+                                        recording_duration_seconds=recording_duration_seconds,
+                                        statistics_tracker=statistics_tracker,
+                                        error=str(e))
+
+        return self._create_summary(success=True,
+                                    stop_reason=self._stop_reason,
+                                    recording_duration_seconds=recording_duration_seconds,
+                                    statistics_tracker=statistics_tracker,
+                                    synchronized_videos_folder_path=synchronized_videos_folder_path)
+
+    def _run_frame_loop(self, statistics_tracker: RecordingStatisticsTracker, recording_start_time_seconds: float):
+        logger.info(f"Recording from cameras {self._camera_ids} "
+                    f"{f'for {self._duration_seconds} seconds' if self._duration_seconds else 'until stopped'}")
+        next_statistics_time_seconds = recording_start_time_seconds + self._statistics_interval_seconds
+        profiling_session = start_profiling_from_environment(role="record_loop", camera_ids=self._camera_ids)
+
+        while not self._stop_event.is_set():
+            if profiling_session is not None and not profiling_session.check():
+                profiling_session = None
+
+            now_seconds = time.perf_counter()
+            if self._duration_seconds is not None and now_seconds - recording_start_time_seconds >= self._duration_seconds:
+                self.stop(stop_reason="duration")
+                break
+
+            if not self._camera_group.is_capturing and not self._camera_group.is_supervised:
+                logger.error("Camera group stopped capturing - ending recording")
+                self.stop(stop_reason="cameras_stopped")
+                break
+
+            received_any_frames = False
+            for camera_id, frame_payload in self._camera_group.latest_frames().items():
+                if frame_payload is None:
+                    continue
+                received_any_frames = True
+                statistics_tracker.add_frame(frame_payload)
+                if self._save_videos:
+                    self._video_recorder_dictionary[camera_id].append_frame_payload_to_list(frame_payload)
+
+            if now_seconds >= next_statistics_time_seconds:
+                next_statistics_time_seconds += self._statistics_interval_seconds
+                logger.info(format_statistics_line(statistics_tracker.get_interval_statistics()))
+                sync_quality_report = self._camera_group.sync_quality
+                if sync_quality_report.median_skew_ms is not None:
+                    logger.info(f"Sync: median skew {sync_quality_report.median_skew_ms:.1f}ms, "
+                                f"max {sync_quality_report.max_skew_ms:.1f}ms, "
+                                f"furthest behind: camera {sync_quality_report.lagging_camera_id}")
+                grab_latencies_ms = {camera_id: round(camera_sync_quality.median_grab_latency_ms, 1)
+                                     for camera_id, camera_sync_quality in sync_quality_report.cameras.items()
+                                     if camera_sync_quality.median_grab_latency_ms is not None}
+                if len(grab_latencies_ms) > 0:
+                    logger.info(f"Grab latency (driver timestamp -> grab, median ms): {grab_latencies_ms}")
+
+            if not received_any_frames:
+                time.sleep(0.001)
+
+        if profiling_session is not None:
+            profiling_session.stop()
+
+    def _save_synchronized_videos(self) -> Optional[str]:
+        if not self._save_videos:
+            return None
+
+        video_recorders_to_save = {camera_id: video_recorder
+                                   for camera_id, video_recorder in self._video_recorder_dictionary.items()
+                                   if video_recorder.number_of_frames > 0}
+        if len(video_recorders_to_save) == 0:
+            raise RuntimeError("No frames were recorded")
+
+        if self._output_folder_path is None:
+            self._output_folder_path = get_default_session_folder_path(string_tag="headless")
+        synchronized_videos_folder_path = create_new_synchronized_videos_folder(self._output_folder_path)
+
+        # opportunistic load, so stats-only runs don't pay for it
+        from skellycam.opencv.video_recorder.save_synchronized_videos import save_synchronized_videos
+
+        profiling_session = start_profiling_from_environment(role="save", camera_ids=list(video_recorders_to_save))
+        try:
+            save_synchronized_videos(dictionary_of_video_recorders=video_recorders_to_save,
+                                     folder_to_save_videos=synchronized_videos_folder_path,
+                                     create_diagnostic_plots_bool=False,
+                                     timestamp_attribute=self._synchronization_timestamp_attribute,
+                                     outage_windows=self._camera_group.outage_windows)
+        finally:
+            if profiling_session is not None:
+                profiling_session.stop()
+        self._camera_group.clock_service.save(synchronized_videos_folder_path)
+        return synchronized_videos_folder_path
+
+    def _create_summary(self,
+                        success: bool,
+                        stop_reason: str,
+                        recording_duration_seconds: float,
+                        statistics_tracker: RecordingStatisticsTracker = None,
+                        synchronized_videos_folder_path: str = None,
+                        error: str = None) -> RecordingSummary:
+        return RecordingSummary(
+            success=success,
+            stop_reason=stop_reason or "error",
+            camera_ids=self._camera_ids or [],
+            startup_duration_seconds=self._camera_group.startup_duration_seconds if self._camera_group else None,
+            recording_duration_seconds=recording_duration_seconds,
+            synchronized_videos_folder_path=synchronized_videos_folder_path,
+            cameras=statistics_tracker.get_total_statistics() if statistics_tracker is not None else {},
+            sync_quality=self._camera_group.sync_quality if self._camera_group else None,
+            outage_windows=self._camera_group.outage_windows if self._camera_group else [],
+            restarts=self._camera_group.restart_statistics if self._camera_group else {},
+            error=error,
+        )
+
+
+def add_record_command_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("-c", "--cameras", nargs="+", default=None,
+                        help="camera ids to record from (default: detect cameras)")
+    parser.add_argument("-d", "--duration", type=float, default=None,
+                        help="seconds to record for (default: until SIGINT/SIGTERM)")
+    parser.add_argument("-o", "--output-folder", default=None,
+                        help="session folder to save videos into (default: a new folder in ~/skelly-cam-recordings)")
+    parser.add_argument("--stats-interval", type=float, default=DEFAULT_STATISTICS_INTERVAL_SECONDS,
+                        help="seconds between throughput/drop/latency reports")
+    parser.add_argument("--no-save", action="store_true",
+                        help="don't keep frames or save videos, only report statistics (e.g. for soak tests)")
+    parser.add_argument("--strategy", choices=list(STRATEGY_CHOICES.keys()), default="process",
+                        help="run the cameras in capture processes, or in this process")
+    parser.add_argument("--sync-timestamp", choices=list(SYNC_TIMESTAMP_CHOICES.keys()), default="retrieve",
+                        help="which frame timestamp to line the cameras up on: after retrieve (includes decoding), "
+                             "before/after grab, or the driver's own (where the backend exposes one)")
+    parser.add_argument("--low-latency", action="store_true",
+                        help="buffer a single frame in each camera's driver (and use V4L2 on Linux) so frames "
+                             "aren't stale")
+    parser.add_argument("--summary-file", default=None,
+                        help="also write the JSON summary to this file")
+    parser.add_argument("--trace-file", default=None,
+                        help="trace every frame's lifecycle and save it to this file as Chrome/Perfetto trace JSON")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve Prometheus metrics at http://127.0.0.1:<port>/metrics while recording "
+                             "(default: $SKELLYCAM_METRICS_PORT, if set)")
+    parser.add_argument("--profile", type=parse_profile_modes, default=None, metavar="MODES",
+                        help=f"profile the capture processes, the frame loop and the save - comma separated, "
+                             f"from {', '.join(PROFILE_MODES)} (default: $SKELLYCAM_PROFILE, if set)")
+    parser.add_argument("--profile-seconds", type=float, default=None,
+                        help="how long to profile for, from when each process starts (default: 30)")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="console log level (logs go to stderr, the summary goes to stdout)")
+
+
+def run_record_command(args: argparse.Namespace) -> int:
+    """Entry point of `skellycam record`. Prints a JSON `RecordingSummary` to stdout, returns the exit code"""
+    from skellycam.system.log_config.logsetup import configure_logging
+
+    configure_logging(log_file_path=get_log_file_path(),
+                      console_stream=sys.stderr,
+                      console_log_level=getattr(logging, args.log_level))
+
+    if args.profile is not None:
+        # like tracing, set before any capture process starts
+        profiling_request = ProfilingRequest(modes=args.profile)
+        if args.profile_seconds is not None:
+            profiling_request.duration_seconds = args.profile_seconds
+        set_profiling_environment(profiling_request)
+
+    if args.trace_file is not None:
+        # before any capture process starts, so they trace too
+        from skellycam.diagnostics.frame_tracing import enable_frame_tracing
+        enable_frame_tracing()
+
+    from skellycam.diagnostics.metrics_server import start_metrics_server, start_metrics_server_from_environment
+    if args.metrics_port is not None:
+        metrics_server = start_metrics_server(port=args.metrics_port)
+    else:
+        metrics_server = start_metrics_server_from_environment()
+
+    headless_recorder = HeadlessRecorder(camera_ids=args.cameras,
+                                         duration_seconds=args.duration,
+                                         statistics_interval_seconds=args.stats_interval,
+                                         output_folder_path=args.output_folder,
+                                         save_videos=not args.no_save,
+                                         strategy=STRATEGY_CHOICES[args.strategy],
+                                         synchronization_timestamp_attribute=SYNC_TIMESTAMP_CHOICES[args.sync_timestamp],
+                                         low_latency=args.low_latency)
+
+    def _handle_stop_signal(signal_number, frame):
+        logger.info(f"Received signal {signal.Signals(signal_number).name} - stopping recording")
+        headless_recorder.stop(stop_reason="signal")
+
+    previous_signal_handlers = {signal_number: signal.signal(signal_number, _handle_stop_signal)
+                                for signal_number in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        recording_summary = headless_recorder.record()
+    finally:
+        for signal_number, previous_signal_handler in previous_signal_handlers.items():
+            signal.signal(signal_number, previous_signal_handler)
+        if metrics_server is not None:
+            metrics_server.stop()
+
+    if args.trace_file is not None:
+        from skellycam.diagnostics.chrome_trace_export import export_chrome_trace
+        export_chrome_trace(args.trace_file)
+
+    summary_json = recording_summary.model_dump_json(indent=4)
+    if args.summary_file is not None:
+        Path(args.summary_file).write_text(summary_json)
+    print(summary_json, flush=True)
+    return 0 if recording_summary.success else 1
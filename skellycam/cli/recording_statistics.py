@@ -0,0 +1,135 @@
+import logging
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from skellycam.detection.models.frame_payload import FramePayload
+
+logger = logging.getLogger(__name__)
+
+
+class CameraRecordingStatistics(BaseModel):
+    camera_id: str
+    frames_received: int = 0
+    frames_dropped: int = 0  # grabbed by the camera, but overwritten before they were delivered to us
+    frames_per_second: float = 0.0
+    mean_latency_ms: Optional[float] = None  # from `retrieve()` in the capture thread to delivery in this process
+    p95_latency_ms: Optional[float] = None
+    max_latency_ms: Optional[float] = None
+
+
+class _CameraStatisticsAccumulator:
+    def __init__(self, camera_id: str):
+        self.camera_id = camera_id
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self.latency_sum_ns = 0
+        self.number_of_latencies = 0  # frames with a capture timestamp - the others have no latency to average
+        self.latency_max_ns = None
+        self.last_frame_number = None
+        self.interval_frames_received = 0
+        self.interval_frames_dropped = 0
+        self.interval_latencies_ns: List[int] = []
+
+    def add_frame(self, frame_payload: FramePayload, received_timestamp_ns: int):
+        self.frames_received += 1
+        self.interval_frames_received += 1
+
+        if frame_payload.number_of_frames_received is not None:
+            if self.last_frame_number is not None:
+                number_of_skipped_frames = frame_payload.number_of_frames_received - self.last_frame_number - 1
+                if number_of_skipped_frames > 0:
+                    self.frames_dropped += number_of_skipped_frames
+                    self.interval_frames_dropped += number_of_skipped_frames
+            self.last_frame_number = frame_payload.number_of_frames_received
+
+        if frame_payload.timestamp_ns is not None:
+            latency_ns = received_timestamp_ns - frame_payload.timestamp_ns
+            self.latency_sum_ns += latency_ns
+            self.number_of_latencies += 1
+            self.interval_latencies_ns.append(latency_ns)
+            if self.latency_max_ns is None or latency_ns > self.latency_max_ns:
+                self.latency_max_ns = latency_ns
+
+
+class RecordingStatisticsTracker:
+    """
+    Throughput, drop and latency bookkeeping for frames pulled out of a `CameraGroup`.
+
+    Drops are counted from gaps in `FramePayload.number_of_frames_received`. Latency is measured against the
+    `perf_counter_ns` timestamp taken in the capture thread, which is comparable across processes on one machine
+    """
+
+    def __init__(self, camera_ids: List[str]):
+        self._camera_accumulators: Dict[str, _CameraStatisticsAccumulator] = {
+            str(camera_id): _CameraStatisticsAccumulator(str(camera_id)) for camera_id in camera_ids
+        }
+        self._start_time_seconds = time.perf_counter()
+        self._interval_start_time_seconds = self._start_time_seconds
+
+    def add_frame(self, frame_payload: FramePayload, received_timestamp_ns: int = None):
+        if received_timestamp_ns is None:
+            received_timestamp_ns = time.perf_counter_ns()
+        camera_id = str(frame_payload.camera_id)
+        if camera_id not in self._camera_accumulators:
+            self._camera_accumulators[camera_id] = _CameraStatisticsAccumulator(camera_id)
+        self._camera_accumulators[camera_id].add_frame(frame_payload, received_timestamp_ns)
+
+    def get_interval_statistics(self) -> Dict[str, CameraRecordingStatistics]:
+        """Statistics since the previous call (or since the start), then start a new interval"""
+        now_seconds = time.perf_counter()
+        interval_duration_seconds = now_seconds - self._interval_start_time_seconds
+        self._interval_start_time_seconds = now_seconds
+
+        interval_statistics = {}
+        for camera_id, accumulator in self._camera_accumulators.items():
+            latencies_ms = np.array(accumulator.interval_latencies_ns) / 1e6
+            interval_statistics[camera_id] = CameraRecordingStatistics(
+                camera_id=camera_id,
+                frames_received=accumulator.interval_frames_received,
+                frames_dropped=accumulator.interval_frames_dropped,
+                frames_per_second=_safe_rate(accumulator.interval_frames_received, interval_duration_seconds),
+                mean_latency_ms=float(np.mean(latencies_ms)) if latencies_ms.size > 0 else None,
+                p95_latency_ms=float(np.percentile(latencies_ms, 95)) if latencies_ms.size > 0 else None,
+                max_latency_ms=float(np.max(latencies_ms)) if latencies_ms.size > 0 else None,
+            )
+            accumulator.interval_frames_received = 0
+            accumulator.interval_frames_dropped = 0
+            accumulator.interval_latencies_ns = []
+        return interval_statistics
+
+    def get_total_statistics(self) -> Dict[str, CameraRecordingStatistics]:
+        duration_seconds = time.perf_counter() - self._start_time_seconds
+        total_statistics = {}
+        for camera_id, accumulator in self._camera_accumulators.items():
+            total_statistics[camera_id] = CameraRecordingStatistics(
+                camera_id=camera_id,
+                frames_received=accumulator.frames_received,
+                frames_dropped=accumulator.frames_dropped,
+                frames_per_second=_safe_rate(accumulator.frames_received, duration_seconds),
+                mean_latency_ms=(accumulator.latency_sum_ns / accumulator.number_of_latencies / 1e6
+                                 if accumulator.number_of_latencies > 0 else None),
+                max_latency_ms=accumulator.latency_max_ns / 1e6 if accumulator.latency_max_ns is not None else None,
+            )
+        return total_statistics
+
+
+def format_statistics_line(statistics_dictionary: Dict[str, CameraRecordingStatistics]) -> str:
+    camera_strings = []
+    for camera_id, statistics in statistics_dictionary.items():
+        latency_string = "n/a"
+        if statistics.mean_latency_ms is not None:
+            latency_string = f"{statistics.mean_latency_ms:.1f}"
+            if statistics.p95_latency_ms is not None:
+                latency_string += f"/{statistics.p95_latency_ms:.1f}"
+        camera_strings.append(f"cam {camera_id}: {statistics.frames_per_second:5.1f} fps, "
+                              f"{statistics.frames_dropped} dropped, latency(ms) {latency_string}")
+    return " | ".join(camera_strings)
+
+
+def _safe_rate(count: int, duration_seconds: float) -> float:
+    if duration_seconds <= 0:
+        return 0.0
+    return count / duration_seconds
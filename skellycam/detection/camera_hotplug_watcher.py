@@ -0,0 +1,174 @@
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Callable, List, Literal, Optional, Set, Union
+
+from pydantic import BaseModel
+
+from skellycam.detection.private.enumerate_v4l2_devices import SYSFS_VIDEO4LINUX_PATH
+from skellycam.detection.private.inotify import IN_DELETE_SELF, IN_IGNORED, IN_Q_OVERFLOW, Inotify, \
+    is_inotify_available
+
+logger = logging.getLogger(__name__)
+
+DEV_PATH = "/dev"
+POLL_INTERVAL_SECONDS = 1.0  # where there's no inotify
+MISSING_FOLDER_RETRY_SECONDS = 1.0  # a watched folder that isn't there (yet) is looked for again this often
+
+_VIDEO_NODE_NAME_REGEX = re.compile(r"^video(\d+)$")
+
+
+class CameraDeviceEvent(BaseModel):
+    event_type: Literal["added", "removed"]
+    camera_id: str  # the `N` in `/dev/videoN`, like the ids `detect_cameras` finds
+    device_path: str
+
+
+class CameraHotplugWatcher:
+    """
+    Reports capture devices (`videoN` nodes) appearing in, or vanishing from, `/dev` - through inotify on Linux, so
+    nothing is polled or re-probed, and by listing the folder every `poll_interval_seconds` elsewhere.
+
+    Events only prompt a fresh listing of the folder, which is compared with the last one - so a burst of events (or
+    a lost one) still gives exactly one `CameraDeviceEvent` per device that came or went. Metadata nodes (UVC cameras
+    register one next to each capture node) are skipped, going by `sysfs_root`
+    """
+
+    def __init__(self,
+                 on_camera_device_event: Callable[[CameraDeviceEvent], None],
+                 dev_root: Union[str, Path] = DEV_PATH,
+                 sysfs_root: Union[str, Path] = SYSFS_VIDEO4LINUX_PATH,
+                 use_inotify: bool = True,
+                 poll_interval_seconds: float = POLL_INTERVAL_SECONDS):
+        self._on_camera_device_event = on_camera_device_event
+        self._dev_root = Path(dev_root)
+        self._sysfs_root = Path(sysfs_root)
+        self._use_inotify = use_inotify and is_inotify_available()
+        self._poll_interval_seconds = poll_interval_seconds
+
+        self._camera_ids: Set[str] = set()
+        self._inotify: Optional[Inotify] = None
+        self._is_watching_dev_root = False
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def camera_ids(self) -> List[str]:
+        """The capture devices there are now, as of the last event"""
+        return sorted(self._camera_ids, key=int)
+
+    @property
+    def is_using_inotify(self) -> bool:
+        return self._use_inotify
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Devices already there when it starts aren't reported - see `camera_ids`"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        if self._use_inotify:
+            self._inotify = Inotify()
+            self._watch_dev_root()
+        self._camera_ids = self._list_camera_ids()
+        logger.info(f"Watching {self._dev_root} for cameras being plugged in or unplugged "
+                    f"({'inotify' if self._use_inotify else f'polling every {self._poll_interval_seconds} seconds'}) "
+                    f"- there now: {self.camera_ids}")
+        self._thread = threading.Thread(target=self._watch, name="CameraHotplugWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._inotify is not None:
+            self._inotify.wake()
+        if self._thread is not None:
+            self._thread.join()
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _watch(self):
+        while not self._stop_event.is_set():
+            try:
+                if self._use_inotify:
+                    should_check_for_changes = self._wait_for_inotify_events()
+                else:
+                    should_check_for_changes = not self._stop_event.wait(self._poll_interval_seconds)
+                if should_check_for_changes and not self._stop_event.is_set():
+                    self._check_for_changes()
+            except Exception as e:
+                logger.exception(f"Problem watching {self._dev_root} for cameras: {e}")
+                self._stop_event.wait(self._poll_interval_seconds)
+
+    def _wait_for_inotify_events(self) -> bool:
+        """Returns whether any of the events could be a capture device coming or going"""
+        if not self._is_watching_dev_root:
+            # come back once it might be there
+            self._stop_event.wait(MISSING_FOLDER_RETRY_SECONDS)
+            self._watch_dev_root()
+            return self._is_watching_dev_root
+
+        events = []
+        while len(events) == 0 and not self._stop_event.is_set():
+            events = self._inotify.read_events()
+        should_check_for_changes = False
+        for mask, name in events:
+            if mask & (IN_DELETE_SELF | IN_IGNORED):
+                logger.warning(f"{self._dev_root} went away - waiting for it to come back")
+                self._is_watching_dev_root = False
+                should_check_for_changes = True
+            elif mask & IN_Q_OVERFLOW:
+                logger.debug(f"Missed events for {self._dev_root} - relisting it")
+                should_check_for_changes = True
+            elif _VIDEO_NODE_NAME_REGEX.match(name) is not None:
+                should_check_for_changes = True
+        return should_check_for_changes
+
+    def _watch_dev_root(self):
+        try:
+            self._inotify.add_watch(self._dev_root)
+            self._is_watching_dev_root = True
+        except OSError as e:
+            logger.debug(f"Can't watch {self._dev_root} (yet): {e}")
+            self._is_watching_dev_root = False
+
+    def _check_for_changes(self):
+        camera_ids = self._list_camera_ids()
+        camera_device_events = (
+                [self._create_event("removed", camera_id) for camera_id in sorted(self._camera_ids - camera_ids, key=int)]
+                + [self._create_event("added", camera_id) for camera_id in sorted(camera_ids - self._camera_ids, key=int)])
+        self._camera_ids = camera_ids
+        for camera_device_event in camera_device_events:
+            logger.info(f"Camera {camera_device_event.event_type}: {camera_device_event.device_path}")
+            try:
+                self._on_camera_device_event(camera_device_event)
+            except Exception as e:
+                logger.exception(f"Problem handling {camera_device_event}: {e}")
+
+    def _list_camera_ids(self) -> Set[str]:
+        try:
+            node_names = [node_path.name for node_path in self._dev_root.iterdir()]
+        except OSError:
+            return set()
+        camera_ids = set()
+        for node_name in node_names:
+            match = _VIDEO_NODE_NAME_REGEX.match(node_name)
+            if match is not None and self._is_capture_node(node_name):
+                camera_ids.add(match.group(1))
+        return camera_ids
+
+    def _is_capture_node(self, node_name: str) -> bool:
+        try:
+            node_index = (self._sysfs_root / node_name / "index").read_text().strip()
+        except OSError:
+            return True  # nothing to go on - assume it is
+        return node_index == "0"
+
+    def _create_event(self, event_type: str, camera_id: str) -> CameraDeviceEvent:
+        return CameraDeviceEvent(event_type=event_type,
+                                 camera_id=camera_id,
+                                 device_path=str(self._dev_root / f"video{camera_id}"))
@@ -1,19 +1,48 @@
+import logging
+import platform
+
+from skellycam.detection.private.camera_capability_cache import get_camera_capability_cache
 from skellycam.detection.private.detect_possible_cameras import DetectPossibleCameras
+from skellycam.detection.private.enumerate_v4l2_devices import enumerate_v4l2_devices
 from skellycam.detection.private.found_camera_cache import FoundCameraCache
 
+logger = logging.getLogger(__name__)
+
 # No consumer should call this "private" variable
 _available_cameras: FoundCameraCache = None
 
 
 # If you want cams, you call this function
-def detect_cameras(use_cache=True):
+def detect_cameras(use_cache=True, keep_captures_open: bool = False):
+    """
+    :param keep_captures_open: leave the detected cameras open in the capture pool so that cameras created in
+    this process can adopt them (skipping the slow device open/negotiation on connect)
+    """
     global _available_cameras
+    if _available_cameras is None and use_cache and not keep_captures_open:
+        _available_cameras = _load_known_cameras_from_disk_cache()
+
     if _available_cameras is None or not use_cache:
         d = DetectPossibleCameras()
-        _available_cameras = d.find_available_cameras()
+        _available_cameras = d.find_available_cameras(keep_captures_open=keep_captures_open)
 
     return _available_cameras
 
 
+def _load_known_cameras_from_disk_cache():
+    """
+    On Linux the connected devices can be listed (with stable identities) without opening them - if all of them
+    are cameras we've already verified, skip probing entirely
+    """
+    if platform.system() != "Linux":
+        return None
+
+    found_camera_cache = get_camera_capability_cache().get_found_cameras(enumerate_v4l2_devices())
+    if found_camera_cache is not None:
+        logger.info(f"All connected cameras are known from the capability cache, skipping probe: "
+                    f"{found_camera_cache.cameras_found_list}")
+    return found_camera_cache
+
+
 if __name__ == "__main__":
     detect_cameras()
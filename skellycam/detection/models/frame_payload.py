@@ -1,4 +1,5 @@
 import dataclasses
+from typing import List, Tuple
 
 import numpy as np
 
@@ -7,9 +8,17 @@ import numpy as np
 class FramePayload:
     success: bool = False
     image: np.ndarray = None
-    timestamp_ns: float = None
+    timestamp_ns: float = None  # after `retrieve()` returns (or when the source says the frame happened, e.g. replays)
+    # `perf_counter_ns` just before and just after `grab()` - the frame was handed over somewhere in between, before
+    # any decoding (which `timestamp_ns` includes)
+    pre_grab_timestamp_ns: int = None
+    post_grab_timestamp_ns: int = None
+    # the driver's own timestamp of the frame (`CAP_PROP_POS_MSEC`, e.g. the V4L2 buffer timestamp), on the camera's
+    # clock - only set if the backend exposes one
+    driver_timestamp_ns: int = None
     number_of_frames_received: int = None  # how many frames have been grabbed from this camera?
     number_of_frames_recorded: int = None  # how many frames have been recorded (to be dumped to video)?
     camera_id: str = None
     mean_frames_per_second: float = None
     queue_size: int = None
+    stage_marks: List[Tuple[str, int, int]] = None  # lifecycle timestamps, only when tracing (see `frame_tracing`)
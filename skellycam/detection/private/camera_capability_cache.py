@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import platform
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from pydantic import BaseModel
+
+from skellycam.detection.private.enumerate_v4l2_devices import V4L2Device, enumerate_v4l2_devices
+from skellycam.detection.private.found_camera_cache import FoundCameraCache
+from skellycam.detection.private.measure_camera_modes import CameraMode, get_best_fourcc_per_resolution
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.system.environment.default_paths import get_camera_capability_cache_path
+
+logger = logging.getLogger(__name__)
+
+
+class CameraCapabilities(BaseModel):
+    stable_id: str
+    last_camera_id: str
+    supported_modes: List[CameraMode] = []
+    best_fourcc_per_resolution: Dict[str, str] = {}  # "{width}x{height}" -> fourcc
+    last_applied_config: Optional[CameraConfig] = None
+
+
+class CameraCapabilityCacheModel(BaseModel):
+    cameras: Dict[str, CameraCapabilities] = {}
+
+
+class CameraCapabilityCache:
+    """
+    Disk-backed record of every camera we've seen, keyed by its stable identity (see `enumerate_v4l2_devices`):
+    the modes it was measured to sustain, the best fourcc per resolution and the last config that was applied to it.
+
+    Lets startup skip probing cameras we already know, and lets configuration start from a known-good mode.
+    """
+
+    def __init__(self, cache_file_path: Union[str, Path] = None):
+        if cache_file_path is None:
+            cache_file_path = get_camera_capability_cache_path()
+        self._cache_file_path = Path(cache_file_path)
+        self._lock = threading.Lock()
+        self._model = self._load()
+
+    @property
+    def cache_file_path(self) -> Path:
+        return self._cache_file_path
+
+    def get(self, stable_id: str) -> Optional[CameraCapabilities]:
+        return self._model.cameras.get(stable_id)
+
+    def has_measured_modes(self, stable_id: str) -> bool:
+        capabilities = self.get(stable_id)
+        return capabilities is not None and len(capabilities.supported_modes) > 0
+
+    def record_detected_camera(self, stable_id: str, camera_id: str, supported_modes: List[CameraMode] = None):
+        with self._lock:
+            capabilities = self._model.cameras.get(stable_id)
+            if capabilities is None:
+                capabilities = CameraCapabilities(stable_id=stable_id, last_camera_id=str(camera_id))
+                self._model.cameras[stable_id] = capabilities
+            capabilities.last_camera_id = str(camera_id)
+
+            if supported_modes:
+                capabilities.supported_modes = supported_modes
+                capabilities.best_fourcc_per_resolution = get_best_fourcc_per_resolution(supported_modes)
+
+    def record_applied_config(self, stable_id: str, camera_config: CameraConfig) -> bool:
+        """Returns whether that changed anything (i.e. whether the cache needs saving)"""
+        with self._lock:
+            capabilities = self._model.cameras.get(stable_id)
+            if capabilities is None:
+                capabilities = CameraCapabilities(stable_id=stable_id, last_camera_id=str(camera_config.camera_id))
+                self._model.cameras[stable_id] = capabilities
+            elif capabilities.last_applied_config == camera_config:
+                return False
+            capabilities.last_applied_config = camera_config.model_copy()
+            return True
+
+    def get_known_good_config(self, stable_id: str, camera_id: str) -> Optional[CameraConfig]:
+        """The last config applied to this camera (re-addressed to its current `camera_id`), if there is one"""
+        capabilities = self.get(stable_id)
+        if capabilities is None or capabilities.last_applied_config is None:
+            return None
+
+        camera_config = capabilities.last_applied_config.model_copy(update={"camera_id": str(camera_id)})
+        best_fourcc = self.get_best_fourcc(stable_id=stable_id,
+                                           resolution_width=camera_config.resolution_width,
+                                           resolution_height=camera_config.resolution_height)
+        if best_fourcc is not None:
+            camera_config.fourcc = best_fourcc
+        return camera_config
+
+    def get_best_fourcc(self, stable_id: str, resolution_width: int, resolution_height: int) -> Optional[str]:
+        capabilities = self.get(stable_id)
+        if capabilities is None:
+            return None
+        return capabilities.best_fourcc_per_resolution.get(f"{resolution_width}x{resolution_height}")
+
+    def get_found_cameras(self, v4l2_devices: List[V4L2Device]) -> Optional[FoundCameraCache]:
+        """
+        If every enumerated device is a camera we've already verified, return them without probing.
+        Returns None when there is anything new (or nothing at all), i.e. when a real probe is needed
+        """
+        if len(v4l2_devices) == 0:
+            return None
+
+        for device in v4l2_devices:
+            if self.get(device.stable_id) is None:
+                return None
+
+        return FoundCameraCache(
+            number_of_cameras_found=len(v4l2_devices),
+            cameras_found_list=[device.camera_id for device in v4l2_devices],
+            stable_ids={device.camera_id: device.stable_id for device in v4l2_devices},
+        )
+
+    def save(self):
+        with self._lock:
+            json_string = self._model.model_dump_json(indent=4)
+
+        # write-then-rename, so a crash mid-write can't leave a corrupt cache behind
+        self._cache_file_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_file_path = self._cache_file_path.with_suffix(".tmp")
+        temporary_file_path.write_text(json_string)
+        os.replace(temporary_file_path, self._cache_file_path)
+        logger.debug(f"Saved camera capability cache to {self._cache_file_path}")
+
+    def _load(self) -> CameraCapabilityCacheModel:
+        if not self._cache_file_path.exists():
+            return CameraCapabilityCacheModel()
+        try:
+            return CameraCapabilityCacheModel(**json.loads(self._cache_file_path.read_text()))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable camera capability cache at {self._cache_file_path}: {e}")
+            return CameraCapabilityCacheModel()
+
+
+def get_stable_id(camera_id: str, stable_id_dictionary: Dict[str, str] = None) -> str:
+    """
+    Stable identity for a camera_id. Falls back to the port number where the platform gives us nothing better
+    (in which case the cache only survives as long as cameras stay plugged into the same ports)
+    """
+    camera_id = str(camera_id)
+    if stable_id_dictionary is not None and camera_id in stable_id_dictionary:
+        return stable_id_dictionary[camera_id]
+
+    if not camera_id.isdigit():
+        return camera_id
+
+    if platform.system() == "Linux":
+        for device in enumerate_v4l2_devices():
+            if device.camera_id == camera_id:
+                return device.stable_id
+
+    return f"port-{camera_id}"
+
+
+# No consumer should call this "private" variable
+_camera_capability_cache: CameraCapabilityCache = None
+
+
+def get_camera_capability_cache() -> CameraCapabilityCache:
+    global _camera_capability_cache
+    if _camera_capability_cache is None:
+        _camera_capability_cache = CameraCapabilityCache()
+    return _camera_capability_cache
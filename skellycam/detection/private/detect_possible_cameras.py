@@ -1,77 +1,222 @@
 import logging
+import platform
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional
 
 import cv2
 import numpy as np
 
+from skellycam.detection.private.camera_capability_cache import (
+    CameraCapabilityCache,
+    get_camera_capability_cache,
+    get_stable_id,
+)
+from skellycam.detection.private.enumerate_v4l2_devices import (
+    DEV_V4L_PATH,
+    SYSFS_VIDEO4LINUX_PATH,
+    enumerate_v4l2_devices,
+    get_stable_id_dictionary,
+)
 from skellycam.detection.private.found_camera_cache import FoundCameraCache
+from skellycam.detection.private.measure_camera_modes import measure_camera_modes
+from skellycam.opencv.camera.capture_pool import get_capture_pool
 from skellycam.opencv.config.determine_backend import determine_backend
 
 CAM_CHECK_NUM = 20  # please give me a reason to increase this number ;D
+PROBE_TIMEOUT_SECONDS = 5.0
 
 logger = logging.getLogger(__name__)
 
 
 class DetectPossibleCameras:
-    def find_available_cameras(self) -> FoundCameraCache:
+    def __init__(self,
+                 sysfs_root: str = SYSFS_VIDEO4LINUX_PATH,
+                 dev_v4l_root: str = DEV_V4L_PATH,
+                 probe_timeout_seconds: float = PROBE_TIMEOUT_SECONDS,
+                 measure_modes: bool = True,
+                 capability_cache: CameraCapabilityCache = None):
+        self._sysfs_root = sysfs_root
+        self._dev_v4l_root = dev_v4l_root
+        self._probe_timeout_seconds = probe_timeout_seconds
+        self._measure_modes = measure_modes
+        self._capability_cache = capability_cache
+        self._stable_id_dictionary = {}
+
+    def find_available_cameras(self, keep_captures_open: bool = False) -> FoundCameraCache:
+        """
+        Probe ports for cameras that produce frames.
+        :param keep_captures_open: if True, the captures of the cameras found are left open in the capture pool
+        (see `skellycam.opencv.camera.capture_pool`) so they can be adopted instead of re-opened on connect
+        """
         cv2_backend = determine_backend()
 
-        cams_to_use_list = []
-        caps_list = []
-        for cam_id in range(CAM_CHECK_NUM):
-            cap = cv2.VideoCapture(cam_id, cv2_backend)
-            success, image1 = cap.read()
-            time0 = time.perf_counter()
+        # a handle left over from a previous detection would keep its device busy
+        get_capture_pool().release_all()
 
-            if not success:
-                continue
+        detection_start_time = time.perf_counter()
+        port_numbers = self._get_port_numbers_to_check()
+        found_captures = self._probe_ports_concurrently(port_numbers=port_numbers, cv2_backend=cv2_backend)
+        cams_to_use_list = [str(cam_id) for cam_id in sorted(found_captures.keys())]
+        self._update_capability_cache(found_captures)
 
-            if image1 is None:
+        for cam_id, cap in sorted(found_captures.items()):
+            if keep_captures_open:
+                get_capture_pool().put(str(cam_id), cap)
                 continue
+            logger.debug(f"Releasing cap {cap}")
+            cap.release()
+
+        logger.info(f"Probed {len(port_numbers)} ports in {time.perf_counter() - detection_start_time:.3f} seconds")
+        logger.info(f"Found cameras: {cams_to_use_list}")
+        return FoundCameraCache(
+            number_of_cameras_found=len(cams_to_use_list),
+            cameras_found_list=cams_to_use_list,
+            stable_ids={
+                camera_id: self._stable_id_dictionary[camera_id]
+                for camera_id in cams_to_use_list
+                if camera_id in self._stable_id_dictionary
+            },
+        )
 
+    def _update_capability_cache(self, found_captures: Dict[int, cv2.VideoCapture]):
+        """
+        Record the cameras found in the on-disk capability cache. Cameras seen for the first time get their
+        supported modes measured (once - it takes a few seconds) - concurrently, and without the probe timeout,
+        since they've already proven responsive
+        """
+        if self._capability_cache is None:
+            self._capability_cache = get_camera_capability_cache()
+
+        stable_ids = {
+            cam_id: get_stable_id(str(cam_id), self._stable_id_dictionary) for cam_id in found_captures.keys()
+        }
+        cam_ids_to_measure = []
+        if self._measure_modes:
+            cam_ids_to_measure = [cam_id for cam_id in found_captures.keys()
+                                  if not self._capability_cache.has_measured_modes(stable_ids[cam_id])]
+
+        measured_modes = {}
+        if len(cam_ids_to_measure) > 0:
+            logger.info(f"Measuring supported modes of newly seen cameras: {cam_ids_to_measure}")
+            with ThreadPoolExecutor(max_workers=len(cam_ids_to_measure),
+                                    thread_name_prefix="MeasureCameraModes") as executor:
+                future_to_port = {executor.submit(measure_camera_modes, found_captures[cam_id]): cam_id
+                                  for cam_id in cam_ids_to_measure}
+            for future, cam_id in future_to_port.items():
+                try:
+                    measured_modes[cam_id] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to measure modes of Camera {cam_id}: {e}")
+
+        for cam_id, stable_id in stable_ids.items():
+            self._capability_cache.record_detected_camera(stable_id=stable_id,
+                                                          camera_id=str(cam_id),
+                                                          supported_modes=measured_modes.get(cam_id))
+        try:
+            self._capability_cache.save()
+        except OSError as e:
+            logger.warning(f"Could not save camera capability cache: {e}")
+
+    def _probe_ports_concurrently(self, port_numbers: List[int], cv2_backend: int) -> Dict[int, cv2.VideoCapture]:
+        """
+        Probe every port on its own thread (opencv releases the GIL while opening/reading), so one slow device
+        doesn't hold up the rest. Ports that don't answer within `self._probe_timeout_seconds` are skipped - their
+        probe thread is abandoned and releases its capture whenever it finishes
+        """
+        if len(port_numbers) == 0:
+            return {}
+
+        executor = ThreadPoolExecutor(max_workers=len(port_numbers), thread_name_prefix="DetectCameras")
+        future_to_port = {
+            executor.submit(self._probe_port, cam_id, cv2_backend): cam_id for cam_id in port_numbers
+        }
+        done_futures, not_done_futures = wait(future_to_port.keys(), timeout=self._probe_timeout_seconds)
+
+        for future in not_done_futures:
+            logger.warning(
+                f"Camera at port {future_to_port[future]} did not respond within "
+                f"{self._probe_timeout_seconds} seconds - skipping it"
+            )
+            future.add_done_callback(_release_abandoned_capture)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        found_captures = {}
+        for future in done_futures:
+            cam_id = future_to_port[future]
             try:
-                success, image2 = cap.read()
-                time1 = time.perf_counter()
-
-                # TODO: This cant work. Needs a new solution
-                if time1 - time0 > 0.5:
-                    logger.debug(
-                        f"Camera {cam_id} took {time1 - time0} seconds to produce a 2nd "
-                        f"frame. It might be a virtual camera Skipping it."
-                    )
-                    continue  # skip to next port number
-
-                if np.mean(image2) > 10 and np.sum((image1-image2).ravel()) == 0:
-                    logger.debug(
-                        f"Camera {cam_id} appears to be return identical non-black frames -its  probably a virtual camera, skipping"
-                    )
-                    continue  # skip to next port number
+                cap = future.result()
+            except Exception as e:
+                logger.error(f"Exception raised when looking for a camera at port{cam_id}: {e}")
+                continue
+            if cap is not None:
+                found_captures[cam_id] = cap
+        return found_captures
+
+    def _probe_port(self, cam_id: int, cv2_backend: int) -> Optional[cv2.VideoCapture]:
+        """Returns the open capture if there is a (non-virtual) camera at this port, otherwise None"""
+        cap = cv2.VideoCapture(cam_id, cv2_backend)
+        success, image1 = cap.read()
+        time0 = time.perf_counter()
 
+        if not success or image1 is None:
+            cap.release()
+            return None
+
+        try:
+            success, image2 = cap.read()
+            time1 = time.perf_counter()
+
+            # TODO: This cant work. Needs a new solution
+            if time1 - time0 > 0.5:
                 logger.debug(
-                    f"Camera found at port number {cam_id}: success={success}, "
-                    f"image.shape={image1.shape},  cap={cap}"
-                )
-                cams_to_use_list.append(str(cam_id))
-                caps_list.append(cap)
-            except Exception as e:
-                logger.error(
-                    f"Exception raised when looking for a camera at port{cam_id}: {e}"
+                    f"Camera {cam_id} took {time1 - time0} seconds to produce a 2nd "
+                    f"frame. It might be a virtual camera Skipping it."
                 )
+                cap.release()
+                return None
 
-        for cap in caps_list:
-            logger.debug(f"Releasing cap {cap}")
+            if np.mean(image2) > 10 and np.sum((image1 - image2).ravel()) == 0:
+                logger.debug(
+                    f"Camera {cam_id} appears to be return identical non-black frames -its  probably a virtual camera, skipping"
+                )
+                cap.release()
+                return None
+        except Exception:
             cap.release()
-            logger.debug(f"Deleting cap {cap}")
-            del cap
+            raise
 
-        logger.debug(f"Deleting caps_list {caps_list}")
-        del caps_list
-
-        logger.info(f"Found cameras: {cams_to_use_list}")
-        return FoundCameraCache(
-            number_of_cameras_found=len(cams_to_use_list),
-            cameras_found_list=cams_to_use_list,
+        logger.debug(
+            f"Camera found at port number {cam_id}: success={success}, "
+            f"image.shape={image1.shape},  cap={cap}"
         )
+        return cap
+
+    def _get_port_numbers_to_check(self) -> List[int]:
+        """
+        On Linux, list the capture-capable devices from sysfs (without opening them) and only probe those.
+        Everywhere else (or if sysfs is unavailable) fall back to blindly checking the first `CAM_CHECK_NUM` ports
+        """
+        if platform.system() == "Linux" and Path(self._sysfs_root).is_dir():
+            v4l2_devices = enumerate_v4l2_devices(sysfs_root=self._sysfs_root,
+                                                  dev_v4l_root=self._dev_v4l_root)
+            self._stable_id_dictionary = get_stable_id_dictionary(v4l2_devices)
+            logger.debug(f"Probing video4linux capture devices: {self._stable_id_dictionary}")
+            return [int(device.camera_id) for device in v4l2_devices]
+
+        return list(range(CAM_CHECK_NUM))
+
+
+
+def _release_abandoned_capture(future):
+    try:
+        cap = future.result()
+    except Exception:
+        return
+    if cap is not None:
+        cap.release()
+
 
 if __name__ == '__main__':
     DetectPossibleCameras().find_available_cameras()
\ No newline at end of file
@@ -0,0 +1,144 @@
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+SYSFS_VIDEO4LINUX_PATH = "/sys/class/video4linux"
+DEV_V4L_PATH = "/dev/v4l"
+
+_VIDEO_NODE_NAME_REGEX = re.compile(r"^video(\d+)$")
+
+
+class V4L2Device(BaseModel):
+    camera_id: str  # the `N` in `/dev/videoN`, i.e. what `cv2.VideoCapture` expects
+    device_path: str
+    name: str = ""
+    stable_id: str
+    by_id_path: Optional[str] = None
+    by_path_path: Optional[str] = None
+
+
+def enumerate_v4l2_devices(
+        sysfs_root: Union[str, Path] = SYSFS_VIDEO4LINUX_PATH,
+        dev_v4l_root: Union[str, Path] = DEV_V4L_PATH,
+) -> List[V4L2Device]:
+    """
+    List the capture-capable video4linux devices without opening them.
+
+    UVC cameras register a metadata node next to each capture node - these report `index` 1 (or higher) in sysfs
+    and are skipped. Each device gets a `stable_id` that survives reboots and re-plugging: the `/dev/v4l/by-id`
+    name when there is one, then the USB vendor/product/serial, then the `/dev/v4l/by-path` name (i.e. the port).
+    """
+    sysfs_root = Path(sysfs_root)
+    if not sysfs_root.is_dir():
+        logger.debug(f"No video4linux sysfs folder at {sysfs_root}")
+        return []
+
+    by_id_links = _read_device_links(Path(dev_v4l_root) / "by-id")
+    by_path_links = _read_device_links(Path(dev_v4l_root) / "by-path")
+
+    devices = []
+    for node_path in sysfs_root.iterdir():
+        match = _VIDEO_NODE_NAME_REGEX.match(node_path.name)
+        if match is None:
+            continue
+
+        node_index = _read_sysfs_attribute(node_path / "index")
+        if node_index is not None and node_index != "0":
+            logger.debug(f"Skipping {node_path.name} - not a capture node (index: {node_index})")
+            continue
+
+        by_id_path = by_id_links.get(node_path.name)
+        by_path_path = by_path_links.get(node_path.name)
+        name = _read_sysfs_attribute(node_path / "name") or ""
+
+        devices.append(
+            V4L2Device(
+                camera_id=match.group(1),
+                device_path=f"/dev/{node_path.name}",
+                name=name,
+                stable_id=_get_stable_id(node_path=node_path,
+                                         name=name,
+                                         by_id_path=by_id_path,
+                                         by_path_path=by_path_path),
+                by_id_path=by_id_path,
+                by_path_path=by_path_path,
+            )
+        )
+
+    devices.sort(key=lambda device: int(device.camera_id))
+    logger.debug(f"Found video4linux capture devices: {[device.device_path for device in devices]}")
+    return devices
+
+
+def get_stable_id_dictionary(devices: List[V4L2Device]) -> Dict[str, str]:
+    return {device.camera_id: device.stable_id for device in devices}
+
+
+def find_camera_id_by_stable_id(stable_id: str, devices: List[V4L2Device] = None) -> Optional[str]:
+    if devices is None:
+        devices = enumerate_v4l2_devices()
+    for device in devices:
+        if device.stable_id == stable_id:
+            return device.camera_id
+    return None
+
+
+def _get_stable_id(node_path: Path, name: str, by_id_path: Optional[str], by_path_path: Optional[str]) -> str:
+    if by_id_path is not None:
+        return Path(by_id_path).name
+
+    usb_device_path = _find_usb_device_path(node_path)
+    if usb_device_path is not None:
+        vendor_id = _read_sysfs_attribute(usb_device_path / "idVendor")
+        product_id = _read_sysfs_attribute(usb_device_path / "idProduct")
+        serial = _read_sysfs_attribute(usb_device_path / "serial")
+        if serial:
+            return f"usb-{vendor_id}:{product_id}-{serial}"
+
+    if by_path_path is not None:
+        return Path(by_path_path).name
+
+    return f"{name or 'video'}-{node_path.name}"
+
+
+def _find_usb_device_path(node_path: Path) -> Optional[Path]:
+    """The `device` link of a UVC node points at its USB interface; vendor/product/serial live one level up"""
+    device_path = node_path / "device"
+    if not device_path.exists():
+        return None
+    device_path = device_path.resolve()
+    for candidate_path in (device_path, device_path.parent):
+        if (candidate_path / "idVendor").exists():
+            return candidate_path
+    return None
+
+
+def _read_device_links(links_folder: Path) -> Dict[str, str]:
+    """Map `videoN` to the symlink (in `/dev/v4l/by-id` or `/dev/v4l/by-path`) that points at it"""
+    links = {}
+    if not links_folder.is_dir():
+        return links
+    for link_path in sorted(links_folder.iterdir()):
+        if not link_path.is_symlink():
+            continue
+        target_name = Path(os.readlink(link_path)).name
+        links.setdefault(target_name, str(link_path))
+    return links
+
+
+def _read_sysfs_attribute(attribute_path: Path) -> Optional[str]:
+    try:
+        return attribute_path.read_text().strip()
+    except OSError:
+        return None
+
+
+if __name__ == "__main__":
+    for v4l2_device in enumerate_v4l2_devices():
+        print(v4l2_device)
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 
 from pydantic import BaseModel
 
@@ -6,6 +6,7 @@ from pydantic import BaseModel
 class FoundCameraCache(BaseModel):
     number_of_cameras_found: int
     cameras_found_list: List[str]
+    stable_ids: Dict[str, str] = {}  # camera_id -> identity that survives reboots/re-plugging (where available)
 
 
     @property
@@ -0,0 +1,105 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import platform
+import select
+import struct
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# from <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000  # events were lost - whoever's watching should rescan
+IN_IGNORED = 0x00008000  # the watch is gone (e.g. its folder was deleted)
+IN_ONLYDIR = 0x01000000
+
+_INOTIFY_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len - then `len` bytes of (null padded) name
+_READ_SIZE_BYTES = 64 * 1024
+
+_libc = None
+
+
+def is_inotify_available() -> bool:
+    return platform.system() == "Linux" and _get_libc() is not None
+
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        except OSError as e:
+            logger.debug(f"inotify isn't available - can't load the C library: {e}")
+            return None
+        if not hasattr(libc, "inotify_init1") or not hasattr(libc, "inotify_add_watch"):
+            logger.debug("inotify isn't available - the C library doesn't have it")
+            return None
+        _libc = libc
+    return _libc
+
+
+class Inotify:
+    """
+    The bits of Linux's inotify we need, through ctypes (no extra dependency): watch folders for entries being
+    created/deleted/moved, and wait for that to happen
+    """
+
+    def __init__(self):
+        libc = _get_libc()
+        if libc is None or platform.system() != "Linux":
+            raise OSError("inotify isn't available on this platform")
+        self._libc = libc
+        self._file_descriptor = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._file_descriptor < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, f"inotify_init1 failed: {os.strerror(error_number)}")
+        # written to by `wake`, so `read_events` returns without an event (e.g. to stop a thread blocked in it)
+        self._wake_read_descriptor, self._wake_write_descriptor = os.pipe()
+
+    def add_watch(self, folder_path: Union[str, Path],
+                  mask: int = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_ONLYDIR) -> int:
+        watch_descriptor = self._libc.inotify_add_watch(self._file_descriptor, os.fsencode(str(folder_path)), mask)
+        if watch_descriptor < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, f"Can't watch {folder_path}: {os.strerror(error_number)}")
+        return watch_descriptor
+
+    def read_events(self, timeout_seconds: Optional[float] = None) -> List[Tuple[int, str]]:
+        """Wait (up to `timeout_seconds`, forever if None) for events - returns their `(mask, name)`s"""
+        readable_descriptors, _, _ = select.select([self._file_descriptor, self._wake_read_descriptor], [], [],
+                                                   timeout_seconds)
+        if self._wake_read_descriptor in readable_descriptors:
+            os.read(self._wake_read_descriptor, 1024)
+        if self._file_descriptor not in readable_descriptors:
+            return []
+        try:
+            buffer = os.read(self._file_descriptor, _READ_SIZE_BYTES)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + _INOTIFY_EVENT_HEADER.size <= len(buffer):
+            _, mask, _, name_length = _INOTIFY_EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _INOTIFY_EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset:offset + name_length].rstrip(b"\0"))
+            offset += name_length
+            events.append((mask, name))
+        return events
+
+    def wake(self):
+        os.write(self._wake_write_descriptor, b"\0")
+
+    def close(self):
+        for file_descriptor in (self._file_descriptor, self._wake_read_descriptor, self._wake_write_descriptor):
+            try:
+                os.close(file_descriptor)
+            except OSError:
+                pass
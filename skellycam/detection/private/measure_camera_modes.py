@@ -0,0 +1,100 @@
+import logging
+import time
+from typing import List, Tuple
+
+import cv2
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+CANDIDATE_RESOLUTIONS: List[Tuple[int, int]] = [(640, 480), (960, 540), (1280, 720), (1920, 1080)]
+CANDIDATE_FOURCCS: List[str] = ["MJPG", "YUYV"]
+REQUESTED_FRAMERATE = 60
+NUMBER_OF_FRAMES_TO_MEASURE = 6
+
+
+class CameraMode(BaseModel):
+    resolution_width: int
+    resolution_height: int
+    fourcc: str
+    measured_framerate: float
+
+    @property
+    def resolution_key(self) -> str:
+        return f"{self.resolution_width}x{self.resolution_height}"
+
+
+def measure_camera_modes(
+        capture: cv2.VideoCapture,
+        candidate_resolutions: List[Tuple[int, int]] = None,
+        candidate_fourccs: List[str] = None,
+) -> List[CameraMode]:
+    """
+    Step an open capture through candidate fourcc/resolution combinations and measure the framerate each one
+    actually sustains. Modes the camera silently substitutes (e.g. a resolution it doesn't support) are recorded as
+    what the camera really delivered, and duplicates are dropped.
+
+    This takes a few seconds per camera, so the results are meant to be cached (see `CameraCapabilityCache`)
+    """
+    if candidate_resolutions is None:
+        candidate_resolutions = CANDIDATE_RESOLUTIONS
+    if candidate_fourccs is None:
+        candidate_fourccs = CANDIDATE_FOURCCS
+
+    measured_modes = {}
+    for fourcc in candidate_fourccs:
+        for resolution_width, resolution_height in candidate_resolutions:
+            try:
+                capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+                capture.set(cv2.CAP_PROP_FRAME_WIDTH, resolution_width)
+                capture.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution_height)
+                capture.set(cv2.CAP_PROP_FPS, REQUESTED_FRAMERATE)
+                mode = _measure_current_mode(capture)
+            except Exception as e:
+                logger.debug(f"Failed to measure mode {fourcc} {resolution_width}x{resolution_height}: {e}")
+                continue
+
+            if mode is None:
+                continue
+
+            mode_key = (mode.resolution_width, mode.resolution_height, mode.fourcc)
+            if mode_key not in measured_modes or measured_modes[mode_key].measured_framerate < mode.measured_framerate:
+                measured_modes[mode_key] = mode
+
+    logger.debug(f"Measured camera modes: {list(measured_modes.values())}")
+    return list(measured_modes.values())
+
+
+def get_best_fourcc_per_resolution(camera_modes: List[CameraMode]):
+    """For each resolution, the fourcc that sustained the highest framerate (earlier candidates win ties)"""
+    best_modes = {}
+    for mode in camera_modes:
+        best_mode = best_modes.get(mode.resolution_key)
+        if best_mode is None or mode.measured_framerate > best_mode.measured_framerate:
+            best_modes[mode.resolution_key] = mode
+    return {resolution_key: mode.fourcc for resolution_key, mode in best_modes.items()}
+
+
+def decode_fourcc(fourcc_value: float) -> str:
+    fourcc_int = int(fourcc_value)
+    return "".join(chr((fourcc_int >> 8 * byte_number) & 0xFF) for byte_number in range(4))
+
+
+def _measure_current_mode(capture: cv2.VideoCapture):
+    success, image = capture.read()  # first frame after a mode change is often slow
+    if not success or image is None:
+        return None
+
+    start_time = time.perf_counter()
+    for _ in range(NUMBER_OF_FRAMES_TO_MEASURE):
+        success, image = capture.read()
+        if not success or image is None:
+            return None
+    elapsed_time = time.perf_counter() - start_time
+
+    return CameraMode(
+        resolution_width=image.shape[1],
+        resolution_height=image.shape[0],
+        fourcc=decode_fourcc(capture.get(cv2.CAP_PROP_FOURCC)),
+        measured_framerate=round(NUMBER_OF_FRAMES_TO_MEASURE / elapsed_time, 2),
+    )
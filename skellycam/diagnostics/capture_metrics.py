@@ -0,0 +1,251 @@
+import collections
+import logging
+import threading
+import weakref
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from skellycam.detection.models.frame_payload import FramePayload
+
+logger = logging.getLogger(__name__)
+
+FRAME_INTERVAL_WINDOW_SIZE = 300  # frames - ~10 seconds at 30 fps
+FRAME_INTERVAL_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class CameraMetrics:
+    """Running per-camera counters, updated as frames are delivered to (and recorded in) the main process"""
+
+    def __init__(self, camera_id: str):
+        self.camera_id = camera_id
+        self.frames_delivered = 0
+        self.frames_recorded = 0
+        self.ipc_bytes = 0
+        self.queue_depth = 0
+        self._frames_grabbed_before_restarts = 0
+        self._latest_number_of_frames_received = 0
+        # (timestamp_ns, ipc bytes) of the most recent deliveries
+        self._recent_deliveries: Deque[Tuple[float, int]] = collections.deque(maxlen=FRAME_INTERVAL_WINDOW_SIZE)
+
+    @property
+    def frames_grabbed(self) -> int:
+        """As of the latest delivered frame (each frame carries its capture thread's count)"""
+        return self._frames_grabbed_before_restarts + self._latest_number_of_frames_received
+
+    @property
+    def frames_dropped(self) -> int:
+        """Grabbed before the latest delivered frame, but never delivered themselves (e.g. overwritten)"""
+        return max(self.frames_grabbed - self.frames_delivered, 0)
+
+    def add_delivered_frame(self, frame_payload: FramePayload, ipc_bytes: int):
+        if frame_payload.number_of_frames_received is not None:
+            if frame_payload.number_of_frames_received < self._latest_number_of_frames_received:
+                # the capture was restarted, and its count with it
+                self._frames_grabbed_before_restarts += self._latest_number_of_frames_received
+            self._latest_number_of_frames_received = frame_payload.number_of_frames_received
+        self.frames_delivered += 1
+        self.ipc_bytes += ipc_bytes
+        if frame_payload.timestamp_ns is not None:
+            self._recent_deliveries.append((frame_payload.timestamp_ns, ipc_bytes))
+
+    def get_frames_per_second(self) -> float:
+        if len(self._recent_deliveries) < 2:
+            return 0.0
+        duration_ns = self._recent_deliveries[-1][0] - self._recent_deliveries[0][0]
+        return (len(self._recent_deliveries) - 1) / (duration_ns / 1e9) if duration_ns > 0 else 0.0
+
+    def get_ipc_bytes_per_second(self) -> float:
+        if len(self._recent_deliveries) < 2:
+            return 0.0
+        duration_ns = self._recent_deliveries[-1][0] - self._recent_deliveries[0][0]
+        # the first delivery in the window marks its start, its bytes came before it
+        window_bytes = sum(ipc_bytes for _, ipc_bytes in list(self._recent_deliveries)[1:])
+        return window_bytes / (duration_ns / 1e9) if duration_ns > 0 else 0.0
+
+    def get_frame_interval_quantiles_seconds(self) -> Dict[float, float]:
+        if len(self._recent_deliveries) < 2:
+            return {}
+        frame_intervals_seconds = np.diff([timestamp_ns for timestamp_ns, _ in self._recent_deliveries]) / 1e9
+        return {quantile: float(np.quantile(frame_intervals_seconds, quantile))
+                for quantile in FRAME_INTERVAL_QUANTILES}
+
+
+class CaptureMetrics:
+    """
+    Collects what the main process knows about each camera: deliveries from the capture strategies (pushed per
+    frame), queue depths from the live `CameraGroup`s and backlog/memory from the live `VideoRecorder`s (both pulled
+    when the metrics are read). Rendered in the Prometheus text format by `to_prometheus_text()`
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._camera_metrics: Dict[str, CameraMetrics] = {}
+        self._camera_groups = weakref.WeakSet()
+        self._video_recorders = weakref.WeakSet()
+
+    def add_camera_group(self, camera_group):
+        self._camera_groups.add(camera_group)
+
+    def add_video_recorder(self, video_recorder):
+        self._video_recorders.add(video_recorder)
+
+    def add_delivered_frames(self, frame_payload_dictionary: Dict[str, Optional[FramePayload]], is_ipc: bool):
+        """:param is_ipc: whether these frames were copied across processes to get here"""
+        with self._lock:
+            for camera_id, frame_payload in frame_payload_dictionary.items():
+                if frame_payload is None:
+                    continue
+                ipc_bytes = frame_payload.image.nbytes if is_ipc and frame_payload.image is not None else 0
+                self._get_camera_metrics(camera_id).add_delivered_frame(frame_payload, ipc_bytes)
+
+    def add_recorded_frame(self, camera_id: str):
+        with self._lock:
+            self._get_camera_metrics(camera_id).frames_recorded += 1
+
+    def get_camera_metrics(self) -> Dict[str, CameraMetrics]:
+        with self._lock:
+            return dict(self._camera_metrics)
+
+    def to_prometheus_text(self) -> str:
+        with self._lock:
+            self._update_queue_depths()
+            recorder_backlog, recorder_memory_bytes = self._get_recorder_usage()
+            restart_statistics = self._get_restart_statistics()
+            pause_statistics = self._get_pause_statistics()
+            camera_metrics_list = sorted(self._camera_metrics.values(), key=lambda metrics: metrics.camera_id)
+
+            def _per_camera(get_value) -> List[Tuple[Dict[str, str], float]]:
+                return [({"camera_id": metrics.camera_id}, get_value(metrics)) for metrics in camera_metrics_list]
+
+            metric_families = [
+                ("skellycam_frames_grabbed_total", "counter", "Frames grabbed by the camera's capture thread",
+                 _per_camera(lambda metrics: metrics.frames_grabbed)),
+                ("skellycam_frames_delivered_total", "counter", "Frames delivered to the main process",
+                 _per_camera(lambda metrics: metrics.frames_delivered)),
+                ("skellycam_frames_dropped_total", "counter", "Frames grabbed but never delivered",
+                 _per_camera(lambda metrics: metrics.frames_dropped)),
+                ("skellycam_frames_recorded_total", "counter", "Frames handed to a video recorder",
+                 _per_camera(lambda metrics: metrics.frames_recorded)),
+                ("skellycam_frames_per_second", "gauge", "Delivered frame rate over the recent window",
+                 _per_camera(lambda metrics: metrics.get_frames_per_second())),
+                ("skellycam_frame_interval_seconds", "summary",
+                 "Time between delivered frames (by capture timestamp) over the recent window",
+                 [({"camera_id": metrics.camera_id, "quantile": str(quantile)}, interval_seconds)
+                  for metrics in camera_metrics_list
+                  for quantile, interval_seconds in metrics.get_frame_interval_quantiles_seconds().items()]),
+                ("skellycam_queue_depth", "gauge", "Frames waiting in the camera's queue",
+                 _per_camera(lambda metrics: metrics.queue_depth)),
+                ("skellycam_ipc_bytes_total", "counter", "Image bytes copied from the capture processes",
+                 _per_camera(lambda metrics: metrics.ipc_bytes)),
+                ("skellycam_ipc_bytes_per_second", "gauge", "Image bytes/s copied from the capture processes",
+                 _per_camera(lambda metrics: metrics.get_ipc_bytes_per_second())),
+                ("skellycam_encoder_backlog_frames", "gauge", "Recorded frames not yet written to video",
+                 _per_camera(lambda metrics: recorder_backlog.get(metrics.camera_id, 0))),
+                ("skellycam_recorder_memory_bytes", "gauge", "Image memory held by video recorders",
+                 _per_camera(lambda metrics: recorder_memory_bytes.get(metrics.camera_id, 0))),
+                ("skellycam_capture_process_restarts_total", "counter",
+                 "Times the camera's capture process was restarted by the supervisor",
+                 _per_camera(lambda metrics: restart_statistics[metrics.camera_id].number_of_restarts
+                             if metrics.camera_id in restart_statistics else 0)),
+                ("skellycam_capture_downtime_seconds_total", "counter",
+                 "Time the camera spent restarting with its capture process",
+                 _per_camera(lambda metrics: restart_statistics[metrics.camera_id].downtime_seconds
+                             if metrics.camera_id in restart_statistics else 0.0)),
+                ("skellycam_capture_paused", "gauge", "1 while the camera's capture is paused (the camera stays open)",
+                 _per_camera(lambda metrics: int(pause_statistics[metrics.camera_id].is_paused)
+                             if metrics.camera_id in pause_statistics else 0)),
+                ("skellycam_capture_paused_seconds_total", "counter", "Time the camera's capture spent paused",
+                 _per_camera(lambda metrics: pause_statistics[metrics.camera_id].paused_seconds
+                             if metrics.camera_id in pause_statistics else 0.0)),
+                ("skellycam_resume_latency_seconds", "gauge",
+                 "Time from the last resume until the camera's first frame after it was delivered",
+                 [({"camera_id": metrics.camera_id}, pause_statistics[metrics.camera_id].resume_latency_seconds)
+                  for metrics in camera_metrics_list
+                  if metrics.camera_id in pause_statistics
+                  and pause_statistics[metrics.camera_id].resume_latency_seconds is not None]),
+            ]
+
+        lines = []
+        for name, metric_type, help_text, samples in metric_families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._camera_metrics = {}
+
+    def _get_camera_metrics(self, camera_id: str) -> CameraMetrics:
+        camera_id = str(camera_id)
+        if camera_id not in self._camera_metrics:
+            self._camera_metrics[camera_id] = CameraMetrics(camera_id)
+        return self._camera_metrics[camera_id]
+
+    def _update_queue_depths(self):
+        for camera_group in list(self._camera_groups):
+            try:
+                queue_size_dictionary = camera_group.queue_size
+            except Exception as e:
+                logger.debug(f"Could not read queue sizes: {e}")
+                continue
+            for camera_id, queue_size in queue_size_dictionary.items():
+                if queue_size is not None:
+                    self._get_camera_metrics(camera_id).queue_depth = queue_size
+
+    def _get_restart_statistics(self) -> dict:
+        restart_statistics = {}
+        for camera_group in list(self._camera_groups):
+            try:
+                restart_statistics.update(camera_group.restart_statistics)
+            except Exception as e:
+                logger.debug(f"Could not read restart statistics: {e}")
+        return restart_statistics
+
+    def _get_pause_statistics(self) -> dict:
+        pause_statistics = {}
+        for camera_group in list(self._camera_groups):
+            try:
+                if not camera_group.is_capturing:
+                    continue  # closed (but not yet collected) - it isn't paused, or anything else
+                pause_statistics.update(camera_group.pause_statistics)
+            except Exception as e:
+                logger.debug(f"Could not read pause statistics: {e}")
+        return pause_statistics
+
+    def _get_recorder_usage(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        backlog: Dict[str, int] = collections.defaultdict(int)
+        memory_bytes: Dict[str, int] = collections.defaultdict(int)
+        for video_recorder in list(self._video_recorders):
+            camera_id = video_recorder.camera_id
+            if camera_id is None:
+                continue
+            backlog[camera_id] += video_recorder.number_of_frames_to_write
+            memory_bytes[camera_id] += video_recorder.memory_bytes
+        return backlog, memory_bytes
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    formatted_labels = [f'{key}="{_escape_label_value(str(value))}"' for key, value in labels.items()]
+    return "{" + ",".join(formatted_labels) + "}"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+# No consumer should call this "private" variable
+_capture_metrics = CaptureMetrics()
+
+
+def get_capture_metrics() -> CaptureMetrics:
+    return _capture_metrics
+
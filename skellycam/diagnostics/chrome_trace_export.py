@@ -0,0 +1,93 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Union
+
+from skellycam.diagnostics.frame_tracing import FrameStage, FrameTrace, get_recorded_frame_traces
+
+logger = logging.getLogger(__name__)
+
+# span name -> (the stage that ends it, the stages that can start it, in order of preference)
+TRACE_SPANS = {
+    "grab": (FrameStage.GRAB_END, (FrameStage.GRAB_START,)),
+    "retrieve": (FrameStage.RETRIEVE_END, (FrameStage.GRAB_END,)),
+    "rotate": (FrameStage.ROTATE_END, (FrameStage.RETRIEVE_END,)),
+    "enqueue": (FrameStage.ENQUEUE, (FrameStage.ROTATE_END, FrameStage.RETRIEVE_END)),
+    # same-process cameras hand their frames over without a queue
+    "queue": (FrameStage.DEQUEUE, (FrameStage.ENQUEUE, FrameStage.ROTATE_END, FrameStage.RETRIEVE_END)),
+    "display": (FrameStage.DISPLAY, (FrameStage.DEQUEUE,)),
+    "record": (FrameStage.RECORD, (FrameStage.DEQUEUE,)),
+    "write": (FrameStage.WRITE_END, (FrameStage.WRITE_START,)),
+}
+
+
+def create_chrome_trace_events(frame_traces: List[FrameTrace]) -> List[Dict]:
+    """
+    Chrome trace ("Trace Event Format") events for these frames - one track (`tid`) per camera within each process
+    (`pid`), with a complete ("X") event per stage of each frame's life. Open in `chrome://tracing` or
+    https://ui.perfetto.dev
+    """
+    all_timestamps_ns = [timestamp_ns
+                         for frame_trace in frame_traces
+                         for _, timestamp_ns, _ in frame_trace.stage_marks]
+    if len(all_timestamps_ns) == 0:
+        return []
+    origin_ns = min(all_timestamps_ns)
+
+    camera_track_ids = {camera_id: track_id
+                        for track_id, camera_id in enumerate(sorted({frame_trace.camera_id
+                                                                     for frame_trace in frame_traces}))}
+    tracks = set()
+    events = []
+    for frame_trace in frame_traces:
+        track_id = camera_track_ids[frame_trace.camera_id]
+        for span_name, (end_stage, start_stages) in TRACE_SPANS.items():
+            # a frame can be written more than once (synchronization may repeat it), so pair every end mark up
+            for end_index, (stage, end_timestamp_ns, process_id) in enumerate(frame_trace.stage_marks):
+                if stage != end_stage:
+                    continue
+                start_timestamp_ns = _find_start_timestamp_ns(frame_trace, start_stages, end_index)
+                if start_timestamp_ns is None:
+                    continue
+                tracks.add((process_id, track_id, frame_trace.camera_id))
+                events.append({
+                    "name": span_name,
+                    "cat": "frame",
+                    "ph": "X",
+                    "ts": (start_timestamp_ns - origin_ns) / 1e3,
+                    "dur": max(end_timestamp_ns - start_timestamp_ns, 0) / 1e3,
+                    "pid": process_id,
+                    "tid": track_id,
+                    "args": {"camera_id": frame_trace.camera_id, "frame_number": frame_trace.frame_number},
+                })
+
+    this_process_id = os.getpid()
+    for process_id in sorted({process_id for process_id, _, _ in tracks}):
+        process_name = "skellycam" if process_id == this_process_id else "capture process"
+        events.append({"name": "process_name", "ph": "M", "pid": process_id, "tid": 0,
+                       "args": {"name": f"{process_name} (pid {process_id})"}})
+    for process_id, track_id, camera_id in sorted(tracks):
+        events.append({"name": "thread_name", "ph": "M", "pid": process_id, "tid": track_id,
+                       "args": {"name": f"Camera {camera_id}"}})
+    return events
+
+
+def export_chrome_trace(trace_file_path: Union[str, Path], frame_traces: List[FrameTrace] = None) -> Path:
+    """Write the frame traces (by default, everything in this process's ring buffer) as Chrome/Perfetto trace JSON"""
+    if frame_traces is None:
+        frame_traces = get_recorded_frame_traces()
+    trace_file_path = Path(trace_file_path)
+    trace_file_path.parent.mkdir(parents=True, exist_ok=True)
+    trace_file_path.write_text(json.dumps({"traceEvents": create_chrome_trace_events(frame_traces),
+                                           "displayTimeUnit": "ms"}))
+    logger.info(f"Saved trace of {len(frame_traces)} frames to: {trace_file_path}")
+    return trace_file_path
+
+
+def _find_start_timestamp_ns(frame_trace: FrameTrace, start_stages, end_index: int):
+    for start_stage in start_stages:
+        for stage, timestamp_ns, _ in reversed(frame_trace.stage_marks[:end_index]):
+            if stage == start_stage:
+                return timestamp_ns
+    return None
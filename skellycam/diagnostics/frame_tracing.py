@@ -0,0 +1,97 @@
+import collections
+import dataclasses
+import logging
+import os
+import threading
+import time
+from typing import Deque, List, Optional, Tuple
+
+from skellycam.detection.models.frame_payload import FramePayload
+
+logger = logging.getLogger(__name__)
+
+FRAME_TRACING_ENVIRONMENT_VARIABLE = "SKELLYCAM_TRACE_FRAMES"
+DEFAULT_FRAME_TRACE_BUFFER_SIZE = 10_000  # frames (not stages) - ~1 minute of 4 cameras at 30 fps
+
+# (stage name, `perf_counter_ns` timestamp, process id) - `perf_counter_ns` is system-wide, so marks from the
+# capture processes and the consumer process share one clock
+StageMark = Tuple[str, int, int]
+
+
+class FrameStage:
+    GRAB_START = "grab_start"
+    GRAB_END = "grab_end"
+    RETRIEVE_END = "retrieve_end"
+    ROTATE_END = "rotate_end"
+    ENQUEUE = "enqueue"
+    DEQUEUE = "dequeue"
+    DISPLAY = "display"
+    RECORD = "record"
+    WRITE_START = "write_start"
+    WRITE_END = "write_end"
+
+
+@dataclasses.dataclass()
+class FrameTrace:
+    camera_id: str
+    frame_number: int
+    stage_marks: List[StageMark]
+
+
+def enable_frame_tracing():
+    """
+    Turn tracing on for this process and any capture process started after this
+    (it's also on if `SKELLYCAM_TRACE_FRAMES=1` is set before starting skellycam)
+    """
+    os.environ[FRAME_TRACING_ENVIRONMENT_VARIABLE] = "1"
+
+
+def is_frame_tracing_enabled() -> bool:
+    return os.environ.get(FRAME_TRACING_ENVIRONMENT_VARIABLE, "0") not in ("", "0", "false", "False")
+
+
+def start_stage_marks() -> List[StageMark]:
+    """A new (traced) frame's marks, starting with `grab_start` - the capture thread attaches them to the payload"""
+    return [(FrameStage.GRAB_START, time.perf_counter_ns(), os.getpid())]
+
+
+def add_stage_mark(stage_marks: List[StageMark], stage: str):
+    stage_marks.append((stage, time.perf_counter_ns(), os.getpid()))
+
+
+def mark_frame_stage(frame_payload: FramePayload, stage: str):
+    """Timestamp a stage of this frame's life - does nothing unless the frame was traced when it was captured"""
+    if frame_payload is None or frame_payload.stage_marks is None:
+        return
+    add_stage_mark(frame_payload.stage_marks, stage)
+
+
+# No consumer should call these "private" variables
+_frame_trace_buffer: Deque[FrameTrace] = collections.deque(maxlen=DEFAULT_FRAME_TRACE_BUFFER_SIZE)
+_frame_trace_buffer_lock = threading.Lock()
+
+
+def record_frame_trace(frame_payload: FramePayload):
+    """
+    Keep this frame's trace in this process's ring buffer (the oldest frames fall out once it's full).
+    Called when a frame reaches the consumer - the trace is kept by reference, so later stages (display, record,
+    write) still show up in it
+    """
+    if frame_payload is None or frame_payload.stage_marks is None:
+        return
+    with _frame_trace_buffer_lock:
+        _frame_trace_buffer.append(FrameTrace(camera_id=str(frame_payload.camera_id),
+                                              frame_number=frame_payload.number_of_frames_received,
+                                              stage_marks=frame_payload.stage_marks))
+
+
+def get_recorded_frame_traces() -> List[FrameTrace]:
+    with _frame_trace_buffer_lock:
+        return list(_frame_trace_buffer)
+
+
+def clear_recorded_frame_traces(buffer_size: Optional[int] = None):
+    """Empty the ring buffer, optionally resizing it"""
+    global _frame_trace_buffer
+    with _frame_trace_buffer_lock:
+        _frame_trace_buffer = collections.deque(maxlen=buffer_size or _frame_trace_buffer.maxlen)
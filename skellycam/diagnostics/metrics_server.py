@@ -0,0 +1,74 @@
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from skellycam.diagnostics.capture_metrics import get_capture_metrics
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT_ENVIRONMENT_VARIABLE = "SKELLYCAM_METRICS_PORT"
+DEFAULT_METRICS_HOST = "127.0.0.1"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = get_capture_metrics().to_prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # scrapes every few seconds would drown the log
+        pass
+
+
+class MetricsServer:
+    """Serves `get_capture_metrics()` at `http://<host>:<port>/metrics` from a background thread"""
+
+    def __init__(self, port: int, host: str = DEFAULT_METRICS_HOST):
+        self._http_server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+        self._http_server.daemon_threads = True
+        self._thread = threading.Thread(target=self._http_server.serve_forever,
+                                        name="MetricsServer",
+                                        daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._http_server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self._thread.start()
+        logger.info(f"Serving metrics at {self.url}")
+
+    def stop(self):
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        self._thread.join()
+
+
+def start_metrics_server(port: int, host: str = DEFAULT_METRICS_HOST) -> MetricsServer:
+    """:param port: 0 picks a free port (see `MetricsServer.url`)"""
+    metrics_server = MetricsServer(port=port, host=host)
+    metrics_server.start()
+    return metrics_server
+
+
+def start_metrics_server_from_environment() -> Optional[MetricsServer]:
+    """Start the metrics server if `SKELLYCAM_METRICS_PORT` is set - it's off by default"""
+    port = os.environ.get(METRICS_PORT_ENVIRONMENT_VARIABLE)
+    if not port:
+        return None
+    try:
+        return start_metrics_server(port=int(port))
+    except (ValueError, OSError) as e:
+        logger.error(f"Could not start the metrics server on port {port}: {e}")
+        return None
@@ -0,0 +1,244 @@
+import collections
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from skellycam.system.environment.default_paths import get_iso6201_time_string, get_profiles_folder_path
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENVIRONMENT_VARIABLE = "SKELLYCAM_PROFILE"  # e.g. "cpu,memory"
+PROFILE_SECONDS_ENVIRONMENT_VARIABLE = "SKELLYCAM_PROFILE_SECONDS"
+PROFILE_MODES = ("cpu", "sampling", "memory")
+DEFAULT_PROFILE_DURATION_SECONDS = 30.0
+SAMPLING_INTERVAL_SECONDS = 0.005
+TRACEMALLOC_NUMBER_OF_FRAMES = 10
+NUMBER_OF_SUMMARY_LINES = 40
+
+
+class ProfilingRequest(BaseModel):
+    """
+    - "cpu": cProfile of the thread running the loop (the capture process's dispatch loop, the GUI frame loop, ...)
+    - "sampling": the stacks of every thread in the process, sampled every few milliseconds (e.g. the capture threads)
+    - "memory": a `tracemalloc` snapshot at the end of the window
+    """
+    modes: List[str] = ["cpu"]
+    duration_seconds: float = DEFAULT_PROFILE_DURATION_SECONDS
+    output_folder_path: Optional[str] = None  # default: the `profiles` folder next to the logs
+
+
+def parse_profile_modes(profile_modes_string: str) -> List[str]:
+    profile_modes = [mode.strip() for mode in profile_modes_string.split(",") if mode.strip() != ""]
+    unknown_profile_modes = [mode for mode in profile_modes if mode not in PROFILE_MODES]
+    if len(unknown_profile_modes) > 0:
+        raise ValueError(f"Unknown profile mode(s) {unknown_profile_modes} - choose from {PROFILE_MODES}")
+    return profile_modes
+
+
+def set_profiling_environment(profiling_request: ProfilingRequest):
+    """So processes started after this (e.g. capture processes) profile themselves too"""
+    os.environ[PROFILE_ENVIRONMENT_VARIABLE] = ",".join(profiling_request.modes)
+    os.environ[PROFILE_SECONDS_ENVIRONMENT_VARIABLE] = str(profiling_request.duration_seconds)
+
+
+def get_profiling_request_from_environment() -> Optional[ProfilingRequest]:
+    profile_modes_string = os.environ.get(PROFILE_ENVIRONMENT_VARIABLE, "")
+    if profile_modes_string.strip() == "":
+        return None
+    try:
+        return ProfilingRequest(
+            modes=parse_profile_modes(profile_modes_string),
+            duration_seconds=float(os.environ.get(PROFILE_SECONDS_ENVIRONMENT_VARIABLE,
+                                                  DEFAULT_PROFILE_DURATION_SECONDS)),
+        )
+    except ValueError as e:
+        logger.error(f"Ignoring ${PROFILE_ENVIRONMENT_VARIABLE}: {e}")
+        return None
+
+
+class StackSampler(threading.Thread):
+    """Samples every other thread's stack, counting them in the "folded" format flamegraph tools read"""
+
+    def __init__(self, interval_seconds: float = SAMPLING_INTERVAL_SECONDS):
+        super().__init__(name="StackSampler", daemon=True)
+        self._interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._stack_counts: Dict[str, int] = collections.Counter()
+        self.number_of_samples = 0
+
+    def run(self):
+        while not self._stop_event.wait(self._interval_seconds):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(f"{frame.f_code.co_name} ({Path(frame.f_code.co_filename).name}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(thread_names.get(thread_id, str(thread_id)))
+                self._stack_counts[";".join(reversed(stack))] += 1
+            self.number_of_samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def to_folded_text(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self._stack_counts.most_common())
+
+
+# No consumer should call these "private" variables
+_number_of_tracemalloc_sessions = 0
+_started_tracemalloc = False
+_tracemalloc_lock = threading.Lock()
+
+
+def _start_tracing_memory():
+    """Sessions overlapping in one process share `tracemalloc` - it's stopped once the last of them is done with it"""
+    global _number_of_tracemalloc_sessions, _started_tracemalloc
+    with _tracemalloc_lock:
+        if _number_of_tracemalloc_sessions == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_NUMBER_OF_FRAMES)
+            _started_tracemalloc = True
+        _number_of_tracemalloc_sessions += 1
+
+
+def _stop_tracing_memory():
+    global _number_of_tracemalloc_sessions, _started_tracemalloc
+    with _tracemalloc_lock:
+        _number_of_tracemalloc_sessions -= 1
+        if _number_of_tracemalloc_sessions == 0 and _started_tracemalloc:
+            tracemalloc.stop()  # (only if we started it - not if whoever did is still using it)
+            _started_tracemalloc = False
+
+
+class ProfilingSession:
+    """
+    Profiles one role (a capture process, the GUI frame loop, the save worker, ...) for a window of time, then dumps
+    the profiles as `<role>_cameras_<ids>_<time>_pid<pid>_<kind>` files.
+
+    Call `start()` from the thread to cProfile, then `check()` from that thread's loop - it ends the session once the
+    window is over (or call `stop()` to end it early)
+    """
+
+    def __init__(self, role: str, profiling_request: ProfilingRequest, camera_ids: List[str] = None):
+        self._role = role
+        self._profiling_request = profiling_request
+        self._camera_ids = [str(camera_id) for camera_id in camera_ids or []]
+        self._stop_time_seconds = None
+        self._cpu_profiler: Optional[cProfile.Profile] = None
+        self._stack_sampler: Optional[StackSampler] = None
+        self._is_tracing_memory = False
+        self._profile_file_paths: List[Path] = []
+        self._file_name_stem = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._stop_time_seconds is not None
+
+    @property
+    def profile_file_paths(self) -> List[Path]:
+        return self._profile_file_paths
+
+    def start(self):
+        logger.info(f"Profiling {self._role} {self._camera_ids} ({', '.join(self._profiling_request.modes)}) "
+                    f"for {self._profiling_request.duration_seconds} seconds")
+        self._file_name_stem = self._create_file_name_stem()
+        modes = self._profiling_request.modes
+        if "memory" in modes:
+            _start_tracing_memory()
+            self._is_tracing_memory = True
+        if "sampling" in modes:
+            self._stack_sampler = StackSampler()
+            self._stack_sampler.start()
+        if "cpu" in modes:
+            self._cpu_profiler = cProfile.Profile()
+            self._cpu_profiler.enable()
+        self._stop_time_seconds = time.perf_counter() + self._profiling_request.duration_seconds
+
+    def check(self) -> bool:
+        """Ends the session if its window is over - returns whether it's still running"""
+        if self.is_running and time.perf_counter() >= self._stop_time_seconds:
+            self.stop()
+        return self.is_running
+
+    def stop(self) -> List[Path]:
+        if not self.is_running:
+            return self._profile_file_paths
+        self._stop_time_seconds = None
+
+        if self._cpu_profiler is not None:
+            self._cpu_profiler.disable()
+            self._save_cpu_profile(self._cpu_profiler)
+            self._cpu_profiler = None
+        if self._stack_sampler is not None:
+            self._stack_sampler.stop()
+            self._save_profile_text("sampling.folded", self._stack_sampler.to_folded_text())
+            self._stack_sampler = None
+        if self._is_tracing_memory:
+            if tracemalloc.is_tracing():
+                self._save_memory_snapshot(tracemalloc.take_snapshot())
+            else:
+                logger.warning(f"No memory snapshot for {self._role} - `tracemalloc` was stopped from elsewhere")
+            _stop_tracing_memory()
+            self._is_tracing_memory = False
+
+        logger.info(f"Saved {self._role} profiles: {[str(path) for path in self._profile_file_paths]}")
+        return self._profile_file_paths
+
+    def _create_file_name_stem(self) -> str:
+        camera_ids_string = ""
+        if len(self._camera_ids) > 0:
+            # ids like `synthetic:0?jitter_ms=2` aren't file name friendly
+            camera_ids_string = "_cameras_" + "-".join(re.sub(r"[^A-Za-z0-9]+", "", camera_id)
+                                                       for camera_id in self._camera_ids)
+        return f"{self._role}{camera_ids_string}_{get_iso6201_time_string()}_pid{os.getpid()}"
+
+    def _get_profile_file_path(self, suffix: str) -> Path:
+        output_folder_path = Path(self._profiling_request.output_folder_path or get_profiles_folder_path())
+        output_folder_path.mkdir(parents=True, exist_ok=True)
+        return output_folder_path / f"{self._file_name_stem}_{suffix}"
+
+    def _save_profile_text(self, suffix: str, text: str):
+        profile_file_path = self._get_profile_file_path(suffix)
+        profile_file_path.write_text(text)
+        self._profile_file_paths.append(profile_file_path)
+
+    def _save_cpu_profile(self, cpu_profiler: cProfile.Profile):
+        profile_file_path = self._get_profile_file_path("cpu.prof")
+        cpu_profiler.dump_stats(str(profile_file_path))
+        self._profile_file_paths.append(profile_file_path)
+
+        summary_stream = io.StringIO()
+        pstats.Stats(cpu_profiler, stream=summary_stream).sort_stats("cumulative").print_stats(NUMBER_OF_SUMMARY_LINES)
+        self._save_profile_text("cpu.txt", summary_stream.getvalue())
+
+    def _save_memory_snapshot(self, snapshot: tracemalloc.Snapshot):
+        profile_file_path = self._get_profile_file_path("memory.tracemalloc")
+        snapshot.dump(str(profile_file_path))
+        self._profile_file_paths.append(profile_file_path)
+
+        top_statistics = snapshot.statistics("lineno")[:NUMBER_OF_SUMMARY_LINES]
+        self._save_profile_text("memory.txt", "".join(f"{statistic}\n" for statistic in top_statistics))
+
+
+def start_profiling_from_environment(role: str, camera_ids: List[str] = None) -> Optional[ProfilingSession]:
+    """Start profiling `role` (from the calling thread) if `SKELLYCAM_PROFILE` is set"""
+    profiling_request = get_profiling_request_from_environment()
+    if profiling_request is None:
+        return None
+    profiling_session = ProfilingSession(role=role, profiling_request=profiling_request, camera_ids=camera_ids)
+    profiling_session.start()
+    return profiling_session
@@ -2,14 +2,19 @@ import logging
 import sys
 from PySide6.QtCore import QTimer
 
+from skellycam.diagnostics.metrics_server import start_metrics_server_from_environment
 from skellycam.gui.qt.skelly_cam_main_window import SkellyCamMainWindow
 from skellycam.gui.qt.utilities.get_qt_app import get_qt_app
+from skellycam.system.environment.default_paths import get_log_file_path
+from skellycam.system.log_config.logsetup import configure_logging
 
 logger = logging.getLogger(__name__)
 
 
 def qt_gui_main():
+    configure_logging(log_file_path=get_log_file_path())
     app = get_qt_app(sys.argv)
+    start_metrics_server_from_environment()
 
     timer = QTimer()
     timer.start(500)
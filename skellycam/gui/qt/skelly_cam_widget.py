@@ -186,6 +186,8 @@ class SkellyCamWidget(QWidget):
         logger.info(f"Starting camera group frame worker with camera_ids: {camera_ids}")
         self._cam_group_frame_worker.annotate_images = self.annotate_images
         self._cam_group_frame_worker.camera_ids = camera_ids
+        # the cameras may have changed under a running worker
+        self._clear_camera_grid_view(self._dictionary_of_single_camera_view_widgets)
         self._dictionary_of_single_camera_view_widgets = self._create_camera_view_widgets_and_add_them_to_grid_layout(
             camera_config_dictionary=self._cam_group_frame_worker.camera_config_dictionary
         )
@@ -228,6 +230,10 @@ class SkellyCamWidget(QWidget):
             self.camera_group_created_signal.emit
         )
 
+        cam_group_frame_worker.cameras_changed_signal.connect(
+            self._handle_cameras_changed
+        )
+
         cam_group_frame_worker.videos_saved_to_this_folder_signal.connect(
             self._handle_cam_group_frame_worker_videos_saved_to_this_folder
         )
@@ -253,14 +259,26 @@ class SkellyCamWidget(QWidget):
         )
         self._start_camera_group_frame_worker(self._camera_ids)
 
+    def _handle_cameras_changed(self, camera_config_dictionary: dict):
+        logger.info(f"Cameras changed (plugged in/unplugged) - now: {list(camera_config_dictionary.keys())}")
+        self._camera_ids = list(camera_config_dictionary.keys())
+        self._clear_camera_grid_view(self._dictionary_of_single_camera_view_widgets)
+        self._dictionary_of_single_camera_view_widgets = self._create_camera_view_widgets_and_add_them_to_grid_layout(
+            camera_config_dictionary=camera_config_dictionary
+        )
+        self.camera_group_created_signal.emit(camera_config_dictionary)
+
     def _handle_cameras_connected(self):
         self.cameras_connected_signal.emit()
         self._reset_detect_available_cameras_button()
 
     @Slot(str, QImage, dict)
     def _handle_image_update(self, camera_id: str, q_image: QImage, frame_diagnostics_dictionary: Dict):
-        self._dictionary_of_single_camera_view_widgets[camera_id].handle_image_update(q_image=q_image,
-                                                                                      frame_diagnostics_dictionary=frame_diagnostics_dictionary)
+        single_camera_view_widget = self._dictionary_of_single_camera_view_widgets.get(camera_id)
+        if single_camera_view_widget is None:
+            return  # a camera just plugged in, whose view isn't there yet
+        single_camera_view_widget.handle_image_update(q_image=q_image,
+                                                      frame_diagnostics_dictionary=frame_diagnostics_dictionary)
 
     def _reset_detect_available_cameras_button(self):
         self._detect_available_cameras_push_button.setText("Detect Available Cameras")
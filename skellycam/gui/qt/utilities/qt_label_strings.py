@@ -8,6 +8,7 @@ ROTATE_180_STRING = "180"
 
 COPY_SETTINGS_TO_CAMERAS_STRING = "Copy settings to all cameras"
 USE_THIS_CAMERA_STRING = "Use this camera?"
+LOW_LATENCY_STRING = "Low Latency"
 EXPAND_ALL_STRING = "Expand All"
 COLLAPSE_ALL_STRING = "Collapse All"
 
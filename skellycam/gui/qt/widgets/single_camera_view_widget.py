@@ -64,9 +64,16 @@ class SingleCameraViewWidget(QWidget):
         frames_recorded = frame_diagnostics_dictionary['frames_recorded']
         if frames_recorded is None:
             frames_recorded = 0
-        self._title_label_widget.setText(
-            self._camera_name_string + f"\nQueue Size:{q_size} | "
-                                       f"Frames Recorded#{str(frames_recorded)}".ljust(38))
+        title_string = self._camera_name_string + f"\nQueue Size:{q_size} | " \
+                                                  f"Frames Recorded#{str(frames_recorded)}".ljust(38)
+        if "frame_interval_jitter_ms" in frame_diagnostics_dictionary:
+            title_string += f"\nJitter:{frame_diagnostics_dictionary['frame_interval_jitter_ms']:.1f}ms | " \
+                            f"Offset:{frame_diagnostics_dictionary['median_offset_ms']:+.1f}ms"
+            if frame_diagnostics_dictionary["is_lagging"]:
+                title_string += " (LAGGING)"
+            if frame_diagnostics_dictionary.get("median_grab_latency_ms") is not None:
+                title_string += f" | Latency:{frame_diagnostics_dictionary['median_grab_latency_ms']:.1f}ms"
+        self._title_label_widget.setText(title_string)
 
     def show(self):
         super().show()
@@ -11,7 +11,7 @@ from skellycam.gui.qt.utilities.qt_label_strings import (COLLAPSE_ALL_STRING, CO
                                                          EXPAND_ALL_STRING, ROTATE_180_STRING,
                                                          ROTATE_90_CLOCKWISE_STRING, ROTATE_90_COUNTERCLOCKWISE_STRING,
                                                          rotate_cv2_code_to_str, rotate_image_str_to_cv2_code,
-                                                         USE_THIS_CAMERA_STRING)
+                                                         USE_THIS_CAMERA_STRING, LOW_LATENCY_STRING)
 from skellycam.opencv.camera.models.camera_config import CameraConfig
 from skellycam.system.environment.default_paths import RED_X_EMOJI_STRING, MAGNIFYING_GLASS_EMOJI_STRING, \
     CAMERA_WITH_FLASH_EMOJI_STRING, HAMMER_AND_WRENCH_EMOJI_STRING
@@ -182,6 +182,12 @@ class SkellyCamParameterTreeWidget(QWidget):
                     value=camera_config.framerate,
                     tip="Framerate in frames per second",
                 ),
+                dict(
+                    name=LOW_LATENCY_STRING,
+                    type="bool",
+                    value=camera_config.low_latency,
+                    tip="Buffer a single frame in the driver (and use V4L2 on Linux), so frames aren't stale",
+                ),
                 self._create_copy_to_all_cameras_action_parameter(
                     camera_id=camera_config.camera_id
                 ),
@@ -228,6 +234,7 @@ class SkellyCamParameterTreeWidget(QWidget):
                 use_this_camera=camera_parameter_group.param(
                     USE_THIS_CAMERA_STRING
                 ).value(),
+                low_latency=camera_parameter_group.param(LOW_LATENCY_STRING).value(),
             )
         return camera_config_dictionary
 
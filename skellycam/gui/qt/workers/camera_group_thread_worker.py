@@ -1,28 +1,36 @@
 import logging
+import queue
 import time
 from copy import deepcopy
-from typing import List, Union
+from typing import List, Optional, Union
 
 import cv2
 from PySide6.QtCore import Signal, Qt, QThread
 from PySide6.QtGui import QImage
-from skellycam.detection.charuco.charuco_definition import CharucoBoardDefinition
-from skellycam.detection.charuco.charuco_detection import draw_charuco_on_image
 
+from skellycam.detection.camera_hotplug_watcher import CameraDeviceEvent
 from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.diagnostics.frame_tracing import FrameStage, mark_frame_stage
+from skellycam.diagnostics.profiling import ProfilingRequest, ProfilingSession, start_profiling_from_environment
 from skellycam.gui.qt.workers.video_save_thread_worker import VideoSaveThreadWorker
 from skellycam.opencv.camera.types.camera_id import CameraId
+from skellycam.opencv.config.config_changes import CameraConfigDiff
 from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.group.sync_quality_monitor import SyncQualityReport
 from skellycam.opencv.video_recorder.video_recorder import VideoRecorder
 
 logger = logging.getLogger(__name__)
 
+SYNC_QUALITY_UPDATE_INTERVAL_SECONDS = 0.5
+PAUSED_WAIT_SECONDS = 0.1  # while paused, the frame loop checks this often whether it should stop
+
 
 class CamGroupThreadWorker(QThread):
     new_image_signal = Signal(CameraId, QImage, dict)
     cameras_connected_signal = Signal()
     cameras_closed_signal = Signal()
     camera_group_created_signal = Signal(dict)
+    cameras_changed_signal = Signal(dict)  # a camera was plugged in or unplugged - the new camera config dictionary
     videos_saved_to_this_folder_signal = Signal(str)
 
     def __init__(
@@ -42,12 +50,15 @@ class CamGroupThreadWorker(QThread):
         self._get_new_synchronized_videos_folder_callable = get_new_synchronized_videos_folder_callable
         self.annotate_images = annotate_images
 
-        self._should_pause_bool = False
         self._should_record_frames_bool = False
 
         self._updating_camera_settings_bool = False
         self._current_recording_name = None
         self._video_save_process = None
+        self._pending_profiling_request = None
+        # changed camera ids (or None, for all new recorders), from the GUI's/hotplug watcher's threads - while `run`
+        # is going, it's the only thread that replaces the video recorder dictionary (it records into it)
+        self._video_recorder_updates = queue.SimpleQueue()
 
         if self._camera_ids is not None:
             self._camera_group = self._create_camera_group(self._camera_ids)
@@ -66,11 +77,18 @@ class CamGroupThreadWorker(QThread):
     def camera_ids(self, camera_ids: List[str]):
         self._camera_ids = camera_ids
 
-        if self._camera_ids is not None:
-            if self._camera_group is not None:
-                while self._camera_group.is_capturing:
-                    self._camera_group.close()
-                    time.sleep(0.1)
+        if (self._camera_ids is not None and self._camera_group is not None
+                and (self._camera_group.is_capturing or self._camera_group.is_supervised)):
+            # add/remove just the cameras that changed - the others keep capturing
+            for camera_id in list(self._camera_group.camera_ids):
+                if camera_id not in self._camera_ids:
+                    self._camera_group.remove_camera(camera_id)
+            for camera_id in self._camera_ids:
+                if camera_id not in self._camera_group.camera_ids:
+                    self._camera_group.add_camera(camera_id)
+            self._update_video_recorders()
+            self.camera_group_created_signal.emit(self._camera_group.camera_config_dictionary)
+            return
 
         self._camera_group = self._create_camera_group(self._camera_ids)
         self._video_recorder_dictionary = self._initialize_video_recorder_dictionary()
@@ -109,39 +127,92 @@ class CamGroupThreadWorker(QThread):
         self.cameras_connected_signal.emit()
 
         if self.annotate_images:
+            # opportunistic load of the charuco detector, it's only needed when annotating
+            from skellycam.detection.charuco.charuco_definition import CharucoBoardDefinition
+            from skellycam.detection.charuco.charuco_detection import draw_charuco_on_image
+
             charuco_board = CharucoBoardDefinition()
 
+        profiling_session = start_profiling_from_environment(role="gui_frame_loop", camera_ids=self._camera_ids)
+        sync_quality_report = self._camera_group.sync_quality
+        next_sync_quality_update_seconds = time.perf_counter() + SYNC_QUALITY_UPDATE_INTERVAL_SECONDS
+
         while self._camera_group.is_capturing and should_continue:
+            if self._pending_profiling_request is not None:
+                # cProfile only sees the thread that enables it, so the session starts here
+                if profiling_session is not None:
+                    profiling_session.stop()
+                profiling_session = ProfilingSession(role="gui_frame_loop",
+                                                     profiling_request=self._pending_profiling_request,
+                                                     camera_ids=self._camera_ids)
+                self._pending_profiling_request = None
+                profiling_session.start()
+            if profiling_session is not None and not profiling_session.check():
+                profiling_session = None
+
             if self._updating_camera_settings_bool:
                 continue
 
-            frame_payload_dictionary = self._camera_group.latest_frames()
-            for camera_id, frame_payload in frame_payload_dictionary.items():
-                if frame_payload:
-                    if not self._should_pause_bool:
-                        if self._should_record_frames_bool:
-                            self._video_recorder_dictionary[camera_id].append_frame_payload_to_list(frame_payload)
-                            logger.info(f"camera:frame_count - {self._get_recorder_frame_count_dict()}")
+            self._handle_pending_video_recorder_updates()
 
-                        if self.annotate_images:
-                            draw_charuco_on_image(image=frame_payload.image, charuco_board=charuco_board)
-
-                        q_image = self._convert_frame(frame_payload)
-
-                        frame_diagnostic_dictionary = {}
-                        frame_diagnostic_dictionary["mean_frames_per_second"] = frame_payload.mean_frames_per_second,
-                        frame_diagnostic_dictionary["frames_received"] = frame_payload.number_of_frames_received,
-                        frame_diagnostic_dictionary["queue_size"] = self._camera_group.queue_size[camera_id]
+            if self._camera_group.is_paused:
+                # no frames are coming until it's resumed - wait, rather than spin on empty queues
+                self._camera_group.wait_for_resume(timeout_seconds=PAUSED_WAIT_SECONDS)
+                continue
 
-                        try:
-                            frame_diagnostic_dictionary["frames_recorded"] = self._video_recorder_dictionary[
-                                camera_id].number_of_frames
-                        except KeyError:
-                            frame_diagnostic_dictionary["frames_recorded"] = 0
-                        except Exception as e:
-                            logger.error(f"Error getting frame count for camera {camera_id}: {e}")
+            if time.perf_counter() >= next_sync_quality_update_seconds:
+                next_sync_quality_update_seconds += SYNC_QUALITY_UPDATE_INTERVAL_SECONDS
+                sync_quality_report = self._camera_group.sync_quality
 
-                        self.new_image_signal.emit(camera_id, q_image, frame_diagnostic_dictionary)
+            frame_payload_dictionary = self._camera_group.latest_frames()
+            # one reference for the whole round - the recorders are only swapped between rounds
+            video_recorder_dictionary = self._video_recorder_dictionary
+            for camera_id, frame_payload in frame_payload_dictionary.items():
+                if frame_payload:
+                    if self._should_record_frames_bool and camera_id in video_recorder_dictionary:
+                        video_recorder_dictionary[camera_id].append_frame_payload_to_list(frame_payload)
+                        logger.info(f"camera:frame_count - {self._get_recorder_frame_count_dict()}")
+
+                    if self.annotate_images:
+                        draw_charuco_on_image(image=frame_payload.image, charuco_board=charuco_board)
+
+                    q_image = self._convert_frame(frame_payload)
+
+                    frame_diagnostic_dictionary = {}
+                    frame_diagnostic_dictionary["mean_frames_per_second"] = frame_payload.mean_frames_per_second,
+                    frame_diagnostic_dictionary["frames_received"] = frame_payload.number_of_frames_received,
+                    frame_diagnostic_dictionary["queue_size"] = self._camera_group.queue_size[camera_id]
+                    frame_diagnostic_dictionary.update(
+                        self._get_sync_quality_diagnostics(sync_quality_report, camera_id))
+
+                    try:
+                        frame_diagnostic_dictionary["frames_recorded"] = video_recorder_dictionary[
+                            camera_id].number_of_frames
+                    except KeyError:
+                        frame_diagnostic_dictionary["frames_recorded"] = 0
+                    except Exception as e:
+                        logger.error(f"Error getting frame count for camera {camera_id}: {e}")
+
+                    self.new_image_signal.emit(camera_id, q_image, frame_diagnostic_dictionary)
+                    mark_frame_stage(frame_payload, FrameStage.DISPLAY)
+
+        if profiling_session is not None:
+            profiling_session.stop()
+        self._handle_pending_video_recorder_updates()  # any that came in as it stopped
+
+    @staticmethod
+    def _get_sync_quality_diagnostics(sync_quality_report: SyncQualityReport, camera_id: str) -> dict:
+        camera_sync_quality = sync_quality_report.cameras.get(str(camera_id))
+        if camera_sync_quality is None:
+            return {}
+        # more than half a frame behind the others
+        is_lagging = (sync_quality_report.lagging_camera_id == str(camera_id)
+                      and sync_quality_report.frame_period_ms is not None
+                      and -camera_sync_quality.median_offset_ms > sync_quality_report.frame_period_ms / 2)
+        return {"frame_interval_jitter_ms": camera_sync_quality.frame_interval_jitter_ms,
+                "median_offset_ms": camera_sync_quality.median_offset_ms,
+                "median_grab_latency_ms": camera_sync_quality.median_grab_latency_ms,
+                "is_lagging": is_lagging}
 
     def _convert_frame(self, frame: FramePayload):
         image = frame.image
@@ -164,17 +235,28 @@ class CamGroupThreadWorker(QThread):
         except AttributeError:
             pass
 
+    def start_profiling(self, profiling_request: ProfilingRequest):
+        """Profile this worker's frame loop and the cameras' capture processes for a while"""
+        self._pending_profiling_request = profiling_request
+        self._camera_group.start_profiling(profiling_request)
+
     def pause(self):
-        logger.info("Pausing image display")
-        self._should_pause_bool = True
+        logger.info("Pausing cameras")
+        self._camera_group.pause()
 
     def play(self):
-        logger.info("Resuming image display")
-        self._should_pause_bool = False
+        logger.info("Resuming cameras")
+        self._camera_group.resume()
 
     def start_recording(self):
         logger.info("Starting recording")
         if self.cameras_connected:
+            if not self._camera_group.is_ready_to_record:
+                live_camera_ids = self._camera_group.live_camera_ids
+                camera_ids_not_live = [camera_id for camera_id in self._camera_group.selected_camera_ids
+                                       if camera_id not in live_camera_ids]
+                logger.warning(f"Cannot start recording - cameras {camera_ids_not_live} aren't live yet")
+                return
             if self._synchronized_video_folder_path is None:
                 self._synchronized_video_folder_path = self._get_new_synchronized_videos_folder_callable()
             self._should_record_frames_bool = True
@@ -187,8 +269,7 @@ class CamGroupThreadWorker(QThread):
 
         self._launch_save_video_thread_worker()
         # self._launch_save_video_process()
-        del self._video_recorder_dictionary
-        self._video_recorder_dictionary = self._initialize_video_recorder_dictionary()
+        self._reset_video_recorders()
 
     def update_camera_group_configs(self, camera_config_dictionary: dict):
         if self._camera_ids is None:
@@ -201,11 +282,12 @@ class CamGroupThreadWorker(QThread):
             )
             return
 
-        self._video_recorder_dictionary = self._initialize_video_recorder_dictionary()
         self._updating_camera_settings_bool = True
-        self._updating_camera_settings_bool = not self._update_camera_settings(
-            camera_config_dictionary
-        )
+        camera_config_diff = self._update_camera_settings(camera_config_dictionary)
+        # unchanged cameras keep what they've recorded
+        self._update_video_recorders(
+            changed_camera_ids=[] if camera_config_diff is None else list(camera_config_diff.changed_camera_configs))
+        self._updating_camera_settings_bool = False
 
     def _launch_save_video_thread_worker(self):
         logger.info("Launching save video thread worker")
@@ -218,10 +300,17 @@ class CamGroupThreadWorker(QThread):
             if video_recorder.number_of_frames > 0:
                 video_recorders_to_save[camera_id] = deepcopy(video_recorder)
 
+        try:
+            # so the videos' timestamps can be put on the wall clock (e.g. to line them up with other recorders)
+            self._camera_group.clock_service.save(synchronized_videos_folder)
+        except OSError as e:
+            logger.error(f"Could not save the clock calibration to {synchronized_videos_folder}: {e}")
+
         self._video_save_thread_worker = VideoSaveThreadWorker(
             dictionary_of_video_recorders=video_recorders_to_save,
             folder_to_save_videos=str(synchronized_videos_folder),
             create_diagnostic_plots_bool=True,
+            outage_windows=self._camera_group.outage_windows,
         )
         self._video_save_thread_worker.start()
         self._video_save_thread_worker.finished_signal.connect(
@@ -239,6 +328,58 @@ class CamGroupThreadWorker(QThread):
                 video_recorder_dictionary[camera_id] = VideoRecorder()
         return video_recorder_dictionary
 
+    def _update_video_recorders(self, changed_camera_ids: List[str] = ()):
+        """See `_update_video_recorder_dictionary` - done by `run`, between frames, while it's going"""
+        if self.isRunning():
+            self._video_recorder_updates.put(list(changed_camera_ids))
+        else:
+            self._update_video_recorder_dictionary(changed_camera_ids)
+
+    def _reset_video_recorders(self):
+        """All new (empty) recorders - done by `run`, between frames, while it's going"""
+        if self.isRunning():
+            self._video_recorder_updates.put(None)
+        else:
+            self._video_recorder_dictionary = self._initialize_video_recorder_dictionary()
+
+    def _handle_pending_video_recorder_updates(self):
+        has_updates = False
+        is_reset = False
+        changed_camera_ids = set()
+        while True:
+            try:
+                update_changed_camera_ids = self._video_recorder_updates.get_nowait()
+            except queue.Empty:
+                break
+            has_updates = True
+            if update_changed_camera_ids is None:
+                is_reset = True
+                changed_camera_ids = set()  # they're all new now
+            else:
+                changed_camera_ids |= set(update_changed_camera_ids)
+        if is_reset:
+            self._video_recorder_dictionary = self._initialize_video_recorder_dictionary()
+        elif has_updates:
+            self._update_video_recorder_dictionary(changed_camera_ids=list(changed_camera_ids))
+
+    def _update_video_recorder_dictionary(self, changed_camera_ids: List[str] = ()):
+        """
+        New recorders for added cameras (and those in `changed_camera_ids`), none for removed ones - unless we're
+        recording, then removed cameras keep theirs until the recording is saved
+        """
+        video_recorder_dictionary = {}
+        for camera_id, config in self._camera_group.camera_config_dictionary.items():
+            if not config.use_this_camera:
+                continue
+            if camera_id in self._video_recorder_dictionary and camera_id not in changed_camera_ids:
+                video_recorder_dictionary[camera_id] = self._video_recorder_dictionary[camera_id]
+            else:
+                video_recorder_dictionary[camera_id] = VideoRecorder()
+        if self._should_record_frames_bool:
+            for camera_id, video_recorder in self._video_recorder_dictionary.items():
+                video_recorder_dictionary.setdefault(camera_id, video_recorder)
+        self._video_recorder_dictionary = video_recorder_dictionary
+
     def _get_recorder_frame_count_dict(self):
         return {
             camera_id: recorder.number_of_frames
@@ -255,15 +396,21 @@ class CamGroupThreadWorker(QThread):
         camera_group = CameraGroup(
             camera_ids_list=camera_ids,
             camera_config_dictionary=camera_config_dictionary,
+            start_when_ready=True,  # show each camera as soon as it's up, rather than once they all are
+            watch_for_camera_hotplug=True,
+            on_camera_device_event=self._handle_camera_device_event,
         )
         self.camera_group_created_signal.emit(camera_group.camera_config_dictionary)
         return camera_group
 
-    def _update_camera_settings(self, camera_config_dictionary: dict):
+    def _handle_camera_device_event(self, camera_device_event: CameraDeviceEvent):
+        # from the hotplug watcher's thread - the signal gets the views rebuilt on the GUI's
+        self._update_video_recorders()
+        self.cameras_changed_signal.emit(self._camera_group.camera_config_dictionary)
+
+    def _update_camera_settings(self, camera_config_dictionary: dict) -> Optional[CameraConfigDiff]:
         try:
-            self._camera_group.update_camera_configs(camera_config_dictionary)
+            return self._camera_group.update_camera_configs(camera_config_dictionary)
 
         except Exception as e:
             logger.error(f"Problem updating camera settings: {e}")
-
-        return True
@@ -1,9 +1,11 @@
 import logging
 from pathlib import Path
-from typing import Dict, Union
+from typing import Dict, List, Union
 
 from PySide6.QtCore import Signal, QThread
 
+from skellycam.diagnostics.profiling import start_profiling_from_environment
+from skellycam.opencv.camera.capture_watchdog import CameraOutageWindow
 from skellycam.opencv.video_recorder.save_synchronized_videos import save_synchronized_videos
 from skellycam.opencv.video_recorder.video_recorder import VideoRecorder
 
@@ -18,21 +20,30 @@ class VideoSaveThreadWorker(QThread):
             dictionary_of_video_recorders: Dict[str, VideoRecorder],
             folder_to_save_videos: Union[str, Path],
             create_diagnostic_plots_bool: bool = True,
-
+            outage_windows: List[CameraOutageWindow] = None,
     ):
         super().__init__()
         self._dictionary_of_video_recorders = dictionary_of_video_recorders
         self._folder_to_save_videos = folder_to_save_videos
         self._create_diagnostic_plots_bool = create_diagnostic_plots_bool
+        self._outage_windows = outage_windows
 
     def run(self):
         logger.info(f"Saving synchronized videos to folder: {str(self._folder_to_save_videos)}")
 
-        save_synchronized_videos(
-            dictionary_of_video_recorders=self._dictionary_of_video_recorders,
-            folder_to_save_videos=self._folder_to_save_videos,
-            create_diagnostic_plots_bool=self._create_diagnostic_plots_bool,
-        )
+        # profiles the whole save (however long the requested window is)
+        profiling_session = start_profiling_from_environment(role="save_worker",
+                                                             camera_ids=list(self._dictionary_of_video_recorders.keys()))
+        try:
+            save_synchronized_videos(
+                dictionary_of_video_recorders=self._dictionary_of_video_recorders,
+                folder_to_save_videos=self._folder_to_save_videos,
+                create_diagnostic_plots_bool=self._create_diagnostic_plots_bool,
+                outage_windows=self._outage_windows,
+            )
+        finally:
+            if profiling_session is not None:
+                profiling_session.stop()
 
         logger.info(
             f"`VideoSaveThreadWorker` finished saving synchronized videos to folder: {str(self._folder_to_save_videos)}")
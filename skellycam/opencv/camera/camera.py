@@ -1,17 +1,22 @@
 import asyncio
 import logging
 import multiprocessing
+import threading
 import time
 import traceback
-from typing import Optional
+from typing import List, Optional
 
 from skellycam.opencv.camera.attributes import Attributes
+from skellycam.opencv.camera.capture_watchdog import CameraOutageWindow
 from skellycam.opencv.camera.internal_camera_thread import VideoCaptureThread
 from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.config.config_changes import CameraConfigApplyReport, get_changed_config_fields
 from skellycam.viewers.cv_cam_viewer import CvCamViewer
 
 logger = logging.getLogger(__name__)
 
+CAPTURE_THREAD_JOIN_TIMEOUT_SECONDS = 0.5
+
 
 class Camera:
     def __init__(
@@ -22,6 +27,12 @@ class Camera:
         self._ready_event = None
         self._config = config
         self._capture_thread: Optional[VideoCaptureThread] = None
+        self._connect_stop_event: Optional[threading.Event] = None  # stops a `connect` that's still opening the camera
+        self._is_closed = False  # for good - by `close()`
+        self._is_connecting = False
+        # config changes can be applied from another thread (in the background) - one at a time, and not while closing
+        self._config_lock = threading.RLock()
+        self._is_paused = False
 
     @property
     def name(self):
@@ -35,18 +46,37 @@ class Camera:
     def camera_id(self):
         return str(self._config.camera_id)
 
+    @property
+    def config(self) -> CameraConfig:
+        return self._config
+
+    @property
+    def is_connecting(self) -> bool:
+        """Opening the camera, in `connect` (which may be running on another thread)"""
+        return self._is_connecting
+
+    @property
+    def is_paused(self) -> bool:
+        return self._is_paused
+
     @property
     def is_capturing_frames(self):
-        return self._capture_thread.is_capturing_frames
+        return self._capture_thread is not None and self._capture_thread.is_capturing_frames
 
     @property
     def new_frame_ready(self):
-        return self._capture_thread.new_frame_ready
+        # False until `connect` has opened the camera (it may be connecting on another thread)
+        return self._capture_thread is not None and self._capture_thread.new_frame_ready
 
     @property
     def latest_frame(self):
         return self._capture_thread.latest_frame
 
+    def pop_outage_updates(self) -> List[CameraOutageWindow]:
+        if self._capture_thread is None:
+            return []
+        return self._capture_thread.pop_outage_updates()
+
     def connect(self, ready_event: multiprocessing.Event = None):
         if ready_event is None:
             self._ready_event = multiprocessing.Event()
@@ -58,22 +88,63 @@ class Camera:
             logger.debug(f"Already capturing frames for camera_id: {self.camera_id}")
             return
         logger.debug(f"Camera ID: [{self._config.camera_id}] Creating thread")
-        self._capture_thread = VideoCaptureThread(
-            config=self._config,
-            ready_event=self._ready_event,
-        )
-        self._capture_thread.start()
+        self._is_connecting = True
+        self._connect_stop_event = threading.Event()
+        if self._is_closed:
+            # after creating the event, so a `close()` from here on sets it
+            self._is_connecting = False
+            return
+        try:
+            capture_thread = VideoCaptureThread(
+                config=self._config,
+                ready_event=self._ready_event,
+                stop_event=self._connect_stop_event,
+            )
+            if self._is_closed or self._connect_stop_event.is_set() or not capture_thread.is_open:
+                # closed or stopped while the camera was opening (cameras can connect in the background)
+                capture_thread.stop()
+                return
+            self._capture_thread = capture_thread
+            if self._is_paused:
+                # paused while it was opening - set after the thread is, so `pause` sees one or the other
+                capture_thread.pause()
+            self._capture_thread.start()
+        finally:
+            self._is_connecting = False
+
+    def pause(self):
+        """Stop reading frames, but keep the camera open - see `resume`"""
+        self._is_paused = True
+        if self._capture_thread is not None:
+            self._capture_thread.pause()
+
+    def resume(self):
+        self._is_paused = False
+        if self._capture_thread is not None:
+            self._capture_thread.resume()
 
     def stop_frame_capture(self):
-        self._capture_thread.stop()
+        if self._connect_stop_event is not None:
+            self._connect_stop_event.set()
+        if self._capture_thread is not None:
+            self._capture_thread.stop()
 
     def close(self):
+        self._is_closed = True
+        if self._connect_stop_event is not None:
+            self._connect_stop_event.set()
+        with self._config_lock:  # a config change being applied meanwhile finishes (or gives up) first
+            self._close_capture_thread()
+
+    def _close_capture_thread(self):
+        if self._capture_thread is None:
+            return
         try:
             self._capture_thread.stop()
-            while self._capture_thread.is_alive():
-                # wait for thread to die.
-                # TODO: use threading.Event for synchronize mainthread vs other threads
-                time.sleep(0.1)
+            self._capture_thread.join(timeout=CAPTURE_THREAD_JOIN_TIMEOUT_SECONDS)
+            if self._capture_thread.is_alive():
+                logger.warning(f"Camera ID: [{self._config.camera_id}] capture thread didn't stop within "
+                               f"{CAPTURE_THREAD_JOIN_TIMEOUT_SECONDS} seconds")
         except:
             logger.error("Printing traceback")
             traceback.print_exc()
@@ -95,14 +166,44 @@ class Camera:
             if self.new_frame_ready:
                 viewer.recv_img(self.latest_frame)
 
-    def update_config(self, camera_config: CameraConfig):
+    def update_config(self, camera_config: CameraConfig, requested_timestamp_ns: int = None) -> CameraConfigApplyReport:
+        """
+        :param requested_timestamp_ns: when (`perf_counter_ns`) the change was asked for, to report its latency
+        """
+        with self._config_lock:
+            return self._update_config(camera_config, requested_timestamp_ns)
+
+    def _update_config(self, camera_config: CameraConfig, requested_timestamp_ns: Optional[int]) -> CameraConfigApplyReport:
         logger.info(
             f"Updating config for camera_id: {self.camera_id}  -  {camera_config}"
         )
-        if not camera_config.use_this_camera:
-            self.close()
+        if self._is_closed:
+            # closed (e.g. removed) before the change got to it
+            camera_config_apply_report = CameraConfigApplyReport(
+                camera_id=self.camera_id, changed_fields=get_changed_config_fields(self._config, camera_config))
+            self._config = camera_config
+        elif not camera_config.use_this_camera:
+            camera_config_apply_report = CameraConfigApplyReport(
+                camera_id=self.camera_id, changed_fields=get_changed_config_fields(self._config, camera_config))
+            self._config = camera_config
+            if self._connect_stop_event is not None:
+                self._connect_stop_event.set()
+            self._close_capture_thread()
+        elif not self.is_capturing_frames:
+            # opened with the new config from the start, rather than reopened with the old one and then changed
+            changed_fields = get_changed_config_fields(self._config, camera_config)
+            self._config = camera_config
+            connect_start_time_seconds = time.perf_counter()
+            self.connect(self._ready_event)
+            camera_config_apply_report = CameraConfigApplyReport(
+                camera_id=self.camera_id,
+                changed_fields=changed_fields,
+                apply_duration_seconds=time.perf_counter() - connect_start_time_seconds,
+                reconnected=True)
         else:
-            if not self._capture_thread.is_capturing_frames:
-                self.connect(self._ready_event)
+            self._config = camera_config
+            camera_config_apply_report = self._capture_thread.update_camera_config(camera_config)
 
-            self._capture_thread.update_camera_config(camera_config)
+        if requested_timestamp_ns is not None:
+            camera_config_apply_report.latency_seconds = (time.perf_counter_ns() - requested_timestamp_ns) / 1e9
+        return camera_config_apply_report
@@ -0,0 +1,74 @@
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+
+class CapturePool:
+    """
+    Holds open `cv2.VideoCapture` objects (keyed by camera_id) so that a capture opened during camera detection
+    can be adopted by the capture layer instead of being released and re-opened.
+
+    NOTE - `cv2.VideoCapture` objects cannot be shared between processes, so handles only get adopted by cameras
+    running in the process that did the detection (i.e. `Strategy.SAME_PROCESS`)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._captures: Dict[str, cv2.VideoCapture] = {}
+
+    @property
+    def camera_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._captures.keys())
+
+    def put(self, camera_id: str, capture: cv2.VideoCapture):
+        with self._lock:
+            previous_capture = self._captures.pop(str(camera_id), None)
+            self._captures[str(camera_id)] = capture
+
+        if previous_capture is not None and previous_capture is not capture:
+            previous_capture.release()
+        logger.debug(f"Holding open capture for Camera {camera_id} in capture pool")
+
+    def take(self, camera_id: str) -> Optional[cv2.VideoCapture]:
+        with self._lock:
+            capture = self._captures.pop(str(camera_id), None)
+
+        if capture is None:
+            return None
+
+        if not capture.isOpened():
+            logger.debug(f"Pooled capture for Camera {camera_id} is no longer open - discarding it")
+            capture.release()
+            return None
+
+        logger.debug(f"Handing off pooled capture for Camera {camera_id}")
+        return capture
+
+    def release(self, camera_ids: List[str] = None):
+        with self._lock:
+            if camera_ids is None:
+                camera_ids = list(self._captures.keys())
+            captures_to_release = [self._captures.pop(str(camera_id), None) for camera_id in camera_ids]
+
+        for capture in captures_to_release:
+            if capture is not None:
+                capture.release()
+
+    def release_all(self):
+        self.release()
+
+
+# No consumer should call this "private" variable
+_capture_pool: CapturePool = None
+
+
+def get_capture_pool() -> CapturePool:
+    global _capture_pool
+    if _capture_pool is None:
+        _capture_pool = CapturePool()
+    return _capture_pool
@@ -0,0 +1,76 @@
+import logging
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+
+logger = logging.getLogger(__name__)
+
+FRAME_DEADLINE_FRAME_PERIODS = 10  # frames a camera may miss before it's considered stalled
+MINIMUM_FRAME_DEADLINE_SECONDS = 1.0
+# a `grab()` blocked for this many deadlines is released out from under the capture thread (a last resort - it's the
+# only way to get a wedged driver call to return)
+HUNG_GRAB_DEADLINES = 2
+FAILED_READ_RETRY_SECONDS = 0.01  # don't spin on a camera that fails every read
+INITIAL_RECONNECT_DELAY_SECONDS = 0.1
+MAXIMUM_RECONNECT_DELAY_SECONDS = 5.0
+MAXIMUM_BACKOFF_DOUBLINGS = 32  # far beyond any sensible maximum delay
+CAMERA_OUTAGES_FILE_NAME = "camera_outages.json"
+
+
+class CameraOutageWindow(BaseModel):
+    """A span of time (`perf_counter_ns`, like frame timestamps) a camera delivered no frames"""
+    camera_id: str
+    start_timestamp_ns: int  # the camera's last frame before the outage
+    end_timestamp_ns: Optional[int] = None  # its first frame after - None while the outage lasts
+    reason: str = ""
+    number_of_reconnect_attempts: int = 0
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if self.end_timestamp_ns is None:
+            return None
+        return (self.end_timestamp_ns - self.start_timestamp_ns) / 1e9
+
+    def contains(self, timestamp_ns: float) -> bool:
+        return self.start_timestamp_ns < timestamp_ns and (self.end_timestamp_ns is None
+                                                           or timestamp_ns < self.end_timestamp_ns)
+
+
+class ReconnectBackoff:
+    """Exponentially growing delays between reconnect attempts, so a camera that's gone isn't hammered"""
+
+    def __init__(self,
+                 initial_delay_seconds: float = INITIAL_RECONNECT_DELAY_SECONDS,
+                 maximum_delay_seconds: float = MAXIMUM_RECONNECT_DELAY_SECONDS):
+        self._initial_delay_seconds = initial_delay_seconds
+        self._maximum_delay_seconds = maximum_delay_seconds
+        self.number_of_attempts = 0
+
+    def get_next_delay_seconds(self) -> float:
+        # the doublings are capped - after ~1000 attempts (over an hour at the maximum) `2 **` overflows a float
+        delay_seconds = min(self._initial_delay_seconds * 2 ** min(self.number_of_attempts, MAXIMUM_BACKOFF_DOUBLINGS),
+                            self._maximum_delay_seconds)
+        self.number_of_attempts += 1
+        return delay_seconds
+
+    def reset(self):
+        self.number_of_attempts = 0
+
+
+def get_frame_deadline_seconds(camera_config: CameraConfig) -> float:
+    """How long a camera may go without a frame before it's reconnected"""
+    if camera_config.frame_deadline_seconds is not None:
+        return camera_config.frame_deadline_seconds
+    if camera_config.framerate <= 0:
+        return MINIMUM_FRAME_DEADLINE_SECONDS
+    return max(FRAME_DEADLINE_FRAME_PERIODS / camera_config.framerate, MINIMUM_FRAME_DEADLINE_SECONDS)
+
+
+class CameraOutageReport(BaseModel):
+    """What's saved with a recording (`camera_outages.json`)"""
+    outage_windows: List[CameraOutageWindow] = []
+    # by camera id: the synchronized frames that fall in one of its outages - they repeat the nearest frame it did
+    # deliver, rather than being out of sync
+    synchronized_frames_in_outages: Dict[str, List[int]] = {}
@@ -3,23 +3,47 @@ import multiprocessing
 import threading
 import time
 import traceback
+from typing import List, Optional
 
 import cv2
 
 from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.diagnostics.frame_tracing import FrameStage, add_stage_mark, is_frame_tracing_enabled, \
+    start_stage_marks
+from skellycam.opencv.camera.capture_pool import get_capture_pool
+from skellycam.opencv.camera.capture_watchdog import (
+    FAILED_READ_RETRY_SECONDS,
+    HUNG_GRAB_DEADLINES,
+    CameraOutageWindow,
+    ReconnectBackoff,
+    get_frame_deadline_seconds,
+)
 from skellycam.opencv.camera.models.camera_config import CameraConfig
 from skellycam.opencv.config.apply_config import apply_configuration
+from skellycam.opencv.config.config_changes import CameraConfigApplyReport, get_changed_config_fields
 from skellycam.opencv.config.determine_backend import determine_backend
+from skellycam.opencv.sources.create_video_capture import create_video_capture, is_live_camera_id
 
 logger = logging.getLogger(__name__)
 
+NUMBER_OF_FRAMES_TO_DETECT_DRIVER_TIMESTAMPS = 30
+# after a pause - a grab that returns within this fraction of a frame period came out of the driver's buffer (stale),
+# one that had to wait for the camera is fresh
+BUFFERED_GRAB_FRAME_PERIODS = 0.25
+MAXIMUM_BUFFERED_FRAMES_TO_DISCARD = 10  # drivers hold a handful (V4L2 defaults to 4)
+
 
 class VideoCaptureThread(threading.Thread):
     def __init__(
             self,
             config: CameraConfig,
             ready_event: multiprocessing.Event = None,
+            stop_event: threading.Event = None,
     ):
+        """
+        :param stop_event: set to stop the thread - including while it's still trying to open the camera (in here),
+        before whoever's creating it has a thread to `stop()`
+        """
         super().__init__()
         self._previous_frame_timestamp_ns = None
         self._new_frame_ready = False
@@ -36,6 +60,24 @@ class VideoCaptureThread(threading.Thread):
         self._is_recording_frames = False
 
         self._number_of_frames_received: int = 0
+        self._is_tracing_frames = is_frame_tracing_enabled()
+        self._has_driver_timestamps = True
+        self._number_of_frames_without_driver_timestamp = 0
+
+        self._stop_event = stop_event if stop_event is not None else threading.Event()
+        # only live cameras stall (and are watched, and reconnected) - e.g. a replay that's over just stops
+        self._is_live_source = is_live_camera_id(config.camera_id)
+        self._resume_event = threading.Event()  # cleared while paused - the frame loop waits on it
+        self._resume_event.set()
+        self._pending_grab_timestamps_ns = None  # a frame grabbed (but not retrieved) while resuming
+        self._frame_deadline_seconds = get_frame_deadline_seconds(config)
+        self._reconnect_backoff = ReconnectBackoff()
+        self._last_frame_time_seconds = None
+        self._last_frame_timestamp_ns = None
+        self._grab_start_time_seconds = None  # set while the thread is inside `grab()`/`retrieve()`
+        self._outage_lock = threading.Lock()
+        self._current_outage: Optional[CameraOutageWindow] = None
+        self._outage_updates: List[CameraOutageWindow] = []
 
         # self._elapsed_during_frame_grab = [] #TODO
         self._capture_timestamps = []
@@ -80,11 +122,34 @@ class VideoCaptureThread(threading.Thread):
     def new_frame_ready(self):
         return self._new_frame_ready
 
+    def pop_outage_updates(self) -> List[CameraOutageWindow]:
+        """Outages that started or ended since the last call (an ongoing outage has no `end_timestamp_ns` yet)"""
+        with self._outage_lock:
+            outage_updates = self._outage_updates
+            self._outage_updates = []
+        return outage_updates
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the camera was opened - opening only gives up once the thread has been stopped"""
+        return self._cv2_video_capture is not None
+
     @property
     def is_capturing_frames(self) -> bool:
         """Is the thread capturing frames from the cameras (but not necessarily recording them, that's handled by `is_recording_frames`)"""
         return self._is_capturing_frames
 
+    @property
+    def is_paused(self) -> bool:
+        return not self._resume_event.is_set()
+
+    def pause(self):
+        """Park the frame loop once its current frame is in - the camera stays open (and configured), just unread"""
+        self._resume_event.clear()
+
+    def resume(self):
+        self._resume_event.set()
+
     def run(self):
         self._start_frame_loop()
 
@@ -93,13 +158,43 @@ class VideoCaptureThread(threading.Thread):
         logger.info(
             f"Camera ID: [{self._config.camera_id}] Frame capture loop has started"
         )
+        self._last_frame_time_seconds = time.perf_counter()
+        self._last_frame_timestamp_ns = time.perf_counter_ns()
+        if self._is_live_source:
+            threading.Thread(target=self._watch_for_hung_grabs,
+                             name=f"Camera {self._config.camera_id} watchdog",
+                             daemon=True).start()
         try:
             while self._is_capturing_frames:
+                if not self._resume_event.is_set():
+                    self._wait_while_paused()
+                    continue
+                frame = None
                 try:
-                    self._frame = self._get_next_frame()
+                    frame = self._get_next_frame()
                 except Exception as e:
-                    logger.error(e)
-
+                    if self._current_outage is None:  # once per outage, not once per failed read
+                        logger.error(e)
+
+                if frame is not None and frame.success:
+                    self._frame = frame
+                    self._handle_frame_received()
+                    continue
+
+                if self._stop_event.is_set():
+                    # stopped mid-read (or before the loop got going) - not a camera to retry
+                    self._is_capturing_frames = False
+                    break
+                if getattr(self._cv2_video_capture, "is_finished", False):
+                    logger.info(f"Camera {self._config.camera_id} has no more frames - stopping its capture")
+                    self._is_capturing_frames = False
+                    self._stop_event.set()
+                    break
+                if (not self._is_live_source
+                        or time.perf_counter() - self._last_frame_time_seconds < self._frame_deadline_seconds):
+                    self._stop_event.wait(FAILED_READ_RETRY_SECONDS)
+                    continue
+                self._reconnect()
 
         except:
             logger.error(
@@ -110,20 +205,138 @@ class VideoCaptureThread(threading.Thread):
             logger.info(
                 f"Camera ID: [{self._config.camera_id}] Frame capture has stopped."
             )
+        finally:
+            self._release_capture()  # here, rather than from whichever thread stopped it - nothing else is using it now
+
+    def _wait_while_paused(self):
+        logger.info(f"Camera {self._config.camera_id} paused")
+        self._new_frame_ready = False  # the frame grabbed as it was paused is stale by the time it resumes
+        self._resume_event.wait()
+        if not self._is_capturing_frames:
+            return  # stopped while paused
+        self._new_frame_ready = False
+        resume_start_time_seconds = time.perf_counter()
+        self._discard_buffered_frames()
+        self._last_frame_time_seconds = time.perf_counter()  # time spent paused isn't an outage
+        logger.info(f"Camera {self._config.camera_id} resumed (discarding buffered frames took "
+                    f"{time.perf_counter() - resume_start_time_seconds:.3f} seconds)")
+
+    def _discard_buffered_frames(self):
+        """
+        The driver kept the latest few frames while the loop was parked - grab (without decoding) until a grab has to
+        wait for the camera, and keep that one, so the first frame after resuming is fresh rather than a backlog
+        """
+        buffered_grab_seconds = BUFFERED_GRAB_FRAME_PERIODS / max(self._config.framerate, 1)
+        for _ in range(MAXIMUM_BUFFERED_FRAMES_TO_DISCARD + 1):
+            try:
+                self._grab_start_time_seconds = time.perf_counter()
+                pre_grab_timestamp_ns = time.perf_counter_ns()
+                if not self._cv2_video_capture.grab():
+                    return
+                post_grab_timestamp_ns = time.perf_counter_ns()
+            except Exception as e:
+                logger.debug(f"Problem discarding buffered frames from Camera {self._config.camera_id}: {e}")
+                return
+            finally:
+                self._grab_start_time_seconds = None
+            self._pending_grab_timestamps_ns = (pre_grab_timestamp_ns, post_grab_timestamp_ns)
+            if (post_grab_timestamp_ns - pre_grab_timestamp_ns) / 1e9 >= buffered_grab_seconds:
+                return
+
+    def _handle_frame_received(self):
+        self._last_frame_time_seconds = time.perf_counter()
+        self._last_frame_timestamp_ns = time.perf_counter_ns()
+        if self._current_outage is None:
+            return
+        with self._outage_lock:
+            self._current_outage.end_timestamp_ns = self._last_frame_timestamp_ns
+            self._outage_updates.append(self._current_outage.model_copy())
+            logger.info(f"Camera {self._config.camera_id} recovered after "
+                        f"{self._current_outage.duration_seconds:.2f} seconds "
+                        f"({self._current_outage.number_of_reconnect_attempts} reconnect attempts)")
+            self._current_outage = None
+        self._reconnect_backoff.reset()
+
+    def _start_outage(self, reason: str):
+        with self._outage_lock:
+            if self._current_outage is not None:
+                return
+            logger.warning(f"Camera {self._config.camera_id} outage: {reason}")
+            self._current_outage = CameraOutageWindow(camera_id=str(self._config.camera_id),
+                                                      start_timestamp_ns=self._last_frame_timestamp_ns,
+                                                      reason=reason)
+            self._outage_updates.append(self._current_outage.model_copy())
+
+    def _reconnect(self):
+        """Re-open just this camera, after a (growing) delay - the other cameras keep capturing"""
+        self._start_outage(f"no frames for {self._frame_deadline_seconds:.2f} seconds")
+        delay_seconds = self._reconnect_backoff.get_next_delay_seconds()
+        logger.info(f"Reconnecting to Camera {self._config.camera_id} in {delay_seconds:.2f} seconds "
+                    f"(attempt {self._reconnect_backoff.number_of_attempts})")
+        if self._stop_event.wait(delay_seconds):
+            return
+
+        try:
+            self._cv2_video_capture.release()
+        except Exception as e:
+            logger.debug(f"Problem releasing Camera {self._config.camera_id} before reconnecting: {e}")
+        capture = self._open_capture()
+        with self._outage_lock:
+            if self._current_outage is not None:
+                self._current_outage.number_of_reconnect_attempts += 1
+        if capture is None:
+            return  # straight on to the next (longer) delay
+        self._cv2_video_capture = capture
+        self._last_frame_time_seconds = time.perf_counter()  # a whole deadline to deliver a frame
+
+    def _watch_for_hung_grabs(self):
+        while not self._stop_event.wait(self._frame_deadline_seconds / 4):
+            grab_start_time_seconds = self._grab_start_time_seconds
+            if grab_start_time_seconds is None:
+                continue
+            hung_seconds = time.perf_counter() - grab_start_time_seconds
+            if hung_seconds < self._frame_deadline_seconds * HUNG_GRAB_DEADLINES:
+                continue
+            # only flagged - a `cv2.VideoCapture` isn't thread safe, so releasing it under the hung call could free it
+            # mid-call. Once the grab gives up (drivers time out), the capture thread reconnects the camera itself
+            self._start_outage(f"grab() hung for {hung_seconds:.2f} seconds")
+            self._grab_start_time_seconds = None  # once per hang
 
     def _get_next_frame(self):
+        stage_marks = start_stage_marks() if self._is_tracing_frames else None
         try:
-            self._cv2_video_capture.grab()
+            self._grab_start_time_seconds = time.perf_counter()
+            if self._pending_grab_timestamps_ns is not None:
+                # grabbed already, while resuming
+                pre_grab_timestamp_ns, post_grab_timestamp_ns = self._pending_grab_timestamps_ns
+                self._pending_grab_timestamps_ns = None
+            else:
+                pre_grab_timestamp_ns = time.perf_counter_ns()
+                self._cv2_video_capture.grab()
+                post_grab_timestamp_ns = time.perf_counter_ns()
+            if stage_marks is not None:
+                add_stage_mark(stage_marks, FrameStage.GRAB_END)
             success, image = self._cv2_video_capture.retrieve()
             retrieval_timestamp = time.perf_counter_ns()
+            if stage_marks is not None:
+                add_stage_mark(stage_marks, FrameStage.RETRIEVE_END)
+            # sources that know when their frame 'happened' (e.g. replays) say so
+            source_timestamp_ns = getattr(self._cv2_video_capture, "latest_timestamp_ns", None)
+            if source_timestamp_ns is not None:
+                retrieval_timestamp = source_timestamp_ns
+            driver_timestamp_ns = self._get_driver_timestamp_ns()
             if self._config.rotate_video_cv2_code != -1:
                 image = cv2.rotate(image, self._config.rotate_video_cv2_code)
+                if stage_marks is not None:
+                    add_stage_mark(stage_marks, FrameStage.ROTATE_END)
 
         except:
             logger.error(f"Failed to read frame from Camera: {self._config.camera_id}")
             raise Exception
         else:
             self._new_frame_ready = success
+        finally:
+            self._grab_start_time_seconds = None
 
         if success:
             self._number_of_frames_received += 1
@@ -132,57 +345,121 @@ class VideoCaptureThread(threading.Thread):
             success=success,
             image=image,
             timestamp_ns=retrieval_timestamp,
+            pre_grab_timestamp_ns=pre_grab_timestamp_ns,
+            post_grab_timestamp_ns=post_grab_timestamp_ns,
+            driver_timestamp_ns=driver_timestamp_ns,
             number_of_frames_received=self._number_of_frames_received,
             camera_id=str(self._config.camera_id),
+            stage_marks=stage_marks,
         )
 
+    def _get_driver_timestamp_ns(self):
+        if not self._has_driver_timestamps:
+            return None
+        driver_timestamp_ms = self._cv2_video_capture.get(cv2.CAP_PROP_POS_MSEC)
+        if driver_timestamp_ms is None or driver_timestamp_ms <= 0:
+            # backends without one report 0 (or -1) - stop asking once they have, for a few frames in a row
+            self._number_of_frames_without_driver_timestamp += 1
+            if self._number_of_frames_without_driver_timestamp >= NUMBER_OF_FRAMES_TO_DETECT_DRIVER_TIMESTAMPS:
+                logger.debug(f"Camera {self._config.camera_id} doesn't expose driver timestamps")
+                self._has_driver_timestamps = False
+            return None
+        self._number_of_frames_without_driver_timestamp = 0
+        return int(driver_timestamp_ms * 1e6)
+
     def _create_cv2_capture(self):
         logger.info(f"Connecting to Camera: {self._config.camera_id}...")
-        cap_backend = determine_backend()
 
-        try:
-            self._cv2_video_capture.release()
-        except:
-            pass
+        capture = get_capture_pool().take(self._config.camera_id)
+        if capture is not None:
+            logger.info(f"Adopting capture for Camera {self._config.camera_id} left open by camera detection")
+            apply_configuration(capture, self._config)
+            if not self._ready_event.is_set():
+                self._ready_event.set()
+            return capture
+
+        capture = self._open_capture()
+        while capture is None:
+            delay_seconds = self._reconnect_backoff.get_next_delay_seconds()
+            logger.info(f"Retrying Camera {self._config.camera_id} in {delay_seconds:.2f} seconds")
+            if self._stop_event.wait(delay_seconds):
+                logger.info(f"Stopped trying to connect to Camera {self._config.camera_id}")
+                return None
+            capture = self._open_capture()
+        self._reconnect_backoff.reset()
 
-        capture = cv2.VideoCapture(int(self._config.camera_id), cap_backend)
+        logger.info(f"Successfully connected to Camera: {self._config.camera_id}!")
+        if not self._ready_event.is_set():
+            self._ready_event.set()
+
+        return capture
+
+    def _open_capture(self):
+        """
+        One attempt at opening the camera and reading a frame from it - None if that failed. Replays are only checked
+        to be open - reading would use up their first frame, and start their replay clock before the frame loop does
+        """
+        cap_backend = determine_backend(low_latency=self._config.low_latency)
+        capture = create_video_capture(self._config.camera_id, cap_backend)
+        if not capture.isOpened() and cap_backend != determine_backend():
+            logger.warning(f"Camera {self._config.camera_id} didn't open with the low latency backend - "
+                           f"falling back to the default one")
+            capture.release()
+            capture = create_video_capture(self._config.camera_id, determine_backend())
+
+        if not self._is_live_source:
+            if not capture.isOpened():
+                logger.error(f"Failed to open Camera {self._config.camera_id} - releasing the capture object")
+                capture.release()
+                return None
+            apply_configuration(capture, self._config)
+            return capture
 
         try:
             success, image = capture.read()
         except Exception as e:
             logger.error(
-                f"Problem when trying to read frame from Camera: {self._config.camera_id}"
+                f"Problem when trying to read frame from Camera: {self._config.camera_id}: {e}"
             )
-            traceback.print_exc()
-            raise e
+            success, image = False, None
 
         if not success or image is None:
             logger.error(
                 f"Failed to read frame from camera at port# {self._config.camera_id}: "
-                f"returned value: {success}, "
-                f"returned image: {image} - releasing, closing, and deleting capture object and re-running self._create_cv2_capture()"
+                f"returned value: {success} - releasing the capture object"
             )
             capture.release()
-            del capture
-            return self._create_cv2_capture()
+            return None
 
         apply_configuration(capture, self._config)
-
-        logger.info(f"Successfully connected to Camera: {self._config.camera_id}!")
-        if not self._ready_event.is_set():
-            self._ready_event.set()
-
         return capture
 
     def stop(self):
         self._is_capturing_frames = False
-        if self._cv2_video_capture is not None:
-            logger.debug(
-                f"Releasing `opencv_video_capture_object` for Camera: {self._config.camera_id}"
-            )
+        self._stop_event.set()
+        self._resume_event.set()  # a paused frame loop has to wake up to stop
+        if not self.is_alive():
+            self._release_capture()  # the frame loop releases it otherwise - once its current frame is in
+
+    def _release_capture(self):
+        if self._cv2_video_capture is None:
+            return
+        logger.debug(
+            f"Releasing `opencv_video_capture_object` for Camera: {self._config.camera_id}"
+        )
+        try:
             self._cv2_video_capture.release()
+        except Exception as e:
+            logger.error(f"Problem releasing Camera {self._config.camera_id}: {e}")
 
-    def update_camera_config(self, new_config: CameraConfig):
+    def update_camera_config(self, new_config: CameraConfig) -> CameraConfigApplyReport:
+        """Set only the properties that changed on the camera - returns how long that took"""
+        changed_fields = get_changed_config_fields(self._config, new_config)
         self._config = new_config
-        logger.info(f"Updating Camera: {self._config.camera_id} config to {new_config}")
-        apply_configuration(self._cv2_video_capture, new_config)
+        self._frame_deadline_seconds = get_frame_deadline_seconds(new_config)
+        logger.info(f"Updating Camera: {self._config.camera_id} config - changed: {changed_fields}")
+        apply_start_time_seconds = time.perf_counter()
+        apply_configuration(self._cv2_video_capture, new_config, changed_fields=changed_fields)
+        return CameraConfigApplyReport(camera_id=str(new_config.camera_id),
+                                       changed_fields=changed_fields,
+                                       apply_duration_seconds=time.perf_counter() - apply_start_time_seconds)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 from skellycam.opencv.camera.types.camera_id import CameraId
@@ -13,3 +15,8 @@ class CameraConfig(BaseModel):
     fourcc: str = "MJPG"
     rotate_video_cv2_code: int = -1
     use_this_camera: bool = True
+    # the V4L2 backend on Linux, and a driver buffer of one frame - so `grab()` returns the newest frame rather than
+    # one a few frames stale (falls back to the defaults where unsupported)
+    low_latency: bool = False
+    # no frames for this long and the camera is reconnected (default: 10 frame periods, at least a second)
+    frame_deadline_seconds: Optional[float] = None
@@ -1,5 +1,6 @@
 import logging
 import traceback
+from typing import Collection
 
 import cv2
 
@@ -7,8 +8,18 @@ from skellycam.opencv.camera.models.camera_config import CameraConfig
 
 logger = logging.getLogger(__name__)
 
+LOW_LATENCY_BUFFER_SIZE = 1
+
+
+def apply_configuration(cv2_vid_cap: cv2.VideoCapture, config: CameraConfig, changed_fields: Collection[str] = None):
+    """
+    :param changed_fields: only set the properties for these `CameraConfig` fields (see `get_changed_config_fields`)
+    - each one set can make the driver renegotiate the stream. Default: set them all
+    """
+    if changed_fields is not None:
+        _apply_changed_properties(cv2_vid_cap, config, changed_fields)
+        return
 
-def apply_configuration(cv2_vid_cap: cv2.VideoCapture, config: CameraConfig):
     # set camera stream parameters
     logger.info(
         f"Applying configuration to Camera {config.camera_id}:"
@@ -16,7 +27,8 @@ def apply_configuration(cv2_vid_cap: cv2.VideoCapture, config: CameraConfig):
         f"Resolution width: {config.resolution_width}, "
         f"Resolution height: {config.resolution_height}, "
         f"Framerate: {config.framerate}, "
-        f"Fourcc: {config.fourcc}"
+        f"Fourcc: {config.fourcc}, "
+        f"Low latency: {config.low_latency}"
     )
     try:
         if not cv2_vid_cap.isOpened():
@@ -41,3 +53,59 @@ def apply_configuration(cv2_vid_cap: cv2.VideoCapture, config: CameraConfig):
         logger.error(f"Problem applying configuration for camera: {config.camera_id}")
         traceback.print_exc()
         raise e
+
+    if config.low_latency:
+        apply_low_latency_settings(cv2_vid_cap, config.camera_id)
+
+
+def _apply_changed_properties(cv2_vid_cap: cv2.VideoCapture, config: CameraConfig, changed_fields: Collection[str]):
+    changed_property_fields = [field_name for field_name in _PROPERTY_SETTERS if field_name in changed_fields]
+    if len(changed_property_fields) == 0:
+        return
+    logger.info(f"Applying changed properties to Camera {config.camera_id}: "
+                f"{ {field_name: getattr(config, field_name) for field_name in changed_property_fields} }")
+    try:
+        for field_name in changed_property_fields:
+            _PROPERTY_SETTERS[field_name](cv2_vid_cap, config)
+    except Exception as e:
+        logger.error(f"Problem applying configuration for camera: {config.camera_id}")
+        traceback.print_exc()
+        raise e
+
+
+def _apply_low_latency_change(cv2_vid_cap: cv2.VideoCapture, config: CameraConfig):
+    if config.low_latency:
+        apply_low_latency_settings(cv2_vid_cap, config.camera_id)
+    else:
+        # the driver's default buffer size isn't known - it's back once the camera is next opened
+        logger.info(f"Camera {config.camera_id} keeps its low latency settings until it's reconnected")
+
+
+_PROPERTY_SETTERS = {
+    "exposure": lambda cv2_vid_cap, config: cv2_vid_cap.set(cv2.CAP_PROP_EXPOSURE, config.exposure),
+    "resolution_width": lambda cv2_vid_cap, config: cv2_vid_cap.set(cv2.CAP_PROP_FRAME_WIDTH,
+                                                                    config.resolution_width),
+    "resolution_height": lambda cv2_vid_cap, config: cv2_vid_cap.set(cv2.CAP_PROP_FRAME_HEIGHT,
+                                                                     config.resolution_height),
+    "framerate": lambda cv2_vid_cap, config: cv2_vid_cap.set(cv2.CAP_PROP_FPS, config.framerate),
+    "fourcc": lambda cv2_vid_cap, config: cv2_vid_cap.set(cv2.CAP_PROP_FOURCC,
+                                                          cv2.VideoWriter_fourcc(*config.fourcc)),
+    "low_latency": _apply_low_latency_change,
+}
+
+
+def apply_low_latency_settings(cv2_vid_cap: cv2.VideoCapture, camera_id) -> bool:
+    """Ask the driver to buffer a single frame, then read it back - returns whether the camera took it"""
+    try:
+        buffer_size_accepted = cv2_vid_cap.set(cv2.CAP_PROP_BUFFERSIZE, LOW_LATENCY_BUFFER_SIZE)
+        buffer_size = cv2_vid_cap.get(cv2.CAP_PROP_BUFFERSIZE)
+    except Exception as e:
+        logger.warning(f"Camera {camera_id} doesn't support setting its buffer size ({e}) - keeping its default")
+        return False
+
+    if not buffer_size_accepted or buffer_size != LOW_LATENCY_BUFFER_SIZE:
+        logger.warning(f"Camera {camera_id} didn't take a buffer size of {LOW_LATENCY_BUFFER_SIZE} "
+                       f"(it reports {buffer_size}) - its frames may be a few frames stale")
+        return False
+    logger.info(f"Camera {camera_id} is buffering {LOW_LATENCY_BUFFER_SIZE} frame")
+    return True
@@ -0,0 +1,57 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+
+def get_changed_config_fields(old_camera_config: Optional[CameraConfig],
+                              new_camera_config: CameraConfig) -> List[str]:
+    """The fields that differ between two configs of the same camera (all of them, if there's no old config)"""
+    if old_camera_config is None:
+        return list(CameraConfig.model_fields)
+    return [field_name for field_name in CameraConfig.model_fields
+            if getattr(old_camera_config, field_name) != getattr(new_camera_config, field_name)]
+
+
+class CameraConfigDiff(BaseModel):
+    """What it takes to go from one camera config dictionary to another"""
+    added_camera_configs: Dict[str, CameraConfig] = {}
+    removed_camera_ids: List[str] = []
+    changed_camera_configs: Dict[str, CameraConfig] = {}  # only the cameras with any field changed
+    changed_fields: Dict[str, List[str]] = {}  # by camera id, for those cameras
+
+    @property
+    def is_empty(self) -> bool:
+        return (len(self.added_camera_configs) == 0 and len(self.removed_camera_ids) == 0
+                and len(self.changed_camera_configs) == 0)
+
+
+def diff_camera_config_dictionaries(old_camera_config_dictionary: Dict[str, CameraConfig],
+                                    new_camera_config_dictionary: Dict[str, CameraConfig]) -> CameraConfigDiff:
+    camera_config_diff = CameraConfigDiff(
+        added_camera_configs={camera_id: camera_config
+                              for camera_id, camera_config in new_camera_config_dictionary.items()
+                              if camera_id not in old_camera_config_dictionary},
+        removed_camera_ids=[camera_id for camera_id in old_camera_config_dictionary
+                            if camera_id not in new_camera_config_dictionary],
+    )
+    for camera_id, new_camera_config in new_camera_config_dictionary.items():
+        if camera_id not in old_camera_config_dictionary:
+            continue
+        changed_fields = get_changed_config_fields(old_camera_config_dictionary[camera_id], new_camera_config)
+        if len(changed_fields) > 0:
+            camera_config_diff.changed_camera_configs[camera_id] = new_camera_config
+            camera_config_diff.changed_fields[camera_id] = changed_fields
+    return camera_config_diff
+
+
+class CameraConfigApplyReport(BaseModel):
+    """How a config change went for one camera"""
+    camera_id: str
+    changed_fields: List[str] = []
+    # setting the changed properties on the camera (~0 if none were - e.g. only `rotate_video_cv2_code` changed)
+    apply_duration_seconds: float = 0.0
+    # from `CameraGroup.update_camera_configs` until the camera had applied it - includes getting it to the camera's
+    # process (None if the request's time wasn't known)
+    latency_seconds: Optional[float] = None
+    reconnected: bool = False  # the camera had stopped, and was reconnected to apply the config
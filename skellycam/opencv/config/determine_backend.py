@@ -6,7 +6,10 @@ import cv2
 logger = logging.getLogger(__name__)
 
 
-def determine_backend():
+def determine_backend(low_latency: bool = False):
+    if platform.system() == "Linux" and low_latency:
+        logger.debug(f"Low latency capture on Linux - using backend `cv2.CAP_V4L2`")
+        return cv2.CAP_V4L2
     if platform.system() == "Windows":
         logger.debug(f"Windows machine detected - using backend `cv2.CAP_DSHOW`")
         return cv2.CAP_DSHOW
@@ -1,17 +1,40 @@
 import logging
 import multiprocessing
+import platform
+import threading
 import time
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 
-from PySide6.QtCore import Signal
-
-from skellycam import CameraConfig
+from skellycam.detection.camera_hotplug_watcher import CameraDeviceEvent, CameraHotplugWatcher
 from skellycam.detection.detect_cameras import detect_cameras
+from skellycam.detection.private.camera_capability_cache import get_camera_capability_cache, get_stable_id
 from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.diagnostics.capture_metrics import get_capture_metrics
+from skellycam.diagnostics.profiling import ProfilingRequest
+from skellycam.opencv.camera.capture_pool import get_capture_pool
+from skellycam.opencv.camera.capture_watchdog import CameraOutageWindow
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.config.config_changes import (
+    CameraConfigApplyReport,
+    CameraConfigDiff,
+    diff_camera_config_dictionaries,
+)
+from skellycam.opencv.group.capture_pause_tracker import CameraPauseStatistics, CapturePauseTracker
+from skellycam.opencv.group.capture_process_supervisor import (
+    DEFAULT_HEARTBEAT_DEADLINE_SECONDS,
+    CameraRestartStatistics,
+    CaptureProcessSupervisor,
+)
+from skellycam.opencv.group.strategies.capture_process_context import get_capture_process_context
 from skellycam.opencv.group.strategies.grouped_process_strategy import (
     GroupedProcessStrategy,
 )
+from skellycam.opencv.group.strategies.same_process_strategy import SameProcessStrategy
 from skellycam.opencv.group.strategies.strategies import Strategy
+from skellycam.opencv.group.sync_quality_monitor import SyncQualityMonitor, SyncQualityReport
+from skellycam.opencv.sources.create_video_capture import is_hardware_camera_id
+from skellycam.opencv.sources.replay_video_capture import reset_process_replay_origin
+from skellycam.system.clock.clock_service import ClockService
 
 logger = logging.getLogger(__name__)
 
@@ -22,39 +45,94 @@ class CameraGroup:
             camera_ids_list: List[str] = None,
             strategy: Strategy = Strategy.X_CAM_PER_PROCESS,
             camera_config_dictionary: Dict[str, CameraConfig] = None,
+            cameras_per_process: int = None,
+            heartbeat_deadline_seconds: float = DEFAULT_HEARTBEAT_DEADLINE_SECONDS,
+            start_when_ready: bool = False,
+            watch_for_camera_hotplug: bool = False,
+            on_camera_device_event: Callable[[CameraDeviceEvent], None] = None,
     ):
+        """
+        :param cameras_per_process: how many cameras share a capture process (`Strategy.X_CAM_PER_PROCESS` only,
+        defaults to the library default). `skellycam.benchmarks.capacity_planner` measures what suits a machine
+        :param heartbeat_deadline_seconds: a capture process that's dead, or hasn't gone round its loop for this long,
+        is restarted (`Strategy.X_CAM_PER_PROCESS` only)
+        :param start_when_ready: `start()` returns straight away, and each camera delivers frames as soon as it's
+        ready - so one slow camera doesn't hold up the others. See `live_camera_ids`, `is_ready_to_record`
+        :param watch_for_camera_hotplug: while capturing, add cameras as they're plugged in and remove them as they're
+        unplugged - just that camera, the others carry on (Linux only, see `CameraHotplugWatcher`)
+        :param on_camera_device_event: called (from the watcher's thread) once a camera has been added or removed
+        """
         logger.info(
             f"Creating camera group for cameras: {camera_ids_list} with strategy {strategy} and camera configs {camera_config_dictionary}"
         )
         self._event_dictionary = None
+        self._start_time_seconds = None
+        self._startup_duration_seconds = None
+        self._teardown_duration_seconds = None
         self._strategy_enum = strategy
-        self._camera_ids = camera_ids_list
+        self._cameras_per_process = cameras_per_process
+        self._heartbeat_deadline_seconds = heartbeat_deadline_seconds
+        self._start_when_ready = start_when_ready
+        self._on_camera_device_event = on_camera_device_event
+        self._camera_hotplug_watcher: Optional[CameraHotplugWatcher] = None
+        if watch_for_camera_hotplug:
+            if platform.system() == "Linux":
+                self._camera_hotplug_watcher = CameraHotplugWatcher(self.handle_camera_device_event)
+            else:
+                logger.warning("Camera hotplug is only watched for on Linux - use `add_camera`/`remove_camera`")
+        self._camera_config_lock = threading.RLock()  # configs change from the hotplug watcher's thread, too
+        self._camera_startup_duration_seconds: Dict[str, float] = {}
 
+        # camera_id -> identity in the capability cache, resolved once per camera (it means enumerating devices)
+        self._stable_ids: Dict[str, str] = {}
         # Make optional, if a list of cams is sent then just use that
         if camera_ids_list is None:
             if camera_config_dictionary is not None:
                 camera_ids_list = list(camera_config_dictionary.keys())
             else:
-                camera_ids_list = detect_cameras().cameras_found_list
+                found_camera_cache = detect_cameras(keep_captures_open=strategy == Strategy.SAME_PROCESS)
+                camera_ids_list = found_camera_cache.cameras_found_list
+                self._stable_ids.update(found_camera_cache.stable_ids)
+        self._camera_ids = list(camera_ids_list)
 
         self._strategy_class = self._resolve_strategy(camera_ids_list)
+        self._sync_quality_monitor = SyncQualityMonitor(camera_ids_list)
+        self._capture_pause_tracker = CapturePauseTracker()
+        self._clock_service = ClockService()
+        self._capture_process_supervisor = CaptureProcessSupervisor(
+            processes=self._strategy_class.processes,
+            get_event_dictionary=lambda: self._event_dictionary,
+            get_camera_config_dictionary=lambda: self._camera_config_dictionary,
+            heartbeat_deadline_seconds=heartbeat_deadline_seconds,
+        )
+        self._outage_windows: Dict[tuple, CameraOutageWindow] = {}
+        self._config_apply_reports: Dict[str, CameraConfigApplyReport] = {}
 
         if camera_config_dictionary is None:
             logger.info(
-                f"No camera config dict passed in, using default config: {CameraConfig()}"
+                f"No camera config dict passed in, using last known-good configs (or default config: {CameraConfig()})"
             )
             self._camera_config_dictionary = {}
             for camera_id in camera_ids_list:
-                self._camera_config_dictionary[camera_id] = CameraConfig(
-                    camera_id=camera_id
-                )
+                self._camera_config_dictionary[camera_id] = self._get_default_camera_config(camera_id)
         else:
-            self._camera_config_dictionary = camera_config_dictionary
+            self._camera_config_dictionary = dict(camera_config_dictionary)
+
+        get_capture_metrics().add_camera_group(self)
 
     @property
     def is_capturing(self):
         return self._strategy_class.is_capturing
 
+    @property
+    def is_supervised(self) -> bool:
+        """Whether capture processes that die (or hang) are being restarted - while they are, `is_capturing` is False"""
+        return self._capture_process_supervisor.is_running
+
+    @property
+    def is_paused(self) -> bool:
+        return self._capture_pause_tracker.is_paused
+
     @property
     def exit_event(self):
         return self._exit_event
@@ -71,10 +149,195 @@ class CameraGroup:
     def queue_size(self) -> Dict[str, int]:
         return self._strategy_class.queue_size
 
-    def update_camera_configs(self, camera_config_dictionary: Dict[str, CameraConfig]):
-        logger.info(f"Updating camera configs to {camera_config_dictionary}")
-        self._camera_config_dictionary = camera_config_dictionary
-        self._strategy_class.update_camera_configs(camera_config_dictionary)
+    @property
+    def startup_duration_seconds(self) -> float:
+        """How long the last `start()` took, from launching the cameras until every camera was ready"""
+        return self._startup_duration_seconds
+
+    @property
+    def camera_startup_duration_seconds(self) -> Dict[str, float]:
+        """How long each camera took to be ready, from the last `start()` (only cameras that are, so far)"""
+        return dict(self._camera_startup_duration_seconds)
+
+    @property
+    def live_camera_ids(self) -> List[str]:
+        """The cameras that are ready and delivering frames - i.e. not in an outage (see `outage_windows`)"""
+        if self._event_dictionary is None:
+            return []
+        camera_ids_in_outages = {outage_window.camera_id for outage_window in self.outage_windows
+                                 if outage_window.end_timestamp_ns is None}
+        return [camera_id for camera_id in self._camera_ids
+                if camera_id not in camera_ids_in_outages and self.check_if_camera_is_ready(camera_id)]
+
+    @property
+    def selected_camera_ids(self) -> List[str]:
+        """The cameras to record from (`CameraConfig.use_this_camera`)"""
+        return [camera_id for camera_id in self._camera_ids
+                if self._camera_config_dictionary[camera_id].use_this_camera]
+
+    @property
+    def is_ready_to_record(self) -> bool:
+        """Every selected camera is live - the others (e.g. still connecting, but not selected) don't matter"""
+        live_camera_ids = self.live_camera_ids
+        return all(camera_id in live_camera_ids for camera_id in self.selected_camera_ids)
+
+    @property
+    def teardown_duration_seconds(self) -> float:
+        """How long the last `close()` took, from telling the cameras to stop until they had"""
+        return self._teardown_duration_seconds
+
+    @property
+    def process_startup_duration_seconds(self) -> Dict[str, float]:
+        """How long each capture process took to start running (empty for `Strategy.SAME_PROCESS`)"""
+        return self._strategy_class.process_startup_duration_seconds
+
+    @property
+    def clock_service(self) -> ClockService:
+        """
+        Maps frame timestamps (`perf_counter_ns`) to wall clock time - sampled from `start()` until `close()`.
+        e.g. `camera_group.clock_service.to_wall_ns(frame_payload.timestamp_ns)`
+        """
+        return self._clock_service
+
+    @property
+    def sync_quality(self) -> SyncQualityReport:
+        """How well the cameras' latest frames line up (skew), and how steady each camera's frame rate is (jitter)"""
+        return self._sync_quality_monitor.get_report()
+
+    @property
+    def outage_windows(self) -> List[CameraOutageWindow]:
+        """
+        Spans of time cameras delivered no frames (and were being reconnected) since `start()` - saved with
+        recordings, so gaps in a camera's video can be told apart from synchronization errors
+        """
+        for outage_update in self._strategy_class.get_outage_updates():
+            # an outage is reported when it starts, and again when it ends
+            self._outage_windows[(outage_update.camera_id, outage_update.start_timestamp_ns)] = outage_update
+        return sorted(self._outage_windows.values(), key=lambda outage_window: outage_window.start_timestamp_ns)
+
+    @property
+    def restart_statistics(self) -> Dict[str, CameraRestartStatistics]:
+        """How many times each camera's capture process was restarted while capturing, and the downtime that cost"""
+        return self._capture_process_supervisor.restart_statistics
+
+    @property
+    def pause_statistics(self) -> Dict[str, CameraPauseStatistics]:
+        """By camera id: time spent paused since `start()`, and how long the camera took to deliver a frame after the
+        last resume"""
+        return self._capture_pause_tracker.get_statistics(self._camera_ids)
+
+    @property
+    def config_apply_reports(self) -> Dict[str, CameraConfigApplyReport]:
+        """By camera id: how the latest config change (or adding it) went - once the camera has applied it"""
+        for config_apply_report in self._strategy_class.get_config_apply_reports():
+            latency_string = ("" if config_apply_report.latency_seconds is None
+                              else f", {config_apply_report.latency_seconds:.3f} seconds after it was asked to")
+            logger.info(f"Camera {config_apply_report.camera_id} applied {config_apply_report.changed_fields} in "
+                        f"{config_apply_report.apply_duration_seconds:.3f} seconds{latency_string}")
+            self._config_apply_reports[config_apply_report.camera_id] = config_apply_report
+        return dict(self._config_apply_reports)
+
+    def update_camera_configs(self, camera_config_dictionary: Dict[str, CameraConfig]) -> CameraConfigDiff:
+        """
+        Apply only what changed, without stopping the group: cameras missing from `camera_config_dictionary` are
+        removed, new ones added (into the running capture processes), and each changed camera has only its changed
+        properties set. See `config_apply_reports` for how long each camera took
+        """
+        with self._camera_config_lock:
+            return self._update_camera_configs(camera_config_dictionary)
+
+    def _update_camera_configs(self, camera_config_dictionary: Dict[str, CameraConfig]) -> CameraConfigDiff:
+        requested_timestamp_ns = time.perf_counter_ns()
+        camera_config_diff = diff_camera_config_dictionaries(self._camera_config_dictionary, camera_config_dictionary)
+        if camera_config_diff.is_empty:
+            logger.debug("Camera configs unchanged - nothing to update")
+            return camera_config_diff
+        logger.info(f"Updating camera configs - added: {list(camera_config_diff.added_camera_configs)}, "
+                    f"removed: {camera_config_diff.removed_camera_ids}, changed: {camera_config_diff.changed_fields}")
+        # first - a capture process restarted meanwhile is started with these
+        self._camera_config_dictionary = dict(camera_config_dictionary)
+
+        for camera_id in camera_config_diff.removed_camera_ids:
+            self._strategy_class.remove_camera(camera_id)
+            self._camera_ids.remove(camera_id)
+            self._config_apply_reports.pop(camera_id, None)
+            self._stable_ids.pop(camera_id, None)  # another camera may turn up on its port
+        for camera_id, camera_config in camera_config_diff.added_camera_configs.items():
+            self._strategy_class.add_camera(camera_config, requested_timestamp_ns=requested_timestamp_ns)
+            self._camera_ids.append(camera_id)
+        if len(camera_config_diff.changed_camera_configs) > 0:
+            self._strategy_class.update_camera_configs(camera_config_diff.changed_camera_configs,
+                                                       requested_timestamp_ns=requested_timestamp_ns)
+
+        if len(camera_config_diff.added_camera_configs) > 0 or len(camera_config_diff.removed_camera_ids) > 0:
+            self._sync_quality_monitor.set_camera_ids(self._camera_ids)
+        self._record_applied_camera_configs()
+        return camera_config_diff
+
+    def add_camera(self, camera_id: str, camera_config: CameraConfig = None) -> CameraConfigDiff:
+        """Start capturing from another camera, without interrupting the others"""
+        if camera_config is None:
+            camera_config = self._get_default_camera_config(camera_id)
+        with self._camera_config_lock:
+            return self.update_camera_configs({**self._camera_config_dictionary, camera_id: camera_config})
+
+    def remove_camera(self, camera_id: str) -> CameraConfigDiff:
+        """Close one camera, without interrupting the others"""
+        with self._camera_config_lock:
+            return self.update_camera_configs({existing_camera_id: camera_config
+                                               for existing_camera_id, camera_config
+                                               in self._camera_config_dictionary.items()
+                                               if existing_camera_id != camera_id})
+
+    def handle_camera_device_event(self, camera_device_event: CameraDeviceEvent):
+        """Add the camera that was plugged in, or remove the one that was unplugged (see `CameraHotplugWatcher`)"""
+        camera_id = camera_device_event.camera_id
+        if camera_device_event.event_type == "added":
+            if camera_id in self._camera_ids:
+                return
+            logger.info(f"Camera {camera_id} was plugged in - adding it")
+            self.add_camera(camera_id)  # with its last known-good config, if it's been used before
+        else:
+            if camera_id not in self._camera_ids:
+                return
+            logger.info(f"Camera {camera_id} was unplugged - removing it")
+            self.remove_camera(camera_id)
+        if self._on_camera_device_event is not None:
+            self._on_camera_device_event(camera_device_event)
+
+    def pause(self):
+        """
+        Stop grabbing frames, but keep the cameras open (and configured) - the capture threads are parked and nothing
+        is sent between processes, so capturing costs next to nothing until `resume()`
+        """
+        if self._event_dictionary is None or self.is_paused:
+            return
+        logger.info(f"Pausing cameras {self._camera_ids}")
+        self._capture_pause_tracker.pause()
+        self._strategy_class.pause()
+
+    def resume(self):
+        """The cameras' first frames are fresh ones (not what the drivers buffered meanwhile) - see `pause_statistics`"""
+        if self._event_dictionary is None or not self.is_paused:
+            return
+        logger.info(f"Resuming cameras {self._camera_ids}")
+        self._sync_quality_monitor.reset()  # a pause isn't a gap in the frame rate, or a sync error
+        self._capture_pause_tracker.resume()
+        self._strategy_class.resume()
+
+    def wait_for_resume(self, timeout_seconds: float = None) -> bool:
+        """Block while paused (up to `timeout_seconds`) - returns whether the group is capturing (not paused)"""
+        if self._event_dictionary is None:
+            return True
+        return self._event_dictionary["capture"].wait(timeout_seconds)
+
+    def start_profiling(self, profiling_request: ProfilingRequest):
+        """
+        Profile the cameras' capture processes (or, for `Strategy.SAME_PROCESS`, their threads) for
+        `profiling_request.duration_seconds` - the profiles are saved to the `profiles` folder next to the logs
+        """
+        logger.info(f"Requesting profiles of cameras {self._camera_ids}: {profiling_request}")
+        self._strategy_class.start_profiling(profiling_request)
 
     def start(self):
         """
@@ -82,22 +345,61 @@ class CameraGroup:
         :return:
         """
         logger.info(f"Starting camera group with strategy {self._strategy_enum}")
-        self._exit_event = multiprocessing.Event()
-        self._start_event = multiprocessing.Event()
+        self._start_time_seconds = time.perf_counter()
+        self._startup_duration_seconds = None  # until every camera of this start is ready
+        self._sync_quality_monitor.reset()
+        self._outage_windows = {}
+        self._config_apply_reports = {}
+        self._camera_startup_duration_seconds = {}
+        self._capture_pause_tracker.reset()
+        self._clock_service.start()
+        # replays captured in this process start together when this group starts grabbing - not on a clock some
+        # earlier replay started (capture processes start with a fresh one)
+        reset_process_replay_origin()
+        if self._strategy_enum != Strategy.SAME_PROCESS:
+            # captures held open by detection can't follow the cameras into other processes, and would keep the
+            # devices busy there
+            get_capture_pool().release(self._camera_ids)
+
+        # shared with the capture processes, so they must come from the same multiprocessing context
+        capture_process_context = get_capture_process_context()
+        self._exit_event = capture_process_context.Event()
+        self._start_event = capture_process_context.Event()
+        self._capture_event = capture_process_context.Event()  # cleared while paused
+        self._capture_event.set()
         self._event_dictionary = {"start": self._start_event,
-                                  "exit": self._exit_event}
+                                  "exit": self._exit_event,
+                                  "capture": self._capture_event}
         self._strategy_class.start_capture(
             event_dictionary=self._event_dictionary,
             camera_config_dict=self._camera_config_dictionary,
         )
-
-        self._wait_for_cameras_to_start()
-
-    def _wait_for_cameras_to_start(self, restart_process_if_it_dies: bool = True):
+        if self._camera_hotplug_watcher is not None:
+            self._camera_hotplug_watcher.start()
+
+        if not self._start_when_ready:
+            self._wait_for_cameras_to_start()
+            return
+
+        # each camera's frames flow as soon as it's ready - this keeps track of which are, meanwhile
+        self._sync_quality_monitor.set_camera_ids([])
+        self._start_event.set()
+        self._capture_process_supervisor.start()
+        threading.Thread(target=self._wait_for_cameras_to_start,
+                         kwargs={"restart_process_if_it_dies": False, "exit_event": self._exit_event},
+                         name="CameraGroup startup",
+                         daemon=True).start()
+
+    def _wait_for_cameras_to_start(self, restart_process_if_it_dies: bool = True, exit_event=None):
+        """
+        :param exit_event: stop waiting once it's set (when waiting in the background, for `start_when_ready`)
+        """
         logger.info(f"Waiting for cameras {self._camera_ids} to start")
         all_cameras_started = False
         while not all_cameras_started:
-            time.sleep(0.5)
+            if exit_event is not None and exit_event.is_set():
+                logger.info(f"Camera group closed before cameras {self._camera_ids} had all started")
+                return
             camera_started_dictionary = dict.fromkeys(self._camera_ids, False)
 
             for camera_id in self._camera_ids:
@@ -106,44 +408,136 @@ class CameraGroup:
                 )
 
             logger.debug(f"Camera started? {camera_started_dictionary}")
+            self._record_camera_startup_durations(camera_started_dictionary)
 
             logger.debug(f"Active processes {multiprocessing.active_children()}")
             if restart_process_if_it_dies:
                 self._restart_dead_processes()
 
             all_cameras_started = all(list(camera_started_dictionary.values()))
-
-        logger.info(f"All cameras {self._camera_ids} started!")
+            if not all_cameras_started:
+                time.sleep(0.05)
+
+        self._startup_duration_seconds = time.perf_counter() - self._start_time_seconds
+        logger.info(f"All cameras {self._camera_ids} started in {self._startup_duration_seconds:.3f} seconds!")
+        if len(self.process_startup_duration_seconds) > 0:
+            logger.info(f"Capture process startup durations (seconds): {self.process_startup_duration_seconds}")
+        for process_name, clock_sample in self._strategy_class.process_clock_samples.items():
+            self._clock_service.add_process_sample(process_name, clock_sample)
         self._start_event.set()  # start frame capture on all cameras
+        self._capture_process_supervisor.start()
+        self._record_applied_camera_configs()
+
+    def _record_camera_startup_durations(self, camera_started_dictionary: Dict[str, bool]):
+        newly_started_camera_ids = [camera_id for camera_id, camera_started in camera_started_dictionary.items()
+                                    if camera_started and camera_id not in self._camera_startup_duration_seconds]
+        if len(newly_started_camera_ids) == 0:
+            return
+        for camera_id in newly_started_camera_ids:
+            self._camera_startup_duration_seconds[camera_id] = time.perf_counter() - self._start_time_seconds
+            logger.info(f"Camera {camera_id} ready after "
+                        f"{self._camera_startup_duration_seconds[camera_id]:.3f} seconds")
+        if self._start_when_ready:
+            # rounds only complete once every camera in them has a frame - so measure the ones that are ready
+            self._sync_quality_monitor.set_camera_ids(
+                [camera_id for camera_id in self._camera_ids if camera_id in self._camera_startup_duration_seconds])
+
+    def _get_default_camera_config(self, camera_id: str) -> CameraConfig:
+        if not is_hardware_camera_id(camera_id):
+            return CameraConfig(camera_id=camera_id)
+        known_good_camera_config = get_camera_capability_cache().get_known_good_config(
+            stable_id=self._get_stable_id(camera_id), camera_id=camera_id
+        )
+        if known_good_camera_config is not None:
+            return known_good_camera_config
+        return CameraConfig(camera_id=camera_id)
+
+    def _get_stable_id(self, camera_id: str) -> str:
+        if camera_id not in self._stable_ids:
+            self._stable_ids[camera_id] = get_stable_id(camera_id)
+        return self._stable_ids[camera_id]
+
+    def _record_applied_camera_configs(self):
+        camera_capability_cache = get_camera_capability_cache()
+        has_changed = False
+        for camera_id, camera_config in self._camera_config_dictionary.items():
+            if not is_hardware_camera_id(camera_id):
+                continue  # nothing worth remembering about synthetic/replayed sources
+            if camera_capability_cache.record_applied_config(stable_id=self._get_stable_id(camera_id),
+                                                             camera_config=camera_config):
+                has_changed = True
+        if not has_changed:
+            return
+        try:
+            camera_capability_cache.save()
+        except OSError as e:
+            logger.warning(f"Could not save camera capability cache: {e}")
 
     def check_if_camera_is_ready(self, cam_id: str):
         return self._strategy_class.check_if_camera_is_ready(cam_id)
 
     def get_by_cam_id(self, cam_id: str):
-        return self._strategy_class.get_current_frame_by_cam_id(cam_id)
+        frame_payload = self._strategy_class.get_current_frame_by_cam_id(cam_id)
+        get_capture_metrics().add_delivered_frames({cam_id: frame_payload},
+                                                   is_ipc=self._strategy_enum != Strategy.SAME_PROCESS)
+        self._sync_quality_monitor.add_frames({cam_id: frame_payload})
+        self._capture_pause_tracker.add_frames({cam_id: frame_payload})
+        return frame_payload
 
     def latest_frames(self) -> Dict[str, FramePayload]:
-        return self._strategy_class.get_latest_frames()
+        frame_payload_dictionary = self._strategy_class.get_latest_frames()
+        get_capture_metrics().add_delivered_frames(frame_payload_dictionary,
+                                                   is_ipc=self._strategy_enum != Strategy.SAME_PROCESS)
+        self._sync_quality_monitor.add_frames(frame_payload_dictionary)
+        self._capture_pause_tracker.add_frames(frame_payload_dictionary)
+        return frame_payload_dictionary
 
     def _resolve_strategy(self, cam_ids: List[str]):
         if self._strategy_enum == Strategy.X_CAM_PER_PROCESS:
-            return GroupedProcessStrategy(cam_ids)
-
-    def close(self, wait_for_exit: bool = True, cameras_closed_signal: Signal = None):
+            if self._cameras_per_process is not None:
+                return GroupedProcessStrategy(cam_ids,
+                                              cameras_per_process=self._cameras_per_process,
+                                              connect_cameras_in_background=self._start_when_ready)
+            return GroupedProcessStrategy(cam_ids, connect_cameras_in_background=self._start_when_ready)
+        if self._strategy_enum == Strategy.SAME_PROCESS:
+            return SameProcessStrategy(cam_ids, connect_cameras_in_background=self._start_when_ready)
+
+    def close(self, wait_for_exit: bool = True, cameras_closed_signal=None):
+        """
+        :param wait_for_exit: wait for the cameras to stop - capture processes that don't exit in time are terminated,
+        then killed (see `stop_processes`)
+        :param cameras_closed_signal: optional (Qt) signal to emit once the cameras have closed
+        """
         logger.info("Closing camera group")
+        teardown_start_time_seconds = time.perf_counter()
+        if self._camera_hotplug_watcher is not None:
+            self._camera_hotplug_watcher.stop()
+        self._capture_process_supervisor.stop()
         self._set_exit_event()
-        # self._terminate_processes()
+        self._strategy_class.close(wait_for_exit=wait_for_exit)
+        self._clock_service.stop()
 
         if wait_for_exit:
-            while self.is_capturing:
-                logger.debug("waiting for camera group to stop....")
-                time.sleep(0.1)
+            self._teardown_duration_seconds = time.perf_counter() - teardown_start_time_seconds
+            logger.info(f"Camera group closed in {self._teardown_duration_seconds:.3f} seconds")
         if cameras_closed_signal is not None:
             cameras_closed_signal.emit()
 
+    def restart(self):
+        """Close the cameras and start them again, e.g. to reconnect them after a config change"""
+        restart_start_time_seconds = time.perf_counter()
+        self.close()
+        self.start()
+        # with `start_when_ready`, `start()` returns before the cameras are all up
+        startup_string = ("still starting" if self._startup_duration_seconds is None
+                          else f"startup: {self._startup_duration_seconds:.3f}")
+        logger.info(f"Camera group restarted in {time.perf_counter() - restart_start_time_seconds:.3f} seconds "
+                    f"(teardown: {self._teardown_duration_seconds:.3f}, {startup_string})")
+
     def _set_exit_event(self):
         logger.info("Setting exit event")
         self.exit_event.set()
+        self._capture_event.set()  # paused processes wake up to exit
 
     def _terminate_processes(self):
         logger.info("Terminating processes")
@@ -152,12 +546,10 @@ class CameraGroup:
             cam_group_process.terminate()
 
     def _restart_dead_processes(self):
-        active_processes = multiprocessing.active_children()
-        active_process_names = [process.name for process in active_processes]
         for process in self._strategy_class.processes:
-            if process.name not in active_process_names:
+            if not process.is_capturing:
                 logger.info(f"Process {process.name} died! Restarting now...")
-                process.start_capture(
+                process.restart(
                     event_dictionary=self._event_dictionary,
                     camera_config_dict=self._camera_config_dictionary,
                 )
@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from skellycam.detection.models.frame_payload import FramePayload
+
+logger = logging.getLogger(__name__)
+
+
+class CameraPauseStatistics(BaseModel):
+    camera_id: str
+    is_paused: bool = False
+    number_of_pauses: int = 0
+    paused_seconds: float = 0.0  # in total, including the ongoing pause
+    # from the last resume until the camera's first frame after it was delivered (None until it has been)
+    resume_latency_seconds: Optional[float] = None
+
+
+class CapturePauseTracker:
+    """Times a camera group's pauses, and how long each camera takes to deliver a (fresh) frame after a resume"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def is_paused(self) -> bool:
+        return self._paused_timestamp_ns is not None
+
+    def reset(self):
+        self._paused_timestamp_ns: Optional[int] = None
+        self._resumed_timestamp_ns: Optional[int] = None
+        self._number_of_pauses = 0
+        self._paused_duration_ns = 0  # of the pauses that have ended
+        self._resume_latency_ns: Dict[str, int] = {}
+
+    def pause(self):
+        with self._lock:
+            if self._paused_timestamp_ns is not None:
+                return
+            self._paused_timestamp_ns = time.perf_counter_ns()
+            self._number_of_pauses += 1
+
+    def resume(self):
+        with self._lock:
+            if self._paused_timestamp_ns is None:
+                return
+            self._resumed_timestamp_ns = time.perf_counter_ns()
+            self._paused_duration_ns += self._resumed_timestamp_ns - self._paused_timestamp_ns
+            self._paused_timestamp_ns = None
+            self._resume_latency_ns = {}
+
+    def add_frames(self, frame_payload_dictionary: Dict[str, Optional[FramePayload]]):
+        if self._resumed_timestamp_ns is None:
+            return
+        delivered_timestamp_ns = time.perf_counter_ns()
+        with self._lock:
+            for camera_id, frame_payload in frame_payload_dictionary.items():
+                if frame_payload is None or camera_id in self._resume_latency_ns:
+                    continue
+                if frame_payload.timestamp_ns is not None and frame_payload.timestamp_ns < self._resumed_timestamp_ns:
+                    continue  # captured before the resume - not the one we're waiting for
+                self._resume_latency_ns[camera_id] = delivered_timestamp_ns - self._resumed_timestamp_ns
+                logger.debug(f"Camera {camera_id} delivered its first frame "
+                             f"{self._resume_latency_ns[camera_id] / 1e6:.1f} ms after resuming")
+
+    def get_statistics(self, camera_ids: List[str]) -> Dict[str, CameraPauseStatistics]:
+        with self._lock:
+            paused_duration_ns = self._paused_duration_ns
+            if self._paused_timestamp_ns is not None:
+                paused_duration_ns += time.perf_counter_ns() - self._paused_timestamp_ns
+            return {
+                camera_id: CameraPauseStatistics(
+                    camera_id=camera_id,
+                    is_paused=self._paused_timestamp_ns is not None,
+                    number_of_pauses=self._number_of_pauses,
+                    paused_seconds=paused_duration_ns / 1e9,
+                    resume_latency_seconds=(self._resume_latency_ns[camera_id] / 1e9
+                                            if camera_id in self._resume_latency_ns else None),
+                )
+                for camera_id in camera_ids
+            }
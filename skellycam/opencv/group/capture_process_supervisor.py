@@ -0,0 +1,143 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.group.strategies.cam_group_queue_process import CamGroupQueueProcess
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEARTBEAT_DEADLINE_SECONDS = 2.0
+DEFAULT_RESTART_DEADLINE_SECONDS = 30.0  # a restarted process whose cameras aren't ready by then is restarted again
+
+
+class CameraRestartStatistics(BaseModel):
+    camera_id: str
+    number_of_restarts: int = 0
+    downtime_seconds: float = 0.0  # from its process's last heartbeat until its camera was ready again
+    last_restart_reason: Optional[str] = None
+
+
+class _PendingRestart:
+    def __init__(self, downtime_start_seconds: float, restart_time_seconds: float):
+        self.downtime_start_seconds = downtime_start_seconds
+        self.restart_time_seconds = restart_time_seconds
+
+
+class CaptureProcessSupervisor:
+    """
+    Watches the capture processes from the main process while the cameras run: a process that died, or whose
+    heartbeat (see `CamGroupQueueProcess.heartbeat_age_seconds`) is older than `heartbeat_deadline_seconds`, is
+    restarted with its cameras' current configs - the other processes keep capturing
+    """
+
+    def __init__(self,
+                 processes: List[CamGroupQueueProcess],
+                 get_event_dictionary: Callable[[], dict],
+                 get_camera_config_dictionary: Callable[[], Dict[str, CameraConfig]],
+                 heartbeat_deadline_seconds: float = DEFAULT_HEARTBEAT_DEADLINE_SECONDS,
+                 restart_deadline_seconds: float = DEFAULT_RESTART_DEADLINE_SECONDS):
+        self._processes = processes
+        self._get_event_dictionary = get_event_dictionary
+        self._get_camera_config_dictionary = get_camera_config_dictionary
+        self._heartbeat_deadline_seconds = heartbeat_deadline_seconds
+        self._restart_deadline_seconds = restart_deadline_seconds
+
+        self._lock = threading.Lock()
+        self._restart_statistics: Dict[str, CameraRestartStatistics] = {
+            camera_id: CameraRestartStatistics(camera_id=camera_id)
+            for process in processes for camera_id in process.camera_ids}
+        self._pending_restarts: Dict[int, _PendingRestart] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def restart_statistics(self) -> Dict[str, CameraRestartStatistics]:
+        with self._lock:
+            return {camera_id: restart_statistics.model_copy()
+                    for camera_id, restart_statistics in self._restart_statistics.items()}
+
+    @property
+    def is_running(self) -> bool:
+        return len(self._processes) > 0 and self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._supervise, name="CaptureProcessSupervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Call before the processes are told to exit, so they aren't 'restarted' on the way out"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def check_processes(self):
+        # a copy - processes are added and removed along with cameras (see `CameraGroup.update_camera_configs`)
+        for process in list(self._processes):
+            if self._stop_event.is_set():
+                return
+            if process not in self._processes:
+                self._pending_restarts.pop(id(process), None)
+                continue  # removed since
+            pending_restart = self._pending_restarts.get(id(process))
+            if pending_restart is not None:
+                self._check_pending_restart(process, pending_restart)
+                continue
+
+            if not process.is_capturing:
+                self._restart(process, reason="process died")
+                continue
+            heartbeat_age_seconds = process.heartbeat_age_seconds
+            if heartbeat_age_seconds is not None and heartbeat_age_seconds > self._heartbeat_deadline_seconds:
+                self._restart(process, reason=f"no heartbeat for {heartbeat_age_seconds:.2f} seconds")
+
+    def _supervise(self):
+        # check a few times per deadline, so a dead process is caught within it
+        while not self._stop_event.wait(self._heartbeat_deadline_seconds / 4):
+            try:
+                self.check_processes()
+            except Exception as e:
+                logger.exception(f"Problem supervising capture processes: {e}")
+
+    def _check_pending_restart(self, process: CamGroupQueueProcess, pending_restart: _PendingRestart):
+        if all(process.check_if_camera_is_ready(camera_id) for camera_id in process.camera_ids):
+            downtime_seconds = time.perf_counter() - pending_restart.downtime_start_seconds
+            logger.info(f"Capture process {process.name} is back after {downtime_seconds:.2f} seconds")
+            with self._lock:
+                for camera_id in process.camera_ids:
+                    self._get_restart_statistics(camera_id).downtime_seconds += downtime_seconds
+            del self._pending_restarts[id(process)]
+            return
+
+        restart_duration_seconds = time.perf_counter() - pending_restart.restart_time_seconds
+        if not process.is_capturing or restart_duration_seconds > self._restart_deadline_seconds:
+            self._restart(process, reason=f"restart didn't complete ({restart_duration_seconds:.2f} seconds)")
+
+    def _restart(self, process: CamGroupQueueProcess, reason: str):
+        logger.error(f"Restarting capture process {process.name} for cameras {process.camera_ids}: {reason}")
+        pending_restart = self._pending_restarts.get(id(process))
+        if pending_restart is not None:
+            downtime_start_seconds = pending_restart.downtime_start_seconds
+        else:
+            heartbeat_age_seconds = process.heartbeat_age_seconds or 0.0
+            downtime_start_seconds = time.perf_counter() - heartbeat_age_seconds
+
+        with self._lock:
+            for camera_id in process.camera_ids:
+                self._get_restart_statistics(camera_id).number_of_restarts += 1
+                self._get_restart_statistics(camera_id).last_restart_reason = reason
+
+        process.restart(event_dictionary=self._get_event_dictionary(),
+                        camera_config_dict=self._get_camera_config_dictionary())
+        self._pending_restarts[id(process)] = _PendingRestart(downtime_start_seconds=downtime_start_seconds,
+                                                              restart_time_seconds=time.perf_counter())
+
+    def _get_restart_statistics(self, camera_id: str) -> CameraRestartStatistics:
+        # cameras added while capturing aren't known up front
+        return self._restart_statistics.setdefault(camera_id, CameraRestartStatistics(camera_id=camera_id))
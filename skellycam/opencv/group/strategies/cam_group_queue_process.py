@@ -1,65 +1,175 @@
 import logging
 import math
 import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from multiprocessing import Process
 from time import perf_counter_ns, sleep
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 
 from setproctitle import setproctitle
 
-from skellycam import Camera, CameraConfig
+from skellycam.opencv.camera.camera import Camera
+from skellycam.opencv.camera.capture_watchdog import CameraOutageWindow
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.config.config_changes import CameraConfigApplyReport, get_changed_config_fields
 from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.diagnostics.frame_tracing import FrameStage, mark_frame_stage, record_frame_trace
+from skellycam.diagnostics.profiling import ProfilingRequest, ProfilingSession, start_profiling_from_environment
+from skellycam.opencv.group.strategies.capture_process_context import get_capture_process_context, \
+    ignore_keyboard_interrupts
+from skellycam.opencv.group.strategies.capture_process_logging import configure_capture_process_logging, \
+    get_log_record_queue
 from skellycam.opencv.group.strategies.queue_communicator import QueueCommunicator
+from skellycam.system.clock.clock_service import ClockSample, take_clock_sample
 
 logger = logging.getLogger(__name__)
 
+# `CameraConfigUpdate`s, and the other control messages (`ProfilingRequest`, `AddCameraRequest`, `RemoveCameraRequest`)
 CAMERA_CONFIG_DICT_QUEUE_NAME = "camera_config_dict_queue"
+# `CameraOutageWindow` updates and `CameraConfigApplyReport`s, back to the parent
+CAMERA_STATUS_QUEUE_NAME = "camera_status_queue"
+CAPTURE_PROCESS_PROFILING_ROLE = "capture_process"
+# shutdown escalates: the exit event, then SIGTERM, then SIGKILL - each given this long before the next
+PROCESS_JOIN_TIMEOUT_SECONDS = 0.5
+PROCESS_TERMINATE_TIMEOUT_SECONDS = 0.25
+# while paused the process waits on the `capture` event - woken straight away by a resume, and at least this often
+# meanwhile (for control messages, and to keep the heartbeat going)
+PAUSED_WAIT_SECONDS = 0.1
+
+
+@dataclass
+class CameraConfigUpdate:
+    camera_config_dictionary: Dict[str, CameraConfig]  # only the cameras that changed
+    requested_timestamp_ns: Optional[int] = None
+
+
+@dataclass
+class AddCameraRequest:
+    camera_config: CameraConfig
+    frame_queue: Any  # Manager proxies - they can be sent to a running process, unlike plain queues and events
+    ready_event: Any
+    requested_timestamp_ns: Optional[int] = None
+
+
+@dataclass
+class RemoveCameraRequest:
+    camera_id: str
 
 
 class CamGroupQueueProcess:
-    def __init__(self, cam_ids: List[str]):
+    def __init__(self, cam_ids: List[str], connect_cameras_in_background: bool = False):
+        """
+        :param connect_cameras_in_background: connect the cameras all at once, and deliver each one's frames as soon as
+        it's connected - rather than one after the other, before the frame loop starts
+        """
 
         if len(cam_ids) == 0:
             raise ValueError("CamGroupProcess must have at least one camera")
 
         self._cameras_ready_event_dictionary = None
-        self._cam_ids = cam_ids
+        self._cam_ids = list(cam_ids)
+        self._connect_cameras_in_background = connect_cameras_in_background
         self._process: Process = None
         self._payload = None
+        self._launch_timestamp_ns = None
+        self._process_started_timestamp_ns = None
+        self._process_clock_sample = None
+        self._heartbeat_timestamp_ns = None
         queue_name_list = self._cam_ids.copy()
         queue_name_list.append(CAMERA_CONFIG_DICT_QUEUE_NAME)
-        communicator = QueueCommunicator(queue_name_list)
-        self._queues = communicator.queues
+        queue_name_list.append(CAMERA_STATUS_QUEUE_NAME)
+        self._queue_communicator = QueueCommunicator(queue_name_list)
+        self._queues = self._queue_communicator.queues
+        self._outage_updates: List[CameraOutageWindow] = []
+        self._config_apply_reports: List[CameraConfigApplyReport] = []
 
     @property
     def camera_ids(self):
         return self._cam_ids
 
+    @property
+    def number_of_cameras(self) -> int:
+        return len(self._cam_ids)
+
     @property
     def name(self):
         return self._process.name
 
+    @property
+    def startup_duration_seconds(self) -> Optional[float]:
+        """Time from launching the process until it was running our code (None until it is)"""
+        if self._process_started_timestamp_ns is None or self._process_started_timestamp_ns.value == 0:
+            return None
+        return (self._process_started_timestamp_ns.value - self._launch_timestamp_ns) / 1e9
+
+    @property
+    def clock_sample(self) -> Optional[ClockSample]:
+        """A monotonic/wall clock sample the process took when it started (None until it has)"""
+        if self._process_clock_sample is None or self._process_clock_sample[0] == 0:
+            return None
+        monotonic_ns, wall_ns, uncertainty_ns, process_id = self._process_clock_sample[:]
+        return ClockSample(monotonic_ns=monotonic_ns, wall_ns=wall_ns, uncertainty_ns=uncertainty_ns,
+                           process_id=process_id)
+
+    @property
+    def heartbeat_age_seconds(self) -> Optional[float]:
+        """Time since the process's frame loop last went round (None until it has started going round)"""
+        if self._heartbeat_timestamp_ns is None or self._heartbeat_timestamp_ns.value == 0:
+            return None
+        return (perf_counter_ns() - self._heartbeat_timestamp_ns.value) / 1e9
+
     def start_capture(
             self,
             event_dictionary: Dict[str, multiprocessing.Event],
             camera_config_dict: Dict[str, CameraConfig],
+            requested_timestamp_ns: int = None,
     ):
         """
         Start capturing frames. Only return if the underlying process is fully running.
+        :param requested_timestamp_ns: for cameras added to a running group - when they were asked for, so the process
+        reports how long they took to connect (see `get_config_apply_reports`)
         :return:
         """
 
-        logger.info(f"Starting capture `Process` for {self._cam_ids}")
+        capture_process_context = get_capture_process_context()
+        logger.info(
+            f"Starting capture `Process` for {self._cam_ids} (start method: {capture_process_context.get_start_method()})"
+        )
 
         self._cameras_ready_event_dictionary = {
-            camera_id: multiprocessing.Event() for camera_id in self._cam_ids
+            camera_id: capture_process_context.Event() for camera_id in self._cam_ids
         }
-        event_dictionary["ready"] = self._cameras_ready_event_dictionary
+        # only send the process what it needs - everything here is pickled to the child
+        process_event_dictionary = {
+            "start": event_dictionary["start"],
+            "exit": event_dictionary["exit"],
+            "capture": event_dictionary.get("capture"),  # cleared to pause the cameras
+            "ready": self._cameras_ready_event_dictionary,
+        }
+        process_camera_config_dict = {
+            camera_id: camera_config_dict[camera_id] for camera_id in self._cam_ids
+        }
+        self._process_started_timestamp_ns = capture_process_context.Value("q", 0, lock=False)
+        self._process_clock_sample = capture_process_context.Array("q", 4, lock=False)
+        self._heartbeat_timestamp_ns = capture_process_context.Value("q", 0, lock=False)
 
-        self._process = Process(
+        self._launch_timestamp_ns = perf_counter_ns()
+        self._process = capture_process_context.Process(
             name=f"Cameras {self._cam_ids}",
             target=CamGroupQueueProcess._begin,
-            args=(self._cam_ids, self._queues, event_dictionary, camera_config_dict),
+            args=(self._cam_ids,
+                  self._queues,
+                  process_event_dictionary,
+                  process_camera_config_dict,
+                  self._process_started_timestamp_ns,
+                  self._process_clock_sample,
+                  self._heartbeat_timestamp_ns,
+                  requested_timestamp_ns,
+                  self._connect_cameras_in_background,
+                  get_log_record_queue(),
+                  logging.getLogger().getEffectiveLevel()),
         )
         self._process.start()
         while not self._process.is_alive():
@@ -72,6 +182,21 @@ class CamGroupQueueProcess:
             return self._process.is_alive()
         return False
 
+    def restart(self,
+                event_dictionary: Dict[str, multiprocessing.Event],
+                camera_config_dict: Dict[str, CameraConfig]):
+        """Stop the process however it takes (it may be hung), then start a fresh one for the same cameras"""
+        stop_processes([self], join_timeout_seconds=0.0)
+        self.start_capture(event_dictionary=event_dictionary, camera_config_dict=camera_config_dict)
+
+    def join(self, timeout_seconds: float = None):
+        if self._process is not None:
+            self._process.join(timeout=timeout_seconds)
+
+    def kill(self):
+        if self._process is not None:
+            self._process.kill()
+
     def terminate(self):
         if self._process:
             self._process.terminate()
@@ -91,13 +216,37 @@ class CamGroupQueueProcess:
             queues: Dict[str, multiprocessing.Queue],
             event_dictionary: Dict[str, multiprocessing.Event],
             camera_config_dict: Dict[str, CameraConfig],
+            process_started_timestamp_ns=None,
+            process_clock_sample=None,
+            heartbeat_timestamp_ns=None,
+            requested_timestamp_ns=None,
+            connect_cameras_in_background=False,
+            log_record_queue=None,
+            log_level=logging.INFO,
     ):
+        ignore_keyboard_interrupts()
+        if log_record_queue is not None:
+            # first - nothing this process logs would be seen otherwise
+            configure_capture_process_logging(log_record_queue, log_level)
+        if process_started_timestamp_ns is not None:
+            # perf_counter is system-wide, so the parent can compare this against its own launch timestamp
+            process_started_timestamp_ns.value = perf_counter_ns()
+        if process_clock_sample is not None:
+            # ...and this lets it check that this process's clocks agree with its own
+            clock_sample = take_clock_sample()
+            process_clock_sample[1] = clock_sample.wall_ns
+            process_clock_sample[2] = clock_sample.uncertainty_ns
+            process_clock_sample[3] = clock_sample.process_id
+            process_clock_sample[0] = clock_sample.monotonic_ns  # last - the parent reads the sample once this is set
         logger.info(
             f"Starting frame loop capture in CamGroupProcess for cameras: {cam_ids}"
         )
         ready_event_dictionary = event_dictionary["ready"]
         start_event = event_dictionary["start"]
         exit_event = event_dictionary["exit"]
+        capture_event = event_dictionary.get("capture")
+        cameras_are_paused = False
+        config_update_executors: Dict[str, ThreadPoolExecutor] = {}  # by camera id
 
         setproctitle(f"Cameras {cam_ids}")
 
@@ -109,9 +258,19 @@ class CamGroupQueueProcess:
         )
 
         for camera in cameras_dictionary.values():
-            camera.connect(ready_event_dictionary[camera.camera_id])
+            if connect_cameras_in_background:
+                CamGroupQueueProcess._start_connecting_camera(
+                    camera, ready_event_dictionary[camera.camera_id], queues, requested_timestamp_ns)
+            else:
+                CamGroupQueueProcess._connect_camera(
+                    camera, ready_event_dictionary[camera.camera_id], queues, requested_timestamp_ns)
+
+        profiling_session = start_profiling_from_environment(role=CAPTURE_PROCESS_PROFILING_ROLE, camera_ids=cam_ids)
 
         while not exit_event.is_set():
+            if heartbeat_timestamp_ns is not None:
+                heartbeat_timestamp_ns.value = perf_counter_ns()  # the parent's supervisor watches this
+
             if not multiprocessing.parent_process().is_alive():
                 logger.info(
                     f"Parent process is no longer alive. Exiting {cam_ids} process"
@@ -122,31 +281,149 @@ class CamGroupQueueProcess:
                 logger.info(
                     "Camera config dict queue has items - updating cameras configs"
                 )
-                camera_config_dictionary = queues[CAMERA_CONFIG_DICT_QUEUE_NAME].get()
-
-                for camera_id, camera in cameras_dictionary.items():
-                    camera.update_config(camera_config_dictionary[camera_id])
+                control_message = queues[CAMERA_CONFIG_DICT_QUEUE_NAME].get()
+
+                if isinstance(control_message, ProfilingRequest):
+                    if profiling_session is not None:
+                        profiling_session.stop()
+                    profiling_session = ProfilingSession(role=CAPTURE_PROCESS_PROFILING_ROLE,
+                                                         profiling_request=control_message,
+                                                         camera_ids=cam_ids)
+                    profiling_session.start()
+                    continue
+
+                if isinstance(control_message, AddCameraRequest):
+                    CamGroupQueueProcess._add_camera(control_message, cameras_dictionary, queues)
+                    if cameras_are_paused:
+                        cameras_dictionary[control_message.camera_config.camera_id].pause()
+                    continue
+
+                if isinstance(control_message, RemoveCameraRequest):
+                    camera = cameras_dictionary.pop(control_message.camera_id, None)
+                    if camera is not None:
+                        logger.info(f"Removing camera {camera.camera_id}")
+                        camera.close()  # a config change it's in the middle of gives up first
+                    if control_message.camera_id in config_update_executors:
+                        config_update_executors.pop(control_message.camera_id).shutdown(wait=False)
+                    if len(cameras_dictionary) == 0:
+                        logger.info("No cameras left - exiting")
+                        break
+                    continue
+
+                for camera_id, camera_config in control_message.camera_config_dictionary.items():
+                    if camera_id in cameras_dictionary:
+                        if camera_id not in config_update_executors:
+                            config_update_executors[camera_id] = ThreadPoolExecutor(
+                                max_workers=1, thread_name_prefix=f"Update camera {camera_id} config")
+                        # reopening a camera (or a slow resolution/fourcc change) takes a while - meanwhile the other
+                        # cameras keep capturing, and the heartbeat going. One camera's changes are applied in order
+                        config_update_executors[camera_id].submit(
+                            CamGroupQueueProcess._update_camera_config, cameras_dictionary[camera_id],
+                            camera_config, queues, control_message.requested_timestamp_ns)
+
+            if profiling_session is not None and not profiling_session.check():
+                profiling_session = None
+
+            should_pause = capture_event is not None and not capture_event.is_set()
+            if should_pause != cameras_are_paused:
+                cameras_are_paused = should_pause
+                for camera in cameras_dictionary.values():
+                    if cameras_are_paused:
+                        camera.pause()
+                    else:
+                        camera.resume()
+            if cameras_are_paused:
+                # the cameras are parked, so there's nothing to send - wait rather than poll
+                capture_event.wait(PAUSED_WAIT_SECONDS)
+                continue
 
             if start_event.is_set():
                 # This tight loop ends up 100% the process, so a sleep between framecaptures is
                 # necessary. We can get away with this because we don't expect another frame for
                 # awhile.
                 sleep(0.001)
-                for camera in cameras_dictionary.values():
+                for camera in list(cameras_dictionary.values()):
+                    for outage_update in camera.pop_outage_updates():
+                        queues[CAMERA_STATUS_QUEUE_NAME].put(outage_update)
                     if camera.new_frame_ready:
                         try:
                             queue = queues[camera.camera_id]
-                            queue.put(camera.latest_frame)
+                            frame_payload = camera.latest_frame
+                            mark_frame_stage(frame_payload, FrameStage.ENQUEUE)
+                            queue.put(frame_payload)
                         except Exception as e:
                             logger.exception(
                                 f"Problem when putting a frame into the queue: Camera {camera.camera_id} - {e}"
                             )
                             break
 
-        # close cameras on exit
+        if profiling_session is not None:
+            profiling_session.stop()
+
+        # close cameras on exit - all at once, so each camera's wait for its current frame overlaps the others'
+        for camera in cameras_dictionary.values():
+            camera.stop_frame_capture()
         for camera in cameras_dictionary.values():
             logger.info(f"Closing camera {camera.camera_id}")
             camera.close()
+        for config_update_executor in config_update_executors.values():
+            config_update_executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _add_camera(add_camera_request: AddCameraRequest,
+                    cameras_dictionary: Dict[str, Camera],
+                    queues: Dict[str, multiprocessing.Queue]):
+        camera_config = add_camera_request.camera_config
+        if camera_config.camera_id in cameras_dictionary:
+            return  # already started with it (the process was restarted since the request was sent)
+        logger.info(f"Adding camera {camera_config.camera_id}")
+        camera = Camera(camera_config)
+        queues[camera.camera_id] = add_camera_request.frame_queue
+        cameras_dictionary[camera.camera_id] = camera
+        CamGroupQueueProcess._start_connecting_camera(
+            camera, add_camera_request.ready_event, queues, add_camera_request.requested_timestamp_ns)
+
+    @staticmethod
+    def _start_connecting_camera(camera: Camera,
+                                 ready_event: multiprocessing.Event,
+                                 queues: Dict[str, multiprocessing.Queue],
+                                 requested_timestamp_ns: Optional[int]):
+        # opening a camera can take a while - the other cameras keep capturing (and the heartbeat going) meanwhile
+        threading.Thread(target=CamGroupQueueProcess._connect_camera,
+                         args=(camera, ready_event, queues, requested_timestamp_ns),
+                         name=f"Connect camera {camera.camera_id}",
+                         daemon=True).start()
+
+    @staticmethod
+    def _update_camera_config(camera: Camera,
+                              camera_config: CameraConfig,
+                              queues: Dict[str, multiprocessing.Queue],
+                              requested_timestamp_ns: Optional[int]):
+        try:
+            queues[CAMERA_STATUS_QUEUE_NAME].put(
+                camera.update_config(camera_config, requested_timestamp_ns=requested_timestamp_ns))
+        except Exception as e:
+            logger.exception(f"Problem updating Camera {camera.camera_id} config: {e}")
+
+    @staticmethod
+    def _connect_camera(camera: Camera,
+                        ready_event: multiprocessing.Event,
+                        queues: Dict[str, multiprocessing.Queue],
+                        requested_timestamp_ns: Optional[int]):
+        """
+        :param requested_timestamp_ns: for a camera added to a running group - when it was asked for, to report how
+        long it took
+        """
+        connect_start_timestamp_ns = perf_counter_ns()
+        camera.connect(ready_event)
+        if requested_timestamp_ns is None:
+            return
+        connected_timestamp_ns = perf_counter_ns()
+        queues[CAMERA_STATUS_QUEUE_NAME].put(CameraConfigApplyReport(
+            camera_id=camera.camera_id,
+            changed_fields=get_changed_config_fields(None, camera.config),
+            apply_duration_seconds=(connected_timestamp_ns - connect_start_timestamp_ns) / 1e9,
+            latency_seconds=(connected_timestamp_ns - requested_timestamp_ns) / 1e9))
 
     def check_if_camera_is_ready(self, cam_id: str):
         return self._cameras_ready_event_dictionary[cam_id].is_set()
@@ -161,16 +438,122 @@ class CamGroupQueueProcess:
 
             queue = self._get_queue_by_camera_id(camera_id)
             if not queue.empty():
-                return queue.get(block=True)
+                frame_payload = queue.get(block=True)
+                mark_frame_stage(frame_payload, FrameStage.DEQUEUE)
+                record_frame_trace(frame_payload)
+                return frame_payload
         except Exception as e:
             logger.exception(f"Problem when grabbing a frame from: Camera {camera_id} - {e}")
             return
 
+    def get_outage_updates(self) -> List[CameraOutageWindow]:
+        """Camera outages that started or ended since the last call"""
+        self._drain_status_queue()
+        outage_updates = self._outage_updates
+        self._outage_updates = []
+        return outage_updates
+
+    def get_config_apply_reports(self) -> List[CameraConfigApplyReport]:
+        """How the config changes (and added cameras) applied since the last call went"""
+        self._drain_status_queue()
+        config_apply_reports = self._config_apply_reports
+        self._config_apply_reports = []
+        return config_apply_reports
+
+    def _drain_status_queue(self):
+        queue = self._queues[CAMERA_STATUS_QUEUE_NAME]
+        while not queue.empty():
+            status_update = queue.get()
+            if isinstance(status_update, CameraConfigApplyReport):
+                self._config_apply_reports.append(status_update)
+            else:
+                self._outage_updates.append(status_update)
+
+    def discard_queued_frames(self) -> int:
+        """Throw away the frames waiting in the queues (e.g. from before a pause) - returns how many there were"""
+        number_of_frames_discarded = 0
+        for camera_id in list(self._cam_ids):
+            queue = self._queues.get(camera_id)
+            while queue is not None and not queue.empty():
+                try:
+                    queue.get_nowait()
+                except Exception:
+                    break
+                number_of_frames_discarded += 1
+        return number_of_frames_discarded
+
     def get_queue_size_by_camera_id(self, camera_id: str) -> int:
         return self._queues[camera_id].qsize()
 
-    def update_camera_configs(self, camera_config_dictionary):
-        self._queues[CAMERA_CONFIG_DICT_QUEUE_NAME].put(camera_config_dictionary)
+    def start_profiling(self, profiling_request: ProfilingRequest):
+        """Profile the capture process for a while - its profiles are saved by the process itself"""
+        self._queues[CAMERA_CONFIG_DICT_QUEUE_NAME].put(profiling_request)
+
+    def update_camera_configs(self, camera_config_dictionary: Dict[str, CameraConfig],
+                              requested_timestamp_ns: int = None):
+        process_camera_config_dictionary = {camera_id: camera_config_dictionary[camera_id]
+                                            for camera_id in self._cam_ids
+                                            if camera_id in camera_config_dictionary}
+        if len(process_camera_config_dictionary) == 0:
+            return
+        self._queues[CAMERA_CONFIG_DICT_QUEUE_NAME].put(
+            CameraConfigUpdate(camera_config_dictionary=process_camera_config_dictionary,
+                               requested_timestamp_ns=requested_timestamp_ns))
+
+    def add_camera(self, camera_config: CameraConfig, requested_timestamp_ns: int = None):
+        """Add a camera to this process - it's connected without interrupting the others, if it's running"""
+        camera_id = camera_config.camera_id
+        self._cam_ids.append(camera_id)
+        frame_queue = self._queue_communicator.add_queue(camera_id)
+        if not self.is_capturing:
+            return  # it's started with the others
+        ready_event = self._queue_communicator.create_event()
+        self._cameras_ready_event_dictionary[camera_id] = ready_event
+        self._queues[CAMERA_CONFIG_DICT_QUEUE_NAME].put(
+            AddCameraRequest(camera_config=camera_config,
+                             frame_queue=frame_queue,
+                             ready_event=ready_event,
+                             requested_timestamp_ns=requested_timestamp_ns))
+
+    def remove_camera(self, camera_id: str):
+        """Close one of this process's cameras - the process exits once it has none left"""
+        self._cam_ids.remove(camera_id)
+        if self.is_capturing:
+            self._queues[CAMERA_CONFIG_DICT_QUEUE_NAME].put(RemoveCameraRequest(camera_id=camera_id))
+        self._queues.pop(camera_id, None)
+        if self._cameras_ready_event_dictionary is not None:
+            self._cameras_ready_event_dictionary.pop(camera_id, None)
+
+
+def stop_processes(processes: List[CamGroupQueueProcess],
+                   join_timeout_seconds: float = PROCESS_JOIN_TIMEOUT_SECONDS,
+                   terminate_timeout_seconds: float = PROCESS_TERMINATE_TIMEOUT_SECONDS):
+    """
+    Wait (up to `join_timeout_seconds`, shared) for the processes to exit on their own - their exit event should be
+    set - then terminate the stragglers, then kill whichever of those ignore it
+    """
+    _join_processes(processes, join_timeout_seconds)
+    processes = [process for process in processes if process.is_capturing]
+    if len(processes) == 0:
+        return
+
+    logger.warning(f"Processes {[process.name for process in processes]} didn't exit in "
+                   f"{join_timeout_seconds} seconds - terminating them")
+    for process in processes:
+        process.terminate()
+    _join_processes(processes, terminate_timeout_seconds)
+
+    for process in processes:
+        if process.is_capturing:
+            logger.warning(f"Process {process.name} ignored terminate - killing it")
+            process.kill()
+            process.join()
+
+
+def _join_processes(processes: List[CamGroupQueueProcess], timeout_seconds: float):
+    deadline_ns = perf_counter_ns() + timeout_seconds * 1e9
+    for process in processes:
+        process.join(timeout_seconds=max(deadline_ns - perf_counter_ns(), 0) / 1e9)
 
 
 if __name__ == "__main__":
@@ -5,7 +5,9 @@ from typing import List
 
 import zmq
 
-from skellycam import Camera, CameraConfig
+from skellycam.opencv.camera.camera import Camera
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.group.strategies.capture_process_context import get_capture_process_context
 
 
 class CamGroupZeromqProcess:
@@ -18,7 +20,7 @@ class CamGroupZeromqProcess:
         self._parent_recv.connect("tcp://127.0.0.1:5556")
 
     def start_capture(self):
-        self._process = Process(
+        self._process = get_capture_process_context().Process(
             target=CamGroupZeromqProcess._begin, args=(self._cam_ids,)
         )
         self._process.start()
@@ -0,0 +1,45 @@
+import logging
+import multiprocessing
+import signal
+from multiprocessing.context import BaseContext
+
+logger = logging.getLogger(__name__)
+
+# What a capture process needs (and nothing GUI related). The forkserver imports these once, and every capture
+# process is forked from it with them already loaded
+CAPTURE_PROCESS_PRELOAD_MODULES = [
+    "skellycam.opencv.group.strategies.cam_group_queue_process",
+]
+
+# No consumer should call this "private" variable
+_capture_process_context: BaseContext = None
+
+
+def get_capture_process_context() -> BaseContext:
+    """
+    The multiprocessing context capture processes (and the events/queues/values they share) are created from.
+
+    `forkserver` where the platform has it: children are forked from a small server process that has only preloaded
+    the capture modules, rather than re-importing everything (`spawn`) or inheriting a copy of a (possibly huge,
+    Qt-laden) parent (`fork`). Falls back to `spawn` (e.g. on Windows).
+
+    NOTE - multiprocessing objects can't be shared across contexts, so anything handed to a capture process must be
+    created from this context
+    """
+    global _capture_process_context
+    if _capture_process_context is None:
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            _capture_process_context = multiprocessing.get_context("forkserver")
+            _capture_process_context.set_forkserver_preload(CAPTURE_PROCESS_PRELOAD_MODULES)
+        else:
+            _capture_process_context = multiprocessing.get_context("spawn")
+        logger.debug(f"Capture processes will be started with `{_capture_process_context.get_start_method()}`")
+    return _capture_process_context
+
+
+def ignore_keyboard_interrupts():
+    """
+    In a capture process (or the manager serving its queues): Ctrl-C sends SIGINT to every process in the terminal's
+    process group, but these are shut down by their parent (through the exit event) - not mid-frame, on their own
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
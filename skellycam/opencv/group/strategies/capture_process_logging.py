@@ -0,0 +1,44 @@
+import logging
+import logging.handlers
+import threading
+
+from skellycam.opencv.group.strategies.capture_process_context import get_capture_process_context
+
+logger = logging.getLogger(__name__)
+
+# No consumer should call these "private" variables
+_log_record_queue = None
+_log_record_listener = None
+_log_record_queue_lock = threading.Lock()
+
+
+class _ParentLoggerHandler(logging.Handler):
+    """Hands a capture process's records to this process's logger of the same name - so they go wherever ours go"""
+
+    def emit(self, record: logging.LogRecord):
+        record_logger = logging.getLogger(record.name)
+        if record_logger.isEnabledFor(record.levelno):
+            record_logger.handle(record)
+
+
+def get_log_record_queue():
+    """
+    The queue capture processes send their log records back on (see `configure_capture_process_logging`) - they're
+    forked from the forkserver (or spawned), so they don't have this process's logging handlers
+    """
+    global _log_record_queue, _log_record_listener
+    with _log_record_queue_lock:
+        if _log_record_queue is None:
+            _log_record_queue = get_capture_process_context().Queue()
+            _log_record_listener = logging.handlers.QueueListener(_log_record_queue, _ParentLoggerHandler())
+            _log_record_listener.start()
+    return _log_record_queue
+
+
+def configure_capture_process_logging(log_record_queue, log_level: int):
+    """In a capture process: send every record at `log_level` (the parent's level) or above back to the parent"""
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_record_queue))
+    root_logger.setLevel(log_level)
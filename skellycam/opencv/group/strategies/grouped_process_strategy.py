@@ -1,10 +1,15 @@
 import logging
+import math
 import multiprocessing
 from typing import Dict, List
 
-from skellycam import CameraConfig
+from skellycam.opencv.camera.capture_watchdog import CameraOutageWindow
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.config.config_changes import CameraConfigApplyReport
 from skellycam.detection.models.frame_payload import FramePayload
-from skellycam.opencv.group.strategies.cam_group_queue_process import CamGroupQueueProcess
+from skellycam.diagnostics.profiling import ProfilingRequest
+from skellycam.system.clock.clock_service import ClockSample
+from skellycam.opencv.group.strategies.cam_group_queue_process import CamGroupQueueProcess, stop_processes
 from skellycam.utils.array_split_by import array_split_by
 
 ### Don't change this? Users should submit the actual value they want
@@ -18,9 +23,15 @@ logger = logging.getLogger(__name__)
 
 
 class GroupedProcessStrategy:
-    def __init__(self, camera_ids: List[str]):
-        self._camera_ids = camera_ids
-        self._processes, self._cam_id_process_map = self._create_processes(self._camera_ids)
+    def __init__(self,
+                 camera_ids: List[str],
+                 cameras_per_process: int = _DEFAULT_CAM_PER_PROCESS,
+                 connect_cameras_in_background: bool = False):
+        self._camera_ids = list(camera_ids)
+        self._cameras_per_process = cameras_per_process
+        self._connect_cameras_in_background = connect_cameras_in_background
+        self._event_dictionary = None
+        self._processes, self._cam_id_process_map = self._create_processes(self._camera_ids, cameras_per_process)
 
     @property
     def processes(self):
@@ -33,6 +44,24 @@ class GroupedProcessStrategy:
                 return False
         return True
 
+    @property
+    def process_startup_duration_seconds(self) -> Dict[str, float]:
+        """How long each capture process took to start running, by process name (once it has)"""
+        return {
+            process.name: process.startup_duration_seconds
+            for process in self._processes
+            if process.startup_duration_seconds is not None
+        }
+
+    @property
+    def process_clock_samples(self) -> Dict[str, ClockSample]:
+        """The clock sample each capture process took when it started, by process name (once it has)"""
+        return {
+            process.name: process.clock_sample
+            for process in self._processes
+            if process.clock_sample is not None
+        }
+
     @property
     def queue_size(self) -> Dict[str, int]:
         return {camera_id: self._get_queue_size_by_camera_id(camera_id) for camera_id in self._camera_ids}
@@ -42,7 +71,7 @@ class GroupedProcessStrategy:
             event_dictionary: Dict[str, multiprocessing.Event],
             camera_config_dict: Dict[str, CameraConfig],
     ):
-
+        self._event_dictionary = event_dictionary
         for process in self._processes:
             process.start_capture(
                 event_dictionary=event_dictionary, camera_config_dict=camera_config_dict
@@ -59,6 +88,13 @@ class GroupedProcessStrategy:
             if current_frame:
                 return current_frame
 
+    def get_outage_updates(self) -> List[CameraOutageWindow]:
+        return [outage_update for process in self._processes for outage_update in process.get_outage_updates()]
+
+    def get_config_apply_reports(self) -> List[CameraConfigApplyReport]:
+        return [config_apply_report for process in self._processes
+                for config_apply_report in process.get_config_apply_reports()]
+
     def _get_queue_size_by_camera_id(self, camera_ids: str) -> int:
         for process in self._processes:
             if camera_ids in process.camera_ids:
@@ -67,7 +103,7 @@ class GroupedProcessStrategy:
     def get_latest_frames(self) -> Dict[str, FramePayload]:
         return {
             cam_id: process.get_current_frame_by_camera_id(cam_id)
-            for cam_id, process in self._cam_id_process_map.items()
+            for cam_id, process in list(self._cam_id_process_map.items())  # cameras can be added meanwhile
         }
 
     def _create_processes(
@@ -75,9 +111,14 @@ class GroupedProcessStrategy:
     ):
         if len(cam_ids) == 0:
             raise ValueError("No cameras were provided")
-        camera_subarrays = array_split_by(cam_ids, cameras_per_process)
+        if cameras_per_process < 1:
+            raise ValueError(f"cameras_per_process must be at least 1, got {cameras_per_process}")
+        # `array_split_by` splits into that many (evenly sized) sections
+        number_of_processes = math.ceil(len(cam_ids) / cameras_per_process)
+        camera_subarrays = array_split_by(cam_ids, number_of_processes)
         processes = [
-            CamGroupQueueProcess(cam_id_subarray) for cam_id_subarray in camera_subarrays
+            CamGroupQueueProcess(cam_id_subarray, connect_cameras_in_background=self._connect_cameras_in_background)
+            for cam_id_subarray in camera_subarrays
         ]
         cam_id_to_process = {}
         for process in processes:
@@ -85,7 +126,61 @@ class GroupedProcessStrategy:
                 cam_id_to_process[cam_id] = process
         return processes, cam_id_to_process
 
-    def update_camera_configs(self, camera_config_dictionary):
+    def close(self, wait_for_exit: bool = True):
+        # each process closes its own cameras and exits once the group's `exit` event is set
+        if wait_for_exit:
+            stop_processes(self._processes)
+
+    def start_profiling(self, profiling_request: ProfilingRequest):
+        for process in self._processes:
+            process.start_profiling(profiling_request)
+
+    def pause(self):
+        """The processes park their cameras' capture threads (the cameras stay open) and stop sending frames"""
+        self._event_dictionary["capture"].clear()
+
+    def resume(self):
+        # frames queued just as the cameras were paused are stale by now
+        for process in self._processes:
+            process.discard_queued_frames()
+        self._event_dictionary["capture"].set()
+
+    def update_camera_configs(self, camera_config_dictionary: Dict[str, CameraConfig],
+                              requested_timestamp_ns: int = None):
+        """Only the processes with a camera in `camera_config_dictionary` are sent anything"""
         logger.info(f"Updating camera configs: {camera_config_dictionary}")
         for process in self._processes:
-            process.update_camera_configs(camera_config_dictionary)
+            process.update_camera_configs(camera_config_dictionary, requested_timestamp_ns=requested_timestamp_ns)
+
+    def add_camera(self, camera_config: CameraConfig, requested_timestamp_ns: int = None):
+        """
+        Into the process with the fewest cameras that has room for it (up to `cameras_per_process`), or else a new
+        process - either way, the cameras already capturing carry on
+        """
+        camera_id = camera_config.camera_id
+        processes_with_room = [process for process in self._processes
+                               if process.number_of_cameras < self._cameras_per_process]
+        if len(processes_with_room) > 0:
+            process = min(processes_with_room, key=lambda process_with_room: process_with_room.number_of_cameras)
+            logger.info(f"Adding camera {camera_id} to process {process.camera_ids}")
+            process.add_camera(camera_config, requested_timestamp_ns=requested_timestamp_ns)
+        else:
+            logger.info(f"Adding camera {camera_id} in a new process")
+            process = CamGroupQueueProcess([camera_id],
+                                           connect_cameras_in_background=self._connect_cameras_in_background)
+            if self._event_dictionary is not None:
+                process.start_capture(event_dictionary=self._event_dictionary,
+                                      camera_config_dict={camera_id: camera_config},
+                                      requested_timestamp_ns=requested_timestamp_ns)
+            self._processes.append(process)  # in place - the supervisor watches this list
+        self._camera_ids.append(camera_id)
+        self._cam_id_process_map[camera_id] = process
+
+    def remove_camera(self, camera_id: str):
+        process = self._cam_id_process_map.pop(camera_id)
+        self._camera_ids.remove(camera_id)
+        process.remove_camera(camera_id)
+        if process.number_of_cameras == 0:
+            # it exits on its own once its last camera is closed
+            self._processes.remove(process)
+            stop_processes([process])
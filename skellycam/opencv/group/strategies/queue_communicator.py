@@ -1,11 +1,15 @@
-import multiprocessing
+from multiprocessing.managers import SyncManager
 from typing import List
 
+from skellycam.opencv.group.strategies.capture_process_context import get_capture_process_context, \
+    ignore_keyboard_interrupts
+
 
 class QueueCommunicator:
     def __init__(self, identifiers: List[str]):
         self._identifiers = identifiers
-        self._mr_manager = multiprocessing.Manager()
+        self._mr_manager = SyncManager(ctx=get_capture_process_context())
+        self._mr_manager.start(initializer=ignore_keyboard_interrupts)
         self._queues = self._create_queues()
 
     def _create_queues(self):
@@ -17,3 +21,14 @@ class QueueCommunicator:
     @property
     def queues(self):
         return self._queues
+
+    def add_queue(self, identifier: str):
+        self._queues[identifier] = self._mr_manager.Queue()
+        return self._queues[identifier]
+
+    def create_event(self):
+        """
+        An event that can be sent to a process that's already running (e.g. through one of the queues) - plain
+        `multiprocessing` events can only be handed over when the process starts
+        """
+        return self._mr_manager.Event()
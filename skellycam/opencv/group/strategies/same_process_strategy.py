@@ -0,0 +1,189 @@
+import logging
+import multiprocessing
+import threading
+import time
+from typing import Dict, List, Union
+
+from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.diagnostics.frame_tracing import FrameStage, mark_frame_stage, record_frame_trace
+from skellycam.diagnostics.profiling import ProfilingRequest, ProfilingSession
+from skellycam.opencv.camera.camera import Camera
+from skellycam.opencv.camera.capture_watchdog import CameraOutageWindow
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.config.config_changes import CameraConfigApplyReport, get_changed_config_fields
+from skellycam.system.clock.clock_service import ClockSample
+
+logger = logging.getLogger(__name__)
+
+
+class SameProcessStrategy:
+    """
+    Runs every camera's capture thread in the calling process. Frames are handed over directly (no queues), and
+    captures left open by `detect_cameras(keep_captures_open=True)` are adopted instead of re-opened.
+    """
+
+    def __init__(self, camera_ids: List[str], connect_cameras_in_background: bool = False):
+        """
+        :param connect_cameras_in_background: `start_capture` returns straight away, and each camera delivers frames
+        as soon as it's connected
+        """
+        if len(camera_ids) == 0:
+            raise ValueError("No cameras were provided")
+        self._camera_ids = list(camera_ids)
+        self._connect_cameras_in_background = connect_cameras_in_background
+        self._cameras: Dict[str, Camera] = {}
+        self._cameras_ready_event_dictionary = None
+        self._start_event = None
+        self._is_paused = False
+        self._config_apply_reports: List[CameraConfigApplyReport] = []
+
+    @property
+    def processes(self):
+        return []
+
+    @property
+    def is_capturing(self):
+        if len(self._cameras) == 0:
+            return False
+        for camera in self._cameras.values():
+            if not camera.is_capturing_frames and not camera.is_connecting:
+                return False
+        return True
+
+    @property
+    def process_startup_duration_seconds(self) -> Dict[str, float]:
+        return {}
+
+    @property
+    def process_clock_samples(self) -> Dict[str, ClockSample]:
+        return {}
+
+    @property
+    def queue_size(self) -> Dict[str, int]:
+        return {camera_id: 0 for camera_id in self._camera_ids}
+
+    def start_capture(
+            self,
+            event_dictionary: Dict[str, multiprocessing.Event],
+            camera_config_dict: Dict[str, CameraConfig],
+    ):
+        logger.info(f"Starting capture threads for cameras {self._camera_ids} in this process")
+        self._start_event = event_dictionary["start"]
+        self._cameras_ready_event_dictionary = {
+            camera_id: multiprocessing.Event() for camera_id in self._camera_ids
+        }
+        event_dictionary["ready"] = self._cameras_ready_event_dictionary
+
+        self._is_paused = False
+        for camera_id in self._camera_ids:
+            camera = Camera(camera_config_dict[camera_id])
+            self._cameras[camera_id] = camera
+            if self._connect_cameras_in_background:
+                threading.Thread(target=camera.connect,
+                                 args=(self._cameras_ready_event_dictionary[camera_id],),
+                                 name=f"Connect camera {camera_id}",
+                                 daemon=True).start()
+            else:
+                camera.connect(self._cameras_ready_event_dictionary[camera_id])
+
+    def check_if_camera_is_ready(self, cam_id: str) -> bool:
+        if self._cameras_ready_event_dictionary is None:
+            return False
+        return self._cameras_ready_event_dictionary[cam_id].is_set()
+
+    def get_current_frame_by_cam_id(self, camera_id: str) -> Union[FramePayload, None]:
+        if self._start_event is None or not self._start_event.is_set():
+            return
+        camera = self._cameras.get(camera_id)
+        if camera is not None and camera.new_frame_ready:
+            frame_payload = camera.latest_frame
+            mark_frame_stage(frame_payload, FrameStage.DEQUEUE)
+            record_frame_trace(frame_payload)
+            return frame_payload
+
+    def get_latest_frames(self) -> Dict[str, FramePayload]:
+        return {
+            camera_id: self.get_current_frame_by_cam_id(camera_id)
+            for camera_id in list(self._camera_ids)  # cameras can be added meanwhile
+        }
+
+    def get_outage_updates(self) -> List[CameraOutageWindow]:
+        return [outage_update for camera in list(self._cameras.values())
+                for outage_update in camera.pop_outage_updates()]
+
+    def get_config_apply_reports(self) -> List[CameraConfigApplyReport]:
+        config_apply_reports = self._config_apply_reports
+        self._config_apply_reports = []
+        return config_apply_reports
+
+    def start_profiling(self, profiling_request: ProfilingRequest):
+        """The cameras are threads of this process, which cProfile can't follow - so they're sampled instead"""
+        modes = [mode for mode in profiling_request.modes if mode != "cpu"]
+        if "cpu" in profiling_request.modes and "sampling" not in modes:
+            modes.append("sampling")
+        profiling_session = ProfilingSession(role="same_process_cameras",
+                                             profiling_request=profiling_request.model_copy(update={"modes": modes}),
+                                             camera_ids=self._camera_ids)
+        profiling_session.start()
+        stop_timer = threading.Timer(profiling_request.duration_seconds, profiling_session.stop)
+        stop_timer.daemon = True
+        stop_timer.start()
+
+    def pause(self):
+        """Park the cameras' capture threads - the cameras stay open"""
+        self._is_paused = True
+        for camera in list(self._cameras.values()):
+            camera.pause()
+
+    def resume(self):
+        self._is_paused = False
+        for camera in list(self._cameras.values()):
+            camera.resume()
+
+    def update_camera_configs(self, camera_config_dictionary: Dict[str, CameraConfig],
+                              requested_timestamp_ns: int = None):
+        logger.info(f"Updating camera configs: {camera_config_dictionary}")
+        for camera_id, camera_config in camera_config_dictionary.items():
+            camera = self._cameras.get(camera_id)
+            if camera is not None:
+                self._config_apply_reports.append(
+                    camera.update_config(camera_config, requested_timestamp_ns=requested_timestamp_ns))
+
+    def add_camera(self, camera_config: CameraConfig, requested_timestamp_ns: int = None):
+        camera_id = camera_config.camera_id
+        self._camera_ids.append(camera_id)
+        if self._cameras_ready_event_dictionary is None:
+            return  # it's started with the others
+        self._cameras_ready_event_dictionary[camera_id] = multiprocessing.Event()
+        connect_start_time_seconds = time.perf_counter()
+        camera = Camera(camera_config)
+        if self._is_paused:
+            camera.pause()
+        camera.connect(self._cameras_ready_event_dictionary[camera_id])
+        self._cameras[camera_id] = camera
+        camera_config_apply_report = CameraConfigApplyReport(
+            camera_id=camera_id,
+            changed_fields=get_changed_config_fields(None, camera_config),
+            apply_duration_seconds=time.perf_counter() - connect_start_time_seconds)
+        if requested_timestamp_ns is not None:
+            camera_config_apply_report.latency_seconds = (time.perf_counter_ns() - requested_timestamp_ns) / 1e9
+        self._config_apply_reports.append(camera_config_apply_report)
+
+    def remove_camera(self, camera_id: str):
+        self._camera_ids.remove(camera_id)
+        if self._cameras_ready_event_dictionary is not None:
+            self._cameras_ready_event_dictionary.pop(camera_id, None)
+        camera = self._cameras.pop(camera_id, None)
+        if camera is not None:
+            logger.info(f"Closing camera {camera_id}")
+            camera.close()
+
+    def close(self, wait_for_exit: bool = True):
+        # stop them all first, so each camera's wait for its current frame overlaps the others'
+        for camera in self._cameras.values():
+            camera.stop_frame_capture()
+        if wait_for_exit:
+            for camera in self._cameras.values():
+                logger.info(f"Closing camera {camera.camera_id}")
+                camera.close()
+        self._cameras = {}
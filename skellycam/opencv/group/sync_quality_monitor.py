@@ -0,0 +1,136 @@
+import collections
+import logging
+import threading
+from typing import Deque, Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from skellycam.detection.models.frame_payload import FramePayload
+
+logger = logging.getLogger(__name__)
+
+SYNC_QUALITY_WINDOW_SIZE = 300  # rounds/frames - ~10 seconds at 30 fps
+# driver timestamps further than this from ours are on some other clock (e.g. a stream position), not a latency
+MAXIMUM_GRAB_LATENCY_NS = 1e9
+
+
+class CameraSyncQuality(BaseModel):
+    camera_id: str
+    frames_per_second: float = 0.0
+    frame_interval_jitter_ms: float = 0.0  # standard deviation of the time between this camera's frames
+    median_offset_ms: float = 0.0  # this camera's frames vs. the group's median, per round (negative = behind)
+    # how old frames are when `grab()` hands them over, from the driver's timestamp - only for drivers that stamp
+    # frames on our clock (e.g. V4L2 on Linux). Several frame periods means the driver is buffering stale frames
+    median_grab_latency_ms: Optional[float] = None
+
+
+class SyncQualityReport(BaseModel):
+    number_of_rounds: int = 0  # sets of frames (one per camera) measured since the last reset
+    median_skew_ms: Optional[float] = None  # spread (latest - earliest) of the cameras' timestamps within a round
+    max_skew_ms: Optional[float] = None
+    frame_period_ms: Optional[float] = None  # skews approaching this mean the cameras are a frame apart
+    lagging_camera_id: Optional[str] = None  # the camera furthest behind the others, on median
+    cameras: Dict[str, CameraSyncQuality] = {}
+
+
+class SyncQualityMonitor:
+    """
+    Measures, while capturing, how well the cameras' frames line up - so a lagging camera is caught before a
+    session is recorded rather than in the diagnostic plots afterwards.
+
+    Frames are grouped into rounds: once every camera has delivered a new frame, the newest frame of each is
+    compared. A round's skew is the spread of those timestamps; each camera's offset is its distance from their median
+    """
+
+    def __init__(self, camera_ids: List[str], window_size: int = SYNC_QUALITY_WINDOW_SIZE):
+        self._camera_ids = [str(camera_id) for camera_id in camera_ids]
+        self._window_size = window_size
+        self._lock = threading.Lock()
+        self.reset()
+
+    def set_camera_ids(self, camera_ids: List[str]):
+        """For cameras added to or removed from a running group - starts the measurements over"""
+        with self._lock:
+            self._camera_ids = [str(camera_id) for camera_id in camera_ids]
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._number_of_rounds = 0
+            self._round_timestamps_ns: Dict[str, float] = {}
+            self._previous_timestamps_ns: Dict[str, float] = {}
+            self._skews_ns: Deque[float] = collections.deque(maxlen=self._window_size)
+            self._frame_intervals_ns: Dict[str, Deque[float]] = {
+                camera_id: collections.deque(maxlen=self._window_size) for camera_id in self._camera_ids}
+            self._offsets_ns: Dict[str, Deque[float]] = {
+                camera_id: collections.deque(maxlen=self._window_size) for camera_id in self._camera_ids}
+            self._grab_latencies_ns: Dict[str, Deque[float]] = {
+                camera_id: collections.deque(maxlen=self._window_size) for camera_id in self._camera_ids}
+
+    def add_frames(self, frame_payload_dictionary: Dict[str, Optional[FramePayload]]):
+        with self._lock:
+            for camera_id, frame_payload in frame_payload_dictionary.items():
+                if frame_payload is None or frame_payload.timestamp_ns is None:
+                    continue
+                camera_id = str(camera_id)
+                if camera_id not in self._frame_intervals_ns:
+                    continue
+                self._add_frame_timestamp(camera_id, frame_payload.timestamp_ns)
+                self._add_grab_latency(camera_id, frame_payload)
+
+    def get_report(self) -> SyncQualityReport:
+        with self._lock:
+            skews_ms = np.array(self._skews_ns) / 1e6
+            cameras = {}
+            frame_periods_ms = []
+            for camera_id in self._camera_ids:
+                frame_intervals_ms = np.array(self._frame_intervals_ns[camera_id]) / 1e6
+                offsets_ms = np.array(self._offsets_ns[camera_id]) / 1e6
+                camera_sync_quality = CameraSyncQuality(camera_id=camera_id)
+                if len(frame_intervals_ms) > 0:
+                    frame_periods_ms.append(float(np.median(frame_intervals_ms)))
+                    camera_sync_quality.frames_per_second = float(1e3 / np.mean(frame_intervals_ms))
+                    camera_sync_quality.frame_interval_jitter_ms = float(np.std(frame_intervals_ms))
+                if len(offsets_ms) > 0:
+                    camera_sync_quality.median_offset_ms = float(np.median(offsets_ms))
+                if len(self._grab_latencies_ns[camera_id]) > 0:
+                    camera_sync_quality.median_grab_latency_ms = float(
+                        np.median(self._grab_latencies_ns[camera_id]) / 1e6)
+                cameras[camera_id] = camera_sync_quality
+
+            sync_quality_report = SyncQualityReport(number_of_rounds=self._number_of_rounds, cameras=cameras)
+            if len(skews_ms) > 0:
+                sync_quality_report.median_skew_ms = float(np.median(skews_ms))
+                sync_quality_report.max_skew_ms = float(np.max(skews_ms))
+            if len(frame_periods_ms) > 0:
+                sync_quality_report.frame_period_ms = float(np.median(frame_periods_ms))
+            if len(self._camera_ids) > 1 and len(skews_ms) > 0:
+                sync_quality_report.lagging_camera_id = min(
+                    cameras, key=lambda camera_id: cameras[camera_id].median_offset_ms)
+            return sync_quality_report
+
+    def _add_frame_timestamp(self, camera_id: str, timestamp_ns: float):
+        previous_timestamp_ns = self._previous_timestamps_ns.get(camera_id)
+        if previous_timestamp_ns is not None and timestamp_ns > previous_timestamp_ns:
+            self._frame_intervals_ns[camera_id].append(timestamp_ns - previous_timestamp_ns)
+        self._previous_timestamps_ns[camera_id] = timestamp_ns
+
+        self._round_timestamps_ns[camera_id] = timestamp_ns
+        if len(self._round_timestamps_ns) < len(self._camera_ids):
+            return
+
+        round_timestamps_ns = np.array([self._round_timestamps_ns[camera_id] for camera_id in self._camera_ids])
+        self._skews_ns.append(float(np.max(round_timestamps_ns) - np.min(round_timestamps_ns)))
+        median_timestamp_ns = float(np.median(round_timestamps_ns))
+        for round_camera_id, round_timestamp_ns in zip(self._camera_ids, round_timestamps_ns):
+            self._offsets_ns[round_camera_id].append(float(round_timestamp_ns) - median_timestamp_ns)
+        self._round_timestamps_ns = {}
+        self._number_of_rounds += 1
+
+    def _add_grab_latency(self, camera_id: str, frame_payload: FramePayload):
+        if frame_payload.driver_timestamp_ns is None or frame_payload.post_grab_timestamp_ns is None:
+            return
+        grab_latency_ns = frame_payload.post_grab_timestamp_ns - frame_payload.driver_timestamp_ns
+        if 0 <= grab_latency_ns < MAXIMUM_GRAB_LATENCY_NS:
+            self._grab_latencies_ns[camera_id].append(float(grab_latency_ns))
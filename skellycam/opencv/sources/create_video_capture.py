@@ -0,0 +1,29 @@
+import cv2
+
+from skellycam.opencv.camera.types.camera_id import CameraId
+from skellycam.opencv.sources.replay_video_capture import ReplayVideoCapture, is_replay_camera_id
+from skellycam.opencv.sources.synthetic_video_capture import SyntheticVideoCapture, is_synthetic_camera_id
+
+
+def create_video_capture(camera_id: CameraId, cv2_backend: int):
+    """
+    Open the capture for a `CameraConfig.camera_id` - a real camera for port numbers, otherwise whichever source
+    the id names (see `skellycam.opencv.sources`). Everything returned quacks like a `cv2.VideoCapture`
+    """
+    if is_synthetic_camera_id(camera_id):
+        return SyntheticVideoCapture(camera_id)
+    if is_replay_camera_id(camera_id):
+        return ReplayVideoCapture(camera_id)
+    return cv2.VideoCapture(int(camera_id), cv2_backend)
+
+
+def is_hardware_camera_id(camera_id: CameraId) -> bool:
+    return str(camera_id).isdigit()
+
+
+def is_live_camera_id(camera_id: CameraId) -> bool:
+    """
+    Sources that behave like a live camera - they can stall, hang or drop out, and are reconnected if they do.
+    Synthetic cameras stand in for real ones (including their failures); replays just run out
+    """
+    return is_hardware_camera_id(camera_id) or is_synthetic_camera_id(camera_id)
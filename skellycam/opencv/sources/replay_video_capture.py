@@ -0,0 +1,223 @@
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode
+
+import cv2
+import numpy as np
+from pydantic import BaseModel
+
+from skellycam.system.environment.default_paths import TIMESTAMPS_FOLDER_NAME
+
+logger = logging.getLogger(__name__)
+
+REPLAY_CAMERA_ID_PREFIX = "replay:"
+TIMESTAMPS_FILE_SUFFIX = "_binary.npy"
+
+
+class ReplayParameters(BaseModel):
+    video_file_path: str
+    speed: float = 1.0  # 1 = original timing, 2 = twice as fast, ..., 0 = as fast as frames can be decoded
+    loop: bool = False
+    origin_ns: Optional[int] = None  # `perf_counter_ns` the recording's first frame is replayed at (see below)
+
+
+def create_replay_camera_id(video_file_path: Union[str, Path], **parameters) -> str:
+    camera_id = f"{REPLAY_CAMERA_ID_PREFIX}{Path(video_file_path)}"
+    parameters = {key: value for key, value in parameters.items() if value is not None}
+    if len(parameters) > 0:
+        camera_id += f"?{urlencode(parameters)}"
+    return camera_id
+
+
+def create_replay_camera_ids(synchronized_videos_folder_path: Union[str, Path],
+                             speed: float = 1.0,
+                             loop: bool = False,
+                             start_delay_seconds: float = None) -> List[str]:
+    """
+    One camera id per video in a recorded `synchronized_videos` folder.
+
+    :param start_delay_seconds: if given, the replay is anchored to start this long from now, in every process -
+    so cameras replayed in different capture processes stay aligned with each other. Otherwise each process starts
+    its replay when its first replayed camera starts grabbing
+    """
+    origin_ns = None
+    if start_delay_seconds is not None:
+        origin_ns = time.perf_counter_ns() + int(start_delay_seconds * 1e9)
+    video_file_paths = sorted(Path(synchronized_videos_folder_path).glob("*.mp4"))
+    if len(video_file_paths) == 0:
+        raise FileNotFoundError(f"No videos found in {synchronized_videos_folder_path}")
+    return [create_replay_camera_id(video_file_path, speed=speed, loop=int(loop), origin_ns=origin_ns)
+            for video_file_path in video_file_paths]
+
+
+def is_replay_camera_id(camera_id: str) -> bool:
+    return str(camera_id).startswith(REPLAY_CAMERA_ID_PREFIX)
+
+
+def parse_replay_camera_id(camera_id: str) -> ReplayParameters:
+    if not is_replay_camera_id(camera_id):
+        raise ValueError(f"Not a replay camera id: {camera_id}")
+    video_file_path, _, query_string = str(camera_id)[len(REPLAY_CAMERA_ID_PREFIX):].partition("?")
+    return ReplayParameters(video_file_path=video_file_path, **dict(parse_qsl(query_string)))
+
+
+def get_timestamps_file_path(video_file_path: Union[str, Path]) -> Path:
+    video_file_path = Path(video_file_path)
+    return video_file_path.parent / TIMESTAMPS_FOLDER_NAME / f"{video_file_path.stem}{TIMESTAMPS_FILE_SUFFIX}"
+
+
+def get_recording_origin_ns(video_file_path: Union[str, Path]) -> float:
+    """The earliest timestamp of any camera in the recording, so all replayed cameras share one origin"""
+    timestamps_folder_path = get_timestamps_file_path(video_file_path).parent
+    first_timestamps = [np.load(str(timestamps_file_path))[0]
+                        for timestamps_file_path in timestamps_folder_path.glob(f"*{TIMESTAMPS_FILE_SUFFIX}")]
+    return float(np.min(first_timestamps))
+
+
+# No consumer should call these "private" variables
+_process_replay_origin_ns: Optional[int] = None
+_process_replay_origin_lock = threading.Lock()
+
+
+def _get_process_replay_origin_ns() -> int:
+    """Replays without an explicit origin start together, when the first of them (in this process) starts grabbing"""
+    global _process_replay_origin_ns
+    with _process_replay_origin_lock:
+        if _process_replay_origin_ns is None:
+            _process_replay_origin_ns = time.perf_counter_ns()
+        return _process_replay_origin_ns
+
+
+def reset_process_replay_origin():
+    """
+    The next replay (without an explicit origin) to start grabbing in this process starts the replay clock again -
+    e.g. when a camera group starts, so it doesn't pick up an origin from a replay that ran before it. Replays already
+    grabbing keep theirs
+    """
+    global _process_replay_origin_ns
+    with _process_replay_origin_lock:
+        _process_replay_origin_ns = None
+
+
+class ReplayVideoCapture:
+    """
+    Stands in for a `cv2.VideoCapture`, replaying one camera of a recorded session at its original timing (scaled by
+    `speed`).
+
+    Each frame's recorded timestamp, relative to the start of the recording, is mapped onto this machine's
+    `perf_counter_ns` clock and exposed as `latest_timestamp_ns` - the capture thread uses that as the frame's
+    timestamp, so the cameras' relative timing survives however late a frame happens to be delivered.
+    Resolution/framerate settings don't apply (`set()` returns False, like it does for a video file)
+    """
+
+    def __init__(self, camera_id: str):
+        self._camera_id = str(camera_id)
+        self._parameters = parse_replay_camera_id(camera_id)
+        video_file_path = Path(self._parameters.video_file_path)
+
+        self._video_capture = cv2.VideoCapture(str(video_file_path))
+        if not self._video_capture.isOpened():
+            raise FileNotFoundError(f"Could not open video to replay: {video_file_path}")
+
+        self._recorded_timestamps_ns = np.load(str(get_timestamps_file_path(video_file_path)))
+        self._recording_origin_ns = get_recording_origin_ns(video_file_path)
+        number_of_video_frames = int(self._video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self._number_of_frames = min(number_of_video_frames, len(self._recorded_timestamps_ns))
+        if number_of_video_frames != len(self._recorded_timestamps_ns):
+            logger.warning(f"{video_file_path} has {number_of_video_frames} frames but "
+                           f"{len(self._recorded_timestamps_ns)} timestamps - replaying {self._number_of_frames}")
+        # when looping, the next pass starts one (typical) frame interval after the last frame
+        replayed_timestamps_ns = self._recorded_timestamps_ns[:self._number_of_frames]
+        frame_interval_ns = float(np.median(np.diff(replayed_timestamps_ns))) if self._number_of_frames > 1 else 0.0
+        self._recording_duration_ns = float(replayed_timestamps_ns[-1] - self._recording_origin_ns) + frame_interval_ns
+
+        self._replay_origin_ns = self._parameters.origin_ns
+        self._frame_index = -1
+        self._frame_grabbed = False
+        self._loop_count = 0
+        self._latest_timestamp_ns: Optional[int] = None
+
+    @property
+    def latest_timestamp_ns(self) -> Optional[int]:
+        """When the latest grabbed frame 'happened', on this machine's `perf_counter_ns` clock"""
+        return self._latest_timestamp_ns
+
+    @property
+    def number_of_frames(self) -> int:
+        return self._number_of_frames
+
+    @property
+    def is_finished(self) -> bool:
+        """The last frame has been replayed, and it doesn't loop - there won't be any more"""
+        return not self._parameters.loop and self._frame_index + 1 >= self._number_of_frames
+
+    def isOpened(self) -> bool:
+        return self._video_capture.isOpened()
+
+    def release(self):
+        self._video_capture.release()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def grab(self) -> bool:
+        self._frame_grabbed = False
+        if not self._video_capture.isOpened():
+            return False
+
+        if self._replay_origin_ns is None:
+            self._replay_origin_ns = _get_process_replay_origin_ns()
+
+        if self._frame_index + 1 >= self._number_of_frames:
+            if not self._parameters.loop:
+                time.sleep(0.01)  # end of the recording - don't let the capture loop spin
+                return False
+            self._video_capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self._frame_index = -1
+            self._loop_count += 1
+
+        # decode first, then wait, so decoding time doesn't show up as latency
+        if not self._video_capture.grab():
+            return False
+        self._frame_index += 1
+        self._frame_grabbed = True
+
+        self._latest_timestamp_ns = self._get_replay_timestamp_ns(self._frame_index)
+        if self._parameters.speed > 0:
+            sleep_duration_seconds = (self._latest_timestamp_ns - time.perf_counter_ns()) / 1e9
+            if sleep_duration_seconds > 0:
+                time.sleep(sleep_duration_seconds)
+        return True
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self._frame_grabbed:
+            return False, None
+        return self._video_capture.retrieve()
+
+    def get(self, property_id: int) -> float:
+        if property_id == cv2.CAP_PROP_POS_FRAMES:
+            return float(max(self._frame_index, 0))
+        if property_id == cv2.CAP_PROP_POS_MSEC:
+            # the recording's clock, relative to its first frame
+            if self._frame_index < 0:
+                return 0.0
+            return float(self._recorded_timestamps_ns[self._frame_index] - self._recording_origin_ns) / 1e6
+        if property_id == cv2.CAP_PROP_FPS:
+            return self._video_capture.get(cv2.CAP_PROP_FPS) * (self._parameters.speed or 1.0)
+        return self._video_capture.get(property_id)
+
+    def set(self, property_id: int, value: float) -> bool:
+        return False
+
+    def _get_replay_timestamp_ns(self, frame_index: int) -> int:
+        recorded_offset_ns = (self._recorded_timestamps_ns[frame_index] - self._recording_origin_ns
+                              + self._loop_count * self._recording_duration_ns)
+        # as-fast-as-possible replays keep the recording's original spacing in their timestamps
+        speed = self._parameters.speed if self._parameters.speed > 0 else 1.0
+        return int(self._replay_origin_ns + recorded_offset_ns / speed)
+
@@ -0,0 +1,222 @@
+import logging
+import math
+import random
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+import cv2
+import numpy as np
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+SYNTHETIC_CAMERA_ID_PREFIX = "synthetic:"
+DEFAULT_BUFFER_SIZE = 4  # frames a (simulated) driver holds on to before it starts dropping the oldest ones
+
+
+class SyntheticCameraParameters(BaseModel):
+    index: int = 0
+    jitter_ms: float = 0.0  # standard deviation of the frame delivery time
+    drop_probability: float = 0.0  # chance that any given frame is lost before it is delivered
+    clock_skew_ppm: float = 0.0  # how fast this camera's clock runs relative to the host's
+    clock_offset_ms: float = 0.0  # this camera's clock reading (`CAP_PROP_POS_MSEC`) when it starts
+    # simulate a stalled camera - from then on, every `grab()` blocks for `hang_timeout_ms` (like a driver waiting for
+    # a frame that never comes, until it times out) and fails, until the camera is reopened
+    hang_after_frames: Optional[int] = None
+    hang_timeout_ms: float = 10_000.0  # OpenCV's V4L2 backend waits this long
+    open_delay_ms: float = 0.0  # simulate a slow camera - opening it takes this long
+    seed: Optional[int] = None  # defaults to the index, so runs are reproducible
+
+
+def create_synthetic_camera_id(index: int, **parameters) -> str:
+    """e.g. `create_synthetic_camera_id(0, jitter_ms=2)` -> `"synthetic:0?jitter_ms=2"`"""
+    camera_id = f"{SYNTHETIC_CAMERA_ID_PREFIX}{index}"
+    if len(parameters) > 0:
+        camera_id += f"?{urlencode(parameters)}"
+    return camera_id
+
+
+def create_synthetic_camera_ids(number_of_cameras: int, **parameters) -> List[str]:
+    return [create_synthetic_camera_id(index, **parameters) for index in range(number_of_cameras)]
+
+
+def is_synthetic_camera_id(camera_id: str) -> bool:
+    return str(camera_id).startswith(SYNTHETIC_CAMERA_ID_PREFIX)
+
+
+def parse_synthetic_camera_id(camera_id: str) -> SyntheticCameraParameters:
+    if not is_synthetic_camera_id(camera_id):
+        raise ValueError(f"Not a synthetic camera id: {camera_id}")
+    index_string, _, query_string = str(camera_id)[len(SYNTHETIC_CAMERA_ID_PREFIX):].partition("?")
+    return SyntheticCameraParameters(index=int(index_string), **dict(parse_qsl(query_string)))
+
+
+class SyntheticVideoCapture:
+    """
+    Stands in for a `cv2.VideoCapture` (the parts of its API we use), generating frames instead of reading a camera.
+
+    Frames arrive at the configured framerate (as measured by the camera's own, optionally skewed, clock) with
+    optional delivery jitter and random drops. Resolution, framerate etc. are set through `set()`, exactly like a
+    real capture, so `CameraConfig`s apply as usual. Each image shows the camera index and frame number, plus a bar
+    that moves every frame (so it doesn't look like a frozen/virtual camera)
+    """
+
+    def __init__(self, camera_id: str):
+        self._camera_id = str(camera_id)
+        self._parameters = parse_synthetic_camera_id(camera_id)
+        seed = self._parameters.seed if self._parameters.seed is not None else self._parameters.index
+        self._random = random.Random(seed)
+        if self._parameters.open_delay_ms > 0:
+            time.sleep(self._parameters.open_delay_ms / 1e3)
+
+        self._is_opened = True
+        self._resolution_width = 640
+        self._resolution_height = 480
+        self._framerate = 30.0
+        self._fourcc = cv2.VideoWriter_fourcc(*"MJPG")
+        self._buffer_size = DEFAULT_BUFFER_SIZE
+        self._base_image: Optional[np.ndarray] = None
+
+        self._schedule_start_time_seconds = None
+        self._schedule_start_frame_index = 0
+        self._frame_index = -1  # index (on the camera's clock) of the latest grabbed frame
+        self._frame_grabbed = False  # like a real capture, there's nothing to retrieve after a failed grab
+        self._number_of_frames_dropped = 0
+
+    @property
+    def number_of_frames_dropped(self) -> int:
+        return self._number_of_frames_dropped
+
+    def isOpened(self) -> bool:
+        return self._is_opened
+
+    def release(self):
+        self._is_opened = False
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def grab(self) -> bool:
+        self._frame_grabbed = False
+        if not self._is_opened:
+            return False
+
+        if self._schedule_start_time_seconds is None:
+            self._restart_schedule(frame_index=0)
+
+        frame_index = self._frame_index + 1
+
+        if self._parameters.hang_after_frames is not None and frame_index >= self._parameters.hang_after_frames:
+            hang_end_time_seconds = time.perf_counter() + self._parameters.hang_timeout_ms / 1e3
+            while self._is_opened and time.perf_counter() < hang_end_time_seconds:
+                time.sleep(0.01)
+            return False
+
+        # like a driver, only hold on to the last `buffer_size` frames if we fall behind
+        oldest_buffered_frame_index = self._get_latest_produced_frame_index() - self._buffer_size + 1
+        if frame_index < oldest_buffered_frame_index:
+            self._number_of_frames_dropped += oldest_buffered_frame_index - frame_index
+            frame_index = oldest_buffered_frame_index
+
+        while self._random.random() < self._parameters.drop_probability:
+            self._number_of_frames_dropped += 1
+            frame_index += 1
+
+        jitter_seconds = 0.0
+        if self._parameters.jitter_ms > 0:
+            jitter_seconds = abs(self._random.gauss(0, self._parameters.jitter_ms / 1e3))
+
+        delivery_time_seconds = self._get_frame_time_seconds(frame_index) + jitter_seconds
+        sleep_duration_seconds = delivery_time_seconds - time.perf_counter()
+        if sleep_duration_seconds > 0:
+            time.sleep(sleep_duration_seconds)
+
+        self._frame_index = frame_index
+        self._frame_grabbed = self._is_opened
+        return self._is_opened
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self._is_opened or not self._frame_grabbed:
+            return False, None
+
+        if self._base_image is None:
+            self._base_image = self._create_base_image()
+
+        image = self._base_image.copy()
+        bar_width = max(self._resolution_width // 32, 1)
+        bar_x = (self._frame_index * bar_width) % self._resolution_width
+        image[:, bar_x:bar_x + bar_width] = 255
+        cv2.putText(image,
+                    f"{self._parameters.index}: {self._frame_index}",
+                    (10, max(self._resolution_height // 8, 20)),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    max(self._resolution_height / 480, 0.5),
+                    (255, 255, 255),
+                    2)
+        return True, image
+
+    def get(self, property_id: int) -> float:
+        if property_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self._resolution_width)
+        if property_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self._resolution_height)
+        if property_id == cv2.CAP_PROP_FPS:
+            return float(self._framerate)
+        if property_id == cv2.CAP_PROP_FOURCC:
+            return float(self._fourcc)
+        if property_id == cv2.CAP_PROP_BUFFERSIZE:
+            return float(self._buffer_size)
+        if property_id == cv2.CAP_PROP_POS_FRAMES:
+            return float(max(self._frame_index, 0))
+        if property_id == cv2.CAP_PROP_POS_MSEC:
+            # the camera's own clock at the latest frame - offset, and running at its own (skewed) rate
+            return self._parameters.clock_offset_ms + max(self._frame_index, 0) * 1e3 / self._framerate
+        return 0.0
+
+    def set(self, property_id: int, value: float) -> bool:
+        if property_id == cv2.CAP_PROP_FRAME_WIDTH:
+            self._resolution_width = int(value)
+            self._base_image = None
+        elif property_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            self._resolution_height = int(value)
+            self._base_image = None
+        elif property_id == cv2.CAP_PROP_FPS:
+            self._framerate = float(value)
+            if self._schedule_start_time_seconds is not None:
+                self._restart_schedule(frame_index=self._frame_index + 1)
+        elif property_id == cv2.CAP_PROP_FOURCC:
+            self._fourcc = int(value)
+        elif property_id == cv2.CAP_PROP_BUFFERSIZE:
+            self._buffer_size = max(int(value), 1)
+        elif property_id != cv2.CAP_PROP_EXPOSURE:
+            return False
+        return True
+
+    def _restart_schedule(self, frame_index: int):
+        self._schedule_start_time_seconds = time.perf_counter()
+        self._schedule_start_frame_index = frame_index
+
+    def _get_frame_period_seconds(self) -> float:
+        # a camera whose clock runs fast produces its frames (slightly) early, as measured by ours
+        return (1 / self._framerate) / (1 + self._parameters.clock_skew_ppm * 1e-6)
+
+    def _get_frame_time_seconds(self, frame_index: int) -> float:
+        frames_since_schedule_start = frame_index - self._schedule_start_frame_index
+        return self._schedule_start_time_seconds + frames_since_schedule_start * self._get_frame_period_seconds()
+
+    def _get_latest_produced_frame_index(self) -> int:
+        elapsed_seconds = time.perf_counter() - self._schedule_start_time_seconds
+        return self._schedule_start_frame_index + math.floor(elapsed_seconds / self._get_frame_period_seconds())
+
+    def _create_base_image(self) -> np.ndarray:
+        # a fixed pattern per camera - cheap to copy per frame, and different between cameras
+        pattern_random = np.random.default_rng(self._parameters.index)
+        base_color = pattern_random.integers(0, 128, size=3, dtype=np.uint8)
+        image = np.empty((self._resolution_height, self._resolution_width, 3), dtype=np.uint8)
+        image[:] = base_color
+        gradient = np.linspace(0, 96, self._resolution_width, dtype=np.uint8)
+        image[:, :, 1] += gradient[np.newaxis, :]
+        return image
@@ -1,36 +1,121 @@
 import logging
 import platform
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Union
 
 import numpy as np
 
 from skellycam.detection.models.frame_payload import FramePayload
-from skellycam.diagnostics.create_diagnostic_plots import create_diagnostic_plots
+from skellycam.opencv.camera.capture_watchdog import CAMERA_OUTAGES_FILE_NAME, CameraOutageReport, \
+    CameraOutageWindow
+from skellycam.opencv.group.sync_quality_monitor import MAXIMUM_GRAB_LATENCY_NS
 from skellycam.opencv.video_recorder.video_recorder import VideoRecorder
 from skellycam.tests.test_frame_timestamp_synchronization import test_frame_timestamp_synchronization
 from skellycam.tests.test_synchronized_video_frame_counts import test_synchronized_video_frame_counts
 
 logger = logging.getLogger(__name__)
 
+# which of `FramePayload`'s timestamps to line the cameras' frames up on
+SYNCHRONIZATION_TIMESTAMP_ATTRIBUTES = (
+    "timestamp_ns",  # after `retrieve()` - includes decoding and thread scheduling delays
+    "pre_grab_timestamp_ns",
+    "post_grab_timestamp_ns",  # when the frame was handed over, before decoding
+    "driver_timestamp_ns",  # the driver's own, on each camera's clock (see `get_frame_timestamps`)
+)
+
 
 def save_synchronized_videos(
         dictionary_of_video_recorders: Dict[str, VideoRecorder],
         folder_to_save_videos: Union[str, Path],
         create_diagnostic_plots_bool: bool = True,
+        timestamp_attribute: str = "timestamp_ns",
+        outage_windows: Optional[List[CameraOutageWindow]] = None,
 ):
+    """
+    :param outage_windows: when cameras delivered no frames (`CameraGroup.outage_windows`) - saved alongside the
+    videos, with the synchronized frames that fall in them
+    """
     logger.info(f"Saving synchronized videos to folder: {str(folder_to_save_videos)}")
 
+    synchronized_frame_list_dictionary = synchronize_frame_lists(
+        {camera_id: video_recorder.frame_payload_list
+         for camera_id, video_recorder in dictionary_of_video_recorders.items()},
+        timestamp_attribute=timestamp_attribute,
+    )
+
+    test_frame_timestamp_synchronization(synchronized_frame_list_dictionary=synchronized_frame_list_dictionary)
+
+    Path(folder_to_save_videos).mkdir(parents=True, exist_ok=True)
+    # `synchronize_frame_lists` keeps the recorders' order, so each camera's video is written by its own recorder
+    # (which then knows how much of its backlog is written)
+    for video_recorder, (camera_id, frame_list) in zip(dictionary_of_video_recorders.values(),
+                                                       synchronized_frame_list_dictionary.items()):
+        logger.info(
+            f" Saving camera {camera_id} video with {len(frame_list)} frames..."
+        )
+        video_recorder.save_frame_list_to_video_file(
+            frame_payload_list=frame_list,
+            video_file_save_path=Path(folder_to_save_videos)
+                                 / f"Camera_{str(camera_id).zfill(3)}_synchronized.mp4",
+        )
+
+    test_synchronized_video_frame_counts(video_folder_path=folder_to_save_videos)
+
+    if outage_windows is not None:
+        save_camera_outage_report(
+            camera_outage_report=CameraOutageReport(
+                outage_windows=outage_windows,
+                synchronized_frames_in_outages=find_synchronized_frames_in_outages(
+                    dict(zip(dictionary_of_video_recorders.keys(), synchronized_frame_list_dictionary.values())),
+                    outage_windows,
+                ),
+            ),
+            folder_path=folder_to_save_videos,
+        )
+
+    if not platform.system() == "Windows":
+        logger.info("Non-Windows system detected, diagnostic plots for webcams will not be displayed")
+        logger.info(f"Done!")
+        return
+        
+    if create_diagnostic_plots_bool:
+        # opportunistic load of the plotting stack (matplotlib, scipy) to avoid startup time costs
+        from skellycam.diagnostics.create_diagnostic_plots import create_diagnostic_plots
+
+        create_diagnostic_plots(
+            video_recorder_dictionary=dictionary_of_video_recorders,
+            synchronized_frame_list_dictionary=synchronized_frame_list_dictionary,
+            folder_to_save_plots=folder_to_save_videos,
+            show_plots_bool=True,
+        )
+
+    logger.info(f"Done!")
+
+
+def synchronize_frame_lists(frame_list_dictionary: Dict[str, List[FramePayload]],
+                            timestamp_attribute: str = "timestamp_ns") -> Dict[str, List[FramePayload]]:
+    """
+    Clip every camera's frames to the span all cameras recorded, then match each frame of the camera with the fewest
+    frames to the nearest (by `timestamp_attribute`) frame of every camera. Keys of the result are camera indices
+    (as strings)
+    """
+    if timestamp_attribute not in SYNCHRONIZATION_TIMESTAMP_ATTRIBUTES:
+        raise ValueError(f"Can't synchronize on `{timestamp_attribute}` - "
+                         f"choose from {SYNCHRONIZATION_TIMESTAMP_ATTRIBUTES}")
+    logger.info(f"Synchronizing frames on `{timestamp_attribute}`")
+
     each_cam_raw_frame_list = []
+    each_cam_raw_timestamp_list = []
     first_frame_timestamps = []
     final_frame_timestamps = []
 
-    for video_recoder in dictionary_of_video_recorders.values():
-        camera_frame_list = video_recoder.frame_payload_list
-        first_frame_timestamps.append(camera_frame_list[0].timestamp_ns)
-        final_frame_timestamps.append(camera_frame_list[-1].timestamp_ns)
+    for camera_frame_list in frame_list_dictionary.values():
+        camera_timestamps = get_frame_timestamps(camera_frame_list, timestamp_attribute)
+        first_frame_timestamps.append(camera_timestamps[0])
+        final_frame_timestamps.append(camera_timestamps[-1])
 
         each_cam_raw_frame_list.append(camera_frame_list)
+        each_cam_raw_timestamp_list.append(camera_timestamps)
 
     latest_first_frame = np.max(first_frame_timestamps)
     earliest_final_frame = np.min(final_frame_timestamps)
@@ -49,17 +134,10 @@ def save_synchronized_videos(
     )
     each_cam_clipped_frame_list = []
     each_cam_clipped_timestamp_list = []
-    for og_frame_list in each_cam_raw_frame_list:
-        each_cam_clipped_frame_list.append([])
-        each_cam_clipped_timestamp_list.append([])
-        for frame in og_frame_list:
-            if frame.timestamp_ns < latest_first_frame:
-                continue
-            if frame.timestamp_ns > earliest_final_frame:
-                continue
-
-            each_cam_clipped_frame_list[-1].append(frame)
-            each_cam_clipped_timestamp_list[-1].append(frame.timestamp_ns)
+    for og_frame_list, og_timestamps in zip(each_cam_raw_frame_list, each_cam_raw_timestamp_list):
+        is_within_span = (og_timestamps >= latest_first_frame) & (og_timestamps <= earliest_final_frame)
+        each_cam_clipped_frame_list.append([frame for frame, keep in zip(og_frame_list, is_within_span) if keep])
+        each_cam_clipped_timestamp_list.append(og_timestamps[is_within_span])
 
     number_of_frames_per_camera_clipped = [len(f) for f in each_cam_clipped_frame_list]
     min_number_of_frames = np.min(number_of_frames_per_camera_clipped)
@@ -67,7 +145,7 @@ def save_synchronized_videos(
         number_of_frames_per_camera_clipped
     )
 
-    reference_frame_list = each_cam_clipped_frame_list[
+    reference_timestamps = each_cam_clipped_timestamp_list[
         index_of_the_camera_with_fewest_frames
     ]
     logger.info(
@@ -80,43 +158,78 @@ def save_synchronized_videos(
         "TODO - Make a reference timestamp list based on the desired/measured framerate (while ensuring we won't throw away good frames...)"
     )
     synchronized_frame_list_dictionary = {}
-    for camera_id, camera_frame_list in enumerate(each_cam_clipped_frame_list):
+    for camera_id, (camera_frame_list, camera_timestamps) in enumerate(zip(each_cam_clipped_frame_list,
+                                                                           each_cam_clipped_timestamp_list)):
         logger.info(f"Creating synchronized frame list for camera {camera_id}...")
         cam_synchronized_frame_list = []
-        for reference_frame in reference_frame_list:
-            closest_frame = get_nearest_frame(camera_frame_list, reference_frame)
-            cam_synchronized_frame_list.append(closest_frame)
+        for reference_timestamp in reference_timestamps:
+            closest_frame_index = np.argmin(np.abs(camera_timestamps - reference_timestamp))
+            cam_synchronized_frame_list.append(camera_frame_list[closest_frame_index])
         synchronized_frame_list_dictionary[str(camera_id)] = cam_synchronized_frame_list
 
-    test_frame_timestamp_synchronization(synchronized_frame_list_dictionary=synchronized_frame_list_dictionary)
-
-    Path(folder_to_save_videos).mkdir(parents=True, exist_ok=True)
-    for camera_id, frame_list in synchronized_frame_list_dictionary.items():
-        logger.info(
-            f" Saving camera {camera_id} video with {len(frame_list)} frames..."
-        )
-        VideoRecorder().save_frame_list_to_video_file(
-            frame_payload_list=frame_list,
-            video_file_save_path=Path(folder_to_save_videos)
-                                 / f"Camera_{str(camera_id).zfill(3)}_synchronized.mp4",
-        )
-
-    test_synchronized_video_frame_counts(video_folder_path=folder_to_save_videos)
-
-    if not platform.system() == "Windows":
-        logger.info("Non-Windows system detected, diagnostic plots for webcams will not be displayed")
-        logger.info(f"Done!")
-        return
-        
-    if create_diagnostic_plots_bool:
-        create_diagnostic_plots(
-            video_recorder_dictionary=dictionary_of_video_recorders,
-            synchronized_frame_list_dictionary=synchronized_frame_list_dictionary,
-            folder_to_save_plots=folder_to_save_videos,
-            show_plots_bool=True,
-        )
-
-    logger.info(f"Done!")
+    return synchronized_frame_list_dictionary
+
+
+def get_frame_timestamps(frame_list: List[FramePayload], timestamp_attribute: str = "timestamp_ns") -> np.ndarray:
+    """
+    One camera's frame timestamps, in `perf_counter_ns`. Frames without `timestamp_attribute` fall back to
+    `timestamp_ns`.
+
+    Driver timestamps on our clock (within `MAXIMUM_GRAB_LATENCY_NS` before the post-grab read) are used as they are -
+    each camera's own pipeline latency is part of when its frame was taken. Ones on the camera's own clock are moved
+    onto ours by the camera's median (driver - post-grab) offset - keeping the driver's frame spacing, free of our
+    thread scheduling delays
+    """
+    timestamps = np.array([getattr(frame, timestamp_attribute) for frame in frame_list], dtype=np.float64)
+    fallback_timestamps = np.array([frame.timestamp_ns for frame in frame_list], dtype=np.float64)
+    is_missing = np.isnan(timestamps)
+
+    if timestamp_attribute == "driver_timestamp_ns" and not np.all(is_missing):
+        host_timestamps = np.array([frame.post_grab_timestamp_ns for frame in frame_list], dtype=np.float64)
+        has_both = ~is_missing & ~np.isnan(host_timestamps)
+        if np.any(has_both):
+            median_offset_ns = np.median(timestamps[has_both] - host_timestamps[has_both])
+            if not -MAXIMUM_GRAB_LATENCY_NS < median_offset_ns <= 0:
+                timestamps = timestamps - median_offset_ns
+        else:
+            is_missing[:] = True
+
+    return np.where(is_missing, fallback_timestamps, timestamps)
+
+
+def find_synchronized_frames_in_outages(synchronized_frame_list_dictionary: Dict[str, List[FramePayload]],
+                                       outage_windows: List[CameraOutageWindow]) -> Dict[str, List[int]]:
+    """
+    By camera id: the indices of the synchronized frames taken (by the other cameras) while that camera was out -
+    its frame there is a stand-in (the nearest one it did deliver)
+    """
+    camera_ids = list(synchronized_frame_list_dictionary.keys())
+    timestamps_by_camera = np.array([[frame.timestamp_ns for frame in synchronized_frame_list_dictionary[camera_id]]
+                                     for camera_id in camera_ids], dtype=np.float64)
+    synchronized_frames_in_outages = {}
+    for camera_index, camera_id in enumerate(camera_ids):
+        camera_outage_windows = [outage_window for outage_window in outage_windows
+                                 if outage_window.camera_id == str(camera_id)]
+        if len(camera_outage_windows) == 0:
+            continue
+        other_cameras_timestamps = np.delete(timestamps_by_camera, camera_index, axis=0)
+        if len(other_cameras_timestamps) == 0:
+            continue
+        round_timestamps = np.median(other_cameras_timestamps, axis=0)
+        frame_indices = [frame_index for frame_index, round_timestamp in enumerate(round_timestamps)
+                         if any(outage_window.contains(round_timestamp) for outage_window in camera_outage_windows)]
+        if len(frame_indices) > 0:
+            logger.warning(f"Camera {camera_id} was out for {len(frame_indices)} synchronized frames - "
+                           f"its video repeats the nearest frame it delivered there")
+            synchronized_frames_in_outages[str(camera_id)] = frame_indices
+    return synchronized_frames_in_outages
+
+
+def save_camera_outage_report(camera_outage_report: CameraOutageReport, folder_path: Union[str, Path]) -> Path:
+    camera_outages_file_path = Path(folder_path) / CAMERA_OUTAGES_FILE_NAME
+    camera_outages_file_path.write_text(camera_outage_report.model_dump_json(indent=4))
+    logger.info(f"Saved {len(camera_outage_report.outage_windows)} camera outage(s) to: {camera_outages_file_path}")
+    return camera_outages_file_path
 
 
 def get_nearest_frame(frame_list, reference_frame) -> FramePayload:
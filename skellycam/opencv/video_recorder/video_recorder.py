@@ -5,10 +5,11 @@ from typing import List, Union
 
 import cv2
 import numpy as np
-import pandas as pd
 from tqdm import tqdm
 
 from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.diagnostics.capture_metrics import get_capture_metrics
+from skellycam.diagnostics.frame_tracing import FrameStage, mark_frame_stage
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,10 @@ class VideoRecorder:
         self._path_to_save_video_file = None
         self._frame_payload_list: List[FramePayload] = []
         self._timestamps_npy = np.empty(0)
+        self._camera_id = None
+        self._number_of_frames_written = 0
+        self._memory_bytes = 0
+        get_capture_metrics().add_video_recorder(self)
 
     @property
     def timestamps(self) -> np.ndarray:
@@ -29,6 +34,20 @@ class VideoRecorder:
     def number_of_frames(self) -> int:
         return len(self._frame_payload_list)
 
+    @property
+    def camera_id(self):
+        """The camera whose frames this recorder holds (None until it holds some)"""
+        return self._camera_id
+
+    @property
+    def number_of_frames_to_write(self) -> int:
+        return max(self.number_of_frames - self._number_of_frames_written, 0)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Image memory held by this recorder's frames"""
+        return self._memory_bytes
+
     @property
     def frame_payload_list(self) -> List[FramePayload]:
         return self._frame_payload_list
@@ -38,6 +57,12 @@ class VideoRecorder:
 
     def append_frame_payload_to_list(self, frame_payload: FramePayload):
         self._frame_payload_list.append(frame_payload)
+        mark_frame_stage(frame_payload, FrameStage.RECORD)
+        if self._camera_id is None:
+            self._camera_id = str(frame_payload.camera_id)
+        if frame_payload.image is not None:
+            self._memory_bytes += frame_payload.image.nbytes
+        get_capture_metrics().add_recorded_frame(self._camera_id)
 
     def save_frame_list_to_video_file(
             self,
@@ -122,7 +147,10 @@ class VideoRecorder:
                     unit="frames",
                     dynamic_ncols=True,
             ):
+                mark_frame_stage(frame, FrameStage.WRITE_START)
                 self._cv2_video_writer.write(frame.image)
+                mark_frame_stage(frame, FrameStage.WRITE_END)
+                self._number_of_frames_written += 1
 
         except Exception as e:
             logger.error(
@@ -175,6 +203,8 @@ class VideoRecorder:
         path_to_save_timestamps_csv = (
                 base_timestamp_path_str + "_timestamps_human_readable.csv"
         )
+        import pandas as pd  # opportunistic load of pandas to avoid startup time costs
+
         timestamp_dataframe = pd.DataFrame(timestamps_npy)
         timestamp_dataframe.to_csv(str(path_to_save_timestamps_csv))
         logger.info(f"Saved timestamps to path: {str(path_to_save_timestamps_csv)}")
@@ -0,0 +1,197 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_INTERVAL_SECONDS = 1.0
+NUMBER_OF_READS_PER_SAMPLE = 5  # keep the tightest bracket of a few tries, in case one gets preempted
+CLOCK_CALIBRATION_FILE_NAME = "clock_calibration.json"
+
+
+class ClockSample(BaseModel):
+    """One reading of the wall clock (`time.time_ns`), paired with the frame timestamp clock (`perf_counter_ns`)"""
+    monotonic_ns: int  # midpoint of the two `perf_counter_ns` reads bracketing the wall clock read
+    wall_ns: int
+    uncertainty_ns: int  # half the width of that bracket
+    process_id: int
+
+
+def take_clock_sample(number_of_reads: int = NUMBER_OF_READS_PER_SAMPLE) -> ClockSample:
+    best_sample = None
+    for _ in range(number_of_reads):
+        monotonic_before_ns = time.perf_counter_ns()
+        wall_ns = time.time_ns()
+        monotonic_after_ns = time.perf_counter_ns()
+        uncertainty_ns = (monotonic_after_ns - monotonic_before_ns) // 2
+        if best_sample is None or uncertainty_ns < best_sample.uncertainty_ns:
+            best_sample = ClockSample(monotonic_ns=monotonic_before_ns + uncertainty_ns,
+                                      wall_ns=wall_ns,
+                                      uncertainty_ns=uncertainty_ns,
+                                      process_id=os.getpid())
+    return best_sample
+
+
+class ClockMapping(BaseModel):
+    """
+    `wall_ns = reference_wall_ns + slope * (monotonic_ns - reference_monotonic_ns)`, fit by least squares.
+    A slope other than 1 is the monotonic clock drifting against the (NTP-disciplined) wall clock
+    """
+    # integers - a float64 can't hold a wall clock reading in ns to better than ~256 ns
+    reference_monotonic_ns: int
+    reference_wall_ns: int
+    slope: float = 1.0
+    number_of_samples: int = 1
+    residual_rms_ns: float = 0.0
+    residual_max_ns: float = 0.0
+
+    @property
+    def drift_ppm(self) -> float:
+        return (self.slope - 1.0) * 1e6
+
+    def to_wall_ns(self, monotonic_ns: Union[int, float, np.ndarray]) -> Union[int, np.ndarray]:
+        """Works on single timestamps and on arrays (e.g. a camera's `timestamps` from its recorder)"""
+        monotonic_offset_ns = np.asarray(monotonic_ns, dtype=np.int64) - self.reference_monotonic_ns
+        return self.reference_wall_ns + _round_to_int(self.slope * monotonic_offset_ns)
+
+    def to_monotonic_ns(self, wall_ns: Union[int, float, np.ndarray]) -> Union[int, np.ndarray]:
+        wall_offset_ns = np.asarray(wall_ns, dtype=np.int64) - self.reference_wall_ns
+        return self.reference_monotonic_ns + _round_to_int(wall_offset_ns / self.slope)
+
+
+def _round_to_int(value_ns: np.ndarray) -> Union[int, np.ndarray]:
+    rounded_ns = np.round(value_ns).astype(np.int64)
+    return int(rounded_ns) if rounded_ns.ndim == 0 else rounded_ns
+
+
+def fit_clock_mapping(clock_samples: List[ClockSample]) -> ClockMapping:
+    if len(clock_samples) == 0:
+        raise ValueError("Need at least one clock sample to fit a mapping")
+    reference_sample = clock_samples[0]
+    # relative to the first sample, so float64 keeps sub-nanosecond precision over long sessions
+    monotonic_offsets_ns = np.array([sample.monotonic_ns - reference_sample.monotonic_ns for sample in clock_samples],
+                                    dtype=np.float64)
+    wall_offsets_ns = np.array([sample.wall_ns - reference_sample.wall_ns for sample in clock_samples],
+                               dtype=np.float64)
+
+    if len(clock_samples) < 2 or np.ptp(monotonic_offsets_ns) == 0:
+        slope = 1.0
+        intercept_ns = float(np.mean(wall_offsets_ns - monotonic_offsets_ns))
+    else:
+        slope, intercept_ns = np.polyfit(monotonic_offsets_ns, wall_offsets_ns, deg=1)
+    residuals_ns = wall_offsets_ns - (intercept_ns + slope * monotonic_offsets_ns)
+    return ClockMapping(reference_monotonic_ns=reference_sample.monotonic_ns,
+                        reference_wall_ns=reference_sample.wall_ns + int(round(intercept_ns)),
+                        slope=float(slope),
+                        number_of_samples=len(clock_samples),
+                        residual_rms_ns=float(np.sqrt(np.mean(residuals_ns ** 2))),
+                        residual_max_ns=float(np.max(np.abs(residuals_ns))))
+
+
+class ClockCalibration(BaseModel):
+    """What's saved with a recording, so its `perf_counter_ns` frame timestamps can be put on the wall clock"""
+    mapping: ClockMapping
+    samples: List[ClockSample]
+    # the capture processes' own samples, and how far their wall clock reads from ours (should be ~0: both clocks
+    # are system-wide)
+    process_samples: Dict[str, ClockSample] = {}
+    process_offsets_ns: Dict[str, float] = {}
+
+
+class ClockService:
+    """
+    Pairs the monotonic clock frames are stamped with (`perf_counter_ns`) with the wall clock, every
+    `sample_interval_seconds` for as long as it runs, and fits the mapping between them - so frame timestamps can be
+    lined up with other recorders (EMG, force plates, ...) that stamp by wall clock
+    """
+
+    def __init__(self, sample_interval_seconds: float = DEFAULT_SAMPLE_INTERVAL_SECONDS):
+        self._sample_interval_seconds = sample_interval_seconds
+        self._lock = threading.Lock()
+        self._samples: List[ClockSample] = []
+        self._process_samples: Dict[str, ClockSample] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def samples(self) -> List[ClockSample]:
+        with self._lock:
+            return list(self._samples)
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self.add_sample()
+        self._thread = threading.Thread(target=self._sample_loop, name="ClockService", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.is_running:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self.add_sample()  # so the fit spans the whole session
+
+    def add_sample(self, clock_sample: ClockSample = None):
+        with self._lock:
+            self._samples.append(clock_sample or take_clock_sample())
+
+    def add_process_sample(self, process_name: str, clock_sample: ClockSample):
+        """A sample taken in another process (e.g. a capture process), to check its clocks against ours"""
+        with self._lock:
+            self._process_samples[process_name] = clock_sample
+
+    def get_mapping(self) -> ClockMapping:
+        samples = self.samples
+        if len(samples) == 0:
+            samples = [take_clock_sample()]
+        return fit_clock_mapping(samples)
+
+    def to_wall_ns(self, monotonic_ns: Union[int, float, np.ndarray]) -> Union[int, np.ndarray]:
+        return self.get_mapping().to_wall_ns(monotonic_ns)
+
+    def to_monotonic_ns(self, wall_ns: Union[int, float, np.ndarray]) -> Union[int, np.ndarray]:
+        return self.get_mapping().to_monotonic_ns(wall_ns)
+
+    def get_calibration(self) -> ClockCalibration:
+        clock_mapping = self.get_mapping()
+        with self._lock:
+            process_samples = dict(self._process_samples)
+        return ClockCalibration(
+            mapping=clock_mapping,
+            samples=self.samples,
+            process_samples=process_samples,
+            process_offsets_ns={
+                process_name: float(clock_sample.wall_ns - clock_mapping.to_wall_ns(clock_sample.monotonic_ns))
+                for process_name, clock_sample in process_samples.items()
+            },
+        )
+
+    def save(self, folder_path: Union[str, Path]) -> Path:
+        clock_calibration_file_path = Path(folder_path) / CLOCK_CALIBRATION_FILE_NAME
+        clock_calibration_file_path.parent.mkdir(parents=True, exist_ok=True)
+        clock_calibration_file_path.write_text(self.get_calibration().model_dump_json(indent=4))
+        logger.info(f"Saved clock calibration to: {clock_calibration_file_path}")
+        return clock_calibration_file_path
+
+    def _sample_loop(self):
+        while not self._stop_event.wait(self._sample_interval_seconds):
+            self.add_sample()
+
+
+def load_clock_calibration(file_path: Union[str, Path]) -> ClockCalibration:
+    file_path = Path(file_path)
+    if file_path.is_dir():
+        file_path = file_path / CLOCK_CALIBRATION_FILE_NAME
+    return ClockCalibration.model_validate_json(file_path.read_text())
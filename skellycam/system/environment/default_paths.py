@@ -13,7 +13,9 @@ DEFAULT_SKELLYCAM_BASE_FOLDER_NAME = "skelly-cam-recordings"
 SYNCHRONIZED_VIDEOS_FOLDER_NAME = "synchronized_videos"
 LOGS_INFO_AND_SETTINGS_FOLDER_NAME = "logs_info_and_settings"
 LOG_FILE_FOLDER_NAME = "logs"
+PROFILES_FOLDER_NAME = "profiles"
 TIMESTAMPS_FOLDER_NAME = "timestamps"
+CAMERA_CAPABILITY_CACHE_FILE_NAME = "camera_capability_cache.json"
 
 #Emoji strings
 RED_X_EMOJI_STRING = "\U0000274C"
@@ -51,6 +53,23 @@ def get_log_file_path():
     return str(log_file_path)
 
 
+def get_profiles_folder_path():
+    profiles_folder_path = (
+            Path(get_default_skellycam_base_folder_path())
+            / LOGS_INFO_AND_SETTINGS_FOLDER_NAME
+            / LOG_FILE_FOLDER_NAME
+            / PROFILES_FOLDER_NAME
+    )
+    profiles_folder_path.mkdir(exist_ok=True, parents=True)
+    return str(profiles_folder_path)
+
+
+def get_camera_capability_cache_path():
+    settings_folder_path = Path(get_default_skellycam_base_folder_path()) / LOGS_INFO_AND_SETTINGS_FOLDER_NAME
+    settings_folder_path.mkdir(exist_ok=True, parents=True)
+    return str(settings_folder_path / CAMERA_CAPABILITY_CACHE_FILE_NAME)
+
+
 def get_gmt_offset_string():
     # from - https://stackoverflow.com/a/53860920/14662833
     gmt_offset_int = int(time.localtime().tm_gmtoff / 60 / 60)
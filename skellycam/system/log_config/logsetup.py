@@ -2,12 +2,14 @@ import logging
 import logging.handlers
 import sys
 from logging.config import dictConfig
-from typing import Optional
+from typing import Optional, TextIO
 
 DEFAULT_LOGGING = {"version": 1, "disable_existing_loggers": False}
 
 
-def get_logging_handlers(log_file_path: Optional[str] = ""):
+def get_logging_handlers(log_file_path: Optional[str] = "",
+                         console_stream: TextIO = None,
+                         console_log_level: int = logging.DEBUG):
     dictConfig(DEFAULT_LOGGING)
 
     default_formatter = logging.Formatter(
@@ -16,8 +18,10 @@ def get_logging_handlers(log_file_path: Optional[str] = ""):
         "%Y-%m-%d %H:%M:%S",
     )
 
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG)
+    if console_stream is None:
+        console_stream = sys.stdout
+    console_handler = logging.StreamHandler(console_stream)
+    console_handler.setLevel(console_log_level)
     console_handler.setFormatter(default_formatter)
     handlers = [console_handler]
     if log_file_path:
@@ -29,10 +33,18 @@ def get_logging_handlers(log_file_path: Optional[str] = ""):
     return handlers
 
 
-def configure_logging(log_file_path: Optional[str] = ""):
-    print(f"Setting up skellycam logging {__file__}")
+def configure_logging(log_file_path: Optional[str] = "",
+                      console_stream: TextIO = None,
+                      console_log_level: int = logging.DEBUG):
+    """
+    :param console_stream: where console logs go (default: stdout). Headless tools that print machine-readable
+    output to stdout should send their logs to stderr
+    """
+    print(f"Setting up skellycam logging {__file__}", file=console_stream or sys.stdout)
     if len(logging.getLogger().handlers) == 0:
-        handlers = get_logging_handlers(log_file_path)
+        handlers = get_logging_handlers(log_file_path=log_file_path,
+                                        console_stream=console_stream,
+                                        console_log_level=console_log_level)
         logging.getLogger("").handlers.extend(handlers)
         logging.root.setLevel(logging.DEBUG)
         logger = logging.getLogger(__name__)
@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import platform
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# set these to save/compare the micro-benchmarks (`pytest skellycam/tests/benchmarks`), e.g.
+#   SKELLYCAM_BENCHMARK_SAVE=baseline.json pytest skellycam/tests/benchmarks   (on the main branch)
+#   SKELLYCAM_BENCHMARK_COMPARE=baseline.json pytest skellycam/tests/benchmarks   (on your branch, same machine)
+BENCHMARK_SAVE_PATH_ENVIRONMENT_VARIABLE = "SKELLYCAM_BENCHMARK_SAVE"
+BENCHMARK_COMPARE_PATH_ENVIRONMENT_VARIABLE = "SKELLYCAM_BENCHMARK_COMPARE"
+BENCHMARK_TOLERANCE_ENVIRONMENT_VARIABLE = "SKELLYCAM_BENCHMARK_TOLERANCE"
+DEFAULT_TOLERANCE = 0.25  # fail if the median gets this much (fractionally) slower than the baseline
+
+
+class BenchmarkResult(BaseModel):
+    name: str
+    rounds: int
+    min_seconds: float
+    median_seconds: float
+    mean_seconds: float
+    stdev_seconds: float
+    items_per_round: Optional[int] = None  # e.g. frames, so throughput can be derived
+
+    @property
+    def items_per_second(self) -> Optional[float]:
+        if self.items_per_round is None or self.median_seconds == 0:
+            return None
+        return self.items_per_round / self.median_seconds
+
+
+class BenchmarkBaseline(BaseModel):
+    machine: Dict[str, str] = {}
+    results: Dict[str, BenchmarkResult] = {}
+
+
+def measure(name: str,
+            function: Callable,
+            rounds: int = 10,
+            warmup_rounds: int = 1,
+            items_per_round: int = None,
+            setup: Callable = None) -> BenchmarkResult:
+    """Time `function()` over `rounds` rounds (after `setup()` each round, which isn't timed)"""
+    for _ in range(warmup_rounds):
+        function(*([setup()] if setup is not None else []))
+
+    durations_seconds: List[float] = []
+    for _ in range(rounds):
+        arguments = [setup()] if setup is not None else []
+        start_time = time.perf_counter()
+        function(*arguments)
+        durations_seconds.append(time.perf_counter() - start_time)
+
+    return BenchmarkResult(
+        name=name,
+        rounds=rounds,
+        min_seconds=min(durations_seconds),
+        median_seconds=statistics.median(durations_seconds),
+        mean_seconds=statistics.mean(durations_seconds),
+        stdev_seconds=statistics.stdev(durations_seconds) if rounds > 1 else 0.0,
+        items_per_round=items_per_round,
+    )
+
+
+def load_baseline(baseline_file_path: str) -> BenchmarkBaseline:
+    return BenchmarkBaseline(**json.loads(Path(baseline_file_path).read_text()))
+
+
+def save_baseline(results: List[BenchmarkResult], baseline_file_path: str):
+    baseline = BenchmarkBaseline(machine={"platform": platform.platform(),
+                                          "processor": platform.processor(),
+                                          "python": platform.python_version()},
+                                 results={result.name: result for result in results})
+    Path(baseline_file_path).parent.mkdir(parents=True, exist_ok=True)
+    Path(baseline_file_path).write_text(baseline.model_dump_json(indent=4))
+    logger.info(f"Saved benchmark baseline to {baseline_file_path}")
+
+
+def compare_to_baseline(result: BenchmarkResult,
+                        baseline: BenchmarkBaseline,
+                        tolerance: float = DEFAULT_TOLERANCE) -> Optional[str]:
+    """A description of the regression, or None if there is none (or nothing to compare against)"""
+    baseline_result = baseline.results.get(result.name)
+    if baseline_result is None:
+        return None
+    slowdown = result.median_seconds / baseline_result.median_seconds - 1
+    if slowdown > tolerance:
+        return (f"{result.name} regressed by {slowdown:.0%}: median {result.median_seconds * 1e3:.3f} ms "
+                f"vs baseline {baseline_result.median_seconds * 1e3:.3f} ms (tolerance {tolerance:.0%})")
+    return None
+
+
+def get_tolerance() -> float:
+    return float(os.environ.get(BENCHMARK_TOLERANCE_ENVIRONMENT_VARIABLE, DEFAULT_TOLERANCE))
@@ -0,0 +1,56 @@
+import logging
+import os
+from typing import List
+
+import pytest
+
+from skellycam.tests.benchmarks.benchmark_baselines import (
+    BENCHMARK_COMPARE_PATH_ENVIRONMENT_VARIABLE,
+    BENCHMARK_SAVE_PATH_ENVIRONMENT_VARIABLE,
+    BenchmarkResult,
+    compare_to_baseline,
+    get_tolerance,
+    load_baseline,
+    measure,
+    save_baseline,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture(scope="session")
+def benchmark_results():
+    results: List[BenchmarkResult] = []
+    yield results
+
+    baseline_file_path = os.environ.get(BENCHMARK_SAVE_PATH_ENVIRONMENT_VARIABLE)
+    if baseline_file_path and len(results) > 0:
+        save_baseline(results, baseline_file_path)
+
+
+@pytest.fixture(scope="session")
+def benchmark_baseline():
+    baseline_file_path = os.environ.get(BENCHMARK_COMPARE_PATH_ENVIRONMENT_VARIABLE)
+    if not baseline_file_path:
+        return None
+    return load_baseline(baseline_file_path)
+
+
+@pytest.fixture
+def benchmark(benchmark_results, benchmark_baseline):
+    """
+    `benchmark(name, function, rounds=..., items_per_round=..., setup=...)` - time it, record it for the baseline,
+    and fail the test if it's slower than the baseline being compared against
+    """
+
+    def _benchmark(name: str, function, **kwargs) -> BenchmarkResult:
+        result = measure(name, function, **kwargs)
+        benchmark_results.append(result)
+        logger.info(f"{name}: median {result.median_seconds * 1e3:.3f} ms"
+                    + (f" ({result.items_per_second:.0f} items/s)" if result.items_per_second else ""))
+        if benchmark_baseline is not None:
+            regression = compare_to_baseline(result, benchmark_baseline, tolerance=get_tolerance())
+            assert regression is None, regression
+        return result
+
+    return _benchmark
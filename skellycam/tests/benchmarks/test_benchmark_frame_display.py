@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+import pytest
+
+from skellycam.detection.charuco.charuco_definition import CharucoBoardDefinition
+from skellycam.detection.charuco.charuco_detection import draw_charuco_on_image
+from skellycam.detection.models.frame_payload import FramePayload
+
+
+def _create_image_with_charuco_board(charuco_board: CharucoBoardDefinition) -> np.ndarray:
+    image = np.full((720, 1280, 3), 127, dtype=np.uint8)
+    board_image = charuco_board.charuco_board.generateImage((700, 500))
+    image[110:610, 290:990] = cv2.cvtColor(board_image, cv2.COLOR_GRAY2BGR)
+    return image
+
+
+def test_benchmark_convert_frame(benchmark):
+    pytest.importorskip("PySide6")
+    from skellycam.gui.qt.workers.camera_group_thread_worker import CamGroupThreadWorker
+
+    frame_payload = FramePayload(success=True, image=np.zeros((720, 1280, 3), dtype=np.uint8), camera_id="0")
+
+    def _convert_frame():
+        # `_convert_frame` doesn't touch the worker's state, so there's no need to create one
+        q_image = CamGroupThreadWorker._convert_frame(None, frame_payload)
+        assert q_image.width() == 640
+
+    benchmark("cam_group_thread_worker_convert_frame[1280x720]", _convert_frame, rounds=20)
+
+
+def test_benchmark_draw_charuco_on_image(benchmark):
+    charuco_board = CharucoBoardDefinition()
+    image = _create_image_with_charuco_board(charuco_board)
+
+    def _draw_charuco(image_copy: np.ndarray):
+        draw_charuco_on_image(image_copy, charuco_board)
+
+    # drawing happens in place, so each round gets a fresh copy of the image
+    benchmark("draw_charuco_on_image[1280x720]", _draw_charuco, rounds=10, setup=image.copy)
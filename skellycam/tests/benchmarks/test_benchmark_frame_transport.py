@@ -0,0 +1,56 @@
+import threading
+
+import numpy as np
+import pytest
+
+from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.opencv.group.strategies.queue_communicator import QueueCommunicator
+from skellycam.opencv.group.strategies.same_process_strategy import SameProcessStrategy
+
+FRAMES_PER_ROUND = 20
+
+
+def _create_frame_payload(frame_number: int = 1) -> FramePayload:
+    return FramePayload(success=True,
+                        image=np.zeros((480, 640, 3), dtype=np.uint8),
+                        timestamp_ns=frame_number,
+                        number_of_frames_received=frame_number,
+                        camera_id="0")
+
+
+class _StubCamera:
+    def __init__(self, frame_payload: FramePayload):
+        self._frame_payload = frame_payload
+
+    @property
+    def new_frame_ready(self):
+        return True
+
+    @property
+    def latest_frame(self):
+        return self._frame_payload
+
+
+@pytest.mark.parametrize("strategy_name", ["process", "same-process"])
+def test_benchmark_frame_transport(benchmark, strategy_name):
+    """Hand 640x480 frames from a capture loop to the consumer, the way each strategy does"""
+    frame_payload = _create_frame_payload()
+
+    if strategy_name == "process":
+        queue = QueueCommunicator(["0"]).queues["0"]
+
+        def _transport_frames():
+            for _ in range(FRAMES_PER_ROUND):
+                queue.put(frame_payload)
+                assert queue.get().image.shape == (480, 640, 3)
+    else:
+        same_process_strategy = SameProcessStrategy(["0"])
+        same_process_strategy._cameras = {"0": _StubCamera(frame_payload)}
+        same_process_strategy._start_event = threading.Event()
+        same_process_strategy._start_event.set()
+
+        def _transport_frames():
+            for _ in range(FRAMES_PER_ROUND):
+                assert same_process_strategy.get_latest_frames()["0"] is frame_payload
+
+    benchmark(f"frame_transport[{strategy_name}]", _transport_frames, rounds=10, items_per_round=FRAMES_PER_ROUND)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.opencv.video_recorder.save_synchronized_videos import synchronize_frame_lists
+
+NUMBER_OF_CAMERAS = 4
+NUMBER_OF_FRAMES = 1000  # ~30 seconds at 30 fps
+
+
+def _create_frame_list_dictionary():
+    """Jittery 30 fps timestamp traces, each camera starting at a slightly different time (images aren't needed)"""
+    random_generator = np.random.default_rng(0)
+    frame_list_dictionary = {}
+    for camera_number in range(NUMBER_OF_CAMERAS):
+        start_timestamp_ns = random_generator.integers(0, 30_000_000)
+        frame_intervals_ns = random_generator.normal(33_333_333, 2_000_000, size=NUMBER_OF_FRAMES)
+        timestamps_ns = start_timestamp_ns + np.cumsum(frame_intervals_ns)
+        frame_list_dictionary[str(camera_number)] = [
+            FramePayload(success=True, timestamp_ns=float(timestamp_ns), camera_id=str(camera_number))
+            for timestamp_ns in timestamps_ns
+        ]
+    return frame_list_dictionary
+
+
+def test_benchmark_synchronize_frame_lists(benchmark):
+    frame_list_dictionary = _create_frame_list_dictionary()
+
+    def _synchronize():
+        synchronized_frame_list_dictionary = synchronize_frame_lists(frame_list_dictionary)
+        assert len(set(len(frame_list) for frame_list in synchronized_frame_list_dictionary.values())) == 1
+
+    benchmark("synchronize_frame_lists[4x1000]", _synchronize, rounds=3,
+              items_per_round=NUMBER_OF_CAMERAS * NUMBER_OF_FRAMES)
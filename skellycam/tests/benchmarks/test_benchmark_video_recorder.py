@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from skellycam.opencv.video_recorder.video_recorder import VideoRecorder
+
+FRAMES_PER_ROUND = 30
+
+
+@pytest.mark.parametrize("fourcc, file_extension", [("mp4v", ".mp4"), ("MJPG", ".avi"), ("XVID", ".avi")])
+def test_benchmark_video_recorder_write(benchmark, tmp_path, fourcc, file_extension):
+    random_generator = np.random.default_rng(0)
+    image_list = [random_generator.integers(0, 255, size=(480, 640, 3), dtype=np.uint8)
+                  for _ in range(FRAMES_PER_ROUND)]
+
+    def _create_video_recorder():
+        video_recorder = VideoRecorder()
+        try:
+            video_recorder._cv2_video_writer = video_recorder._initialize_video_writer(
+                image_height=480,
+                image_width=640,
+                path_to_save_video_file=tmp_path / f"benchmark_{fourcc}{file_extension}",
+                frames_per_second=30,
+                fourcc=fourcc,
+            )
+        except Exception:
+            pytest.skip(f"This opencv build can't write {fourcc}")
+        return video_recorder
+
+    def _write_frames(video_recorder: VideoRecorder):
+        video_recorder._write_image_list_to_video_file(image_list)
+
+    benchmark(f"video_recorder_write[{fourcc}]", _write_frames, rounds=3, items_per_round=FRAMES_PER_ROUND,
+              setup=_create_video_recorder)
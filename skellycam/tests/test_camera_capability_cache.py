@@ -0,0 +1,58 @@
+from skellycam.detection.private.camera_capability_cache import CameraCapabilityCache
+from skellycam.detection.private.enumerate_v4l2_devices import V4L2Device
+from skellycam.detection.private.measure_camera_modes import CameraMode
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+
+
+def test_capability_cache_round_trips_modes_and_known_good_config(tmp_path):
+    cache_file_path = tmp_path / "camera_capability_cache.json"
+    camera_capability_cache = CameraCapabilityCache(cache_file_path)
+    camera_capability_cache.record_detected_camera(
+        stable_id="usb-046d:0825-F00D",
+        camera_id="2",
+        supported_modes=[
+            CameraMode(resolution_width=1280, resolution_height=720, fourcc="YUYV", measured_framerate=10.0),
+            CameraMode(resolution_width=1280, resolution_height=720, fourcc="MJPG", measured_framerate=30.0),
+        ],
+    )
+    camera_capability_cache.record_applied_config(
+        stable_id="usb-046d:0825-F00D",
+        camera_config=CameraConfig(camera_id="2", resolution_width=1280, resolution_height=720, fourcc="YUYV"),
+    )
+    camera_capability_cache.save()
+
+    reloaded_cache = CameraCapabilityCache(cache_file_path)
+    assert reloaded_cache.has_measured_modes("usb-046d:0825-F00D")
+    assert reloaded_cache.get_best_fourcc("usb-046d:0825-F00D", 1280, 720) == "MJPG"
+
+    # the camera came back on a different port - its last config follows it, in the best fourcc for that resolution
+    known_good_config = reloaded_cache.get_known_good_config(stable_id="usb-046d:0825-F00D", camera_id="4")
+    assert known_good_config.camera_id == "4"
+    assert known_good_config.resolution_width == 1280
+    assert known_good_config.fourcc == "MJPG"
+
+
+def test_capability_cache_only_skips_probing_for_known_devices(tmp_path):
+    camera_capability_cache = CameraCapabilityCache(tmp_path / "camera_capability_cache.json")
+    camera_capability_cache.record_detected_camera(stable_id="known-camera", camera_id="0")
+    known_device = V4L2Device(camera_id="0", device_path="/dev/video0", stable_id="known-camera")
+    new_device = V4L2Device(camera_id="2", device_path="/dev/video2", stable_id="new-camera")
+
+    found_cameras = camera_capability_cache.get_found_cameras([known_device])
+    assert found_cameras.cameras_found_list == ["0"]
+    assert found_cameras.stable_ids == {"0": "known-camera"}
+
+    assert camera_capability_cache.get_found_cameras([known_device, new_device]) is None
+    assert camera_capability_cache.get_found_cameras([]) is None
+
+
+def test_recording_the_same_applied_config_again_changes_nothing(tmp_path):
+    camera_capability_cache = CameraCapabilityCache(tmp_path / "camera_capability_cache.json")
+    camera_config = CameraConfig(camera_id="0", resolution_width=1280, resolution_height=720)
+    assert camera_capability_cache.record_applied_config(stable_id="known-camera", camera_config=camera_config)
+    camera_capability_cache.save()
+
+    reloaded_cache = CameraCapabilityCache(tmp_path / "camera_capability_cache.json")
+    assert not reloaded_cache.record_applied_config(stable_id="known-camera", camera_config=camera_config.model_copy())
+    assert reloaded_cache.record_applied_config(stable_id="known-camera",
+                                                camera_config=camera_config.model_copy(update={"exposure": -5}))
@@ -0,0 +1,92 @@
+import time
+
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.config.config_changes import diff_camera_config_dictionaries
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.sources.synthetic_video_capture import create_synthetic_camera_id, create_synthetic_camera_ids
+
+
+def _create_camera_config(camera_id: str, **fields) -> CameraConfig:
+    return CameraConfig(camera_id=camera_id, resolution_width=64, resolution_height=48, framerate=30, **fields)
+
+
+def _wait_for(condition, timeout_seconds: float = 10.0) -> bool:
+    deadline_seconds = time.perf_counter() + timeout_seconds
+    while time.perf_counter() < deadline_seconds:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_config_diff_only_includes_what_changed():
+    camera_config_diff = diff_camera_config_dictionaries(
+        {"0": _create_camera_config("0"), "1": _create_camera_config("1"), "2": _create_camera_config("2")},
+        {"0": _create_camera_config("0"), "1": _create_camera_config("1", exposure=-5), "3": _create_camera_config("3")},
+    )
+    assert list(camera_config_diff.added_camera_configs) == ["3"]
+    assert camera_config_diff.removed_camera_ids == ["2"]
+    assert camera_config_diff.changed_fields == {"1": ["exposure"]}
+
+
+def test_cameras_are_added_changed_and_removed_while_capturing():
+    camera_ids = create_synthetic_camera_ids(3)
+    camera_group = CameraGroup(camera_config_dictionary={camera_ids[0]: _create_camera_config(camera_ids[0])},
+                               cameras_per_process=2)
+    camera_group.start()
+    try:
+        first_process = camera_group._strategy_class.processes[0]
+
+        # into the running process, then (no room left) a new one
+        camera_group.add_camera(camera_ids[1], _create_camera_config(camera_ids[1]))
+        camera_group.add_camera(camera_ids[2], _create_camera_config(camera_ids[2]))
+        assert camera_group.camera_ids == camera_ids
+        assert len(camera_group._strategy_class.processes) == 2
+        assert _wait_for(lambda: len(camera_group.config_apply_reports) == 2)
+        assert all(config_apply_report.latency_seconds is not None
+                   for config_apply_report in camera_group.config_apply_reports.values())
+        assert _wait_for(lambda: camera_group.get_by_cam_id(camera_ids[2]) is not None)
+
+        camera_group.update_camera_configs({**camera_group.camera_config_dictionary,
+                                            camera_ids[1]: _create_camera_config(camera_ids[1], exposure=-5)})
+        assert _wait_for(lambda: camera_ids[1] in camera_group.config_apply_reports
+                         and camera_group.config_apply_reports[camera_ids[1]].changed_fields == ["exposure"])
+
+        camera_group.remove_camera(camera_ids[2])
+        assert len(camera_group._strategy_class.processes) == 1
+        assert camera_group._strategy_class.processes[0] is first_process  # never restarted
+        assert first_process.is_capturing
+    finally:
+        camera_group.close()
+
+
+def test_reopening_a_camera_doesnt_hold_up_the_others_in_its_process():
+    slow_camera_id = create_synthetic_camera_id(1, open_delay_ms=2500)
+    camera_ids = [create_synthetic_camera_id(0), slow_camera_id]
+    camera_group = CameraGroup(camera_config_dictionary={camera_id: _create_camera_config(camera_id)
+                                                         for camera_id in camera_ids},
+                               cameras_per_process=2, heartbeat_deadline_seconds=1.0)
+    camera_group.start()
+    try:
+        camera_group.update_camera_configs({**camera_group.camera_config_dictionary,
+                                            slow_camera_id: _create_camera_config(slow_camera_id,
+                                                                                  use_this_camera=False)})
+        assert _wait_for(lambda: slow_camera_id in camera_group.config_apply_reports)
+
+        # reopened in the background - longer than the heartbeat deadline, while the other camera keeps capturing
+        camera_group.update_camera_configs({**camera_group.camera_config_dictionary,
+                                            slow_camera_id: _create_camera_config(slow_camera_id)})
+        frame_payloads = []
+        reopen_deadline_seconds = time.perf_counter() + 2.0
+        while time.perf_counter() < reopen_deadline_seconds:
+            frame_payload = camera_group.get_by_cam_id(camera_ids[0])
+            if frame_payload is not None:
+                frame_payloads.append(frame_payload)
+            time.sleep(0.005)
+        assert len(frame_payloads) > 30
+
+        assert _wait_for(lambda: camera_group.config_apply_reports[slow_camera_id].reconnected)
+        assert all(restart_statistics.number_of_restarts == 0
+                   for restart_statistics in camera_group.restart_statistics.values())
+    finally:
+        camera_group.close()
@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from skellycam.diagnostics.capture_metrics import get_capture_metrics
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.group.strategies.strategies import Strategy
+from skellycam.opencv.sources.synthetic_video_capture import create_synthetic_camera_ids
+
+FRAMERATE = 30
+
+
+def _collect_frames(camera_group: CameraGroup, duration_seconds: float) -> list:
+    frame_payloads = []
+    end_time_seconds = time.perf_counter() + duration_seconds
+    while time.perf_counter() < end_time_seconds:
+        frame_payloads.extend(frame_payload for frame_payload in camera_group.latest_frames().values()
+                              if frame_payload is not None)
+        time.sleep(0.001)
+    return frame_payloads
+
+
+@pytest.mark.parametrize("strategy", [Strategy.SAME_PROCESS, Strategy.X_CAM_PER_PROCESS])
+def test_paused_cameras_deliver_nothing_then_a_fresh_frame_straight_after_resuming(strategy):
+    camera_ids = create_synthetic_camera_ids(2)
+    camera_group = CameraGroup(camera_config_dictionary={
+        camera_id: CameraConfig(camera_id=camera_id, resolution_width=64, resolution_height=48, framerate=FRAMERATE)
+        for camera_id in camera_ids
+    }, strategy=strategy, heartbeat_deadline_seconds=0.5)
+    camera_group.start()
+    try:
+        assert len(_collect_frames(camera_group, 0.3)) > 0
+
+        camera_group.pause()
+        _collect_frames(camera_group, 0.1)  # whatever was on its way as it paused
+        # longer than the heartbeat deadline - a paused process isn't a hung one
+        assert _collect_frames(camera_group, 1.0) == []
+        assert camera_group.is_paused
+        assert camera_group.is_capturing
+        assert all(pause_statistics.is_paused for pause_statistics in camera_group.pause_statistics.values())
+        assert all(restart_statistics.number_of_restarts == 0
+                   for restart_statistics in camera_group.restart_statistics.values())
+        assert f'skellycam_capture_paused{{camera_id="{camera_ids[0]}"}} 1\n' in get_capture_metrics().to_prometheus_text()
+
+        resumed_timestamp_ns = time.perf_counter_ns()
+        camera_group.resume()
+        frame_payloads = _collect_frames(camera_group, 0.3)
+        for camera_id in camera_ids:
+            camera_frame_payloads = [frame_payload for frame_payload in frame_payloads
+                                     if frame_payload.camera_id == camera_id]
+            assert len(camera_frame_payloads) > 0
+            # not one the driver held on to while paused
+            assert camera_frame_payloads[0].timestamp_ns > resumed_timestamp_ns
+
+        pause_statistics = camera_group.pause_statistics
+        for camera_id in camera_ids:
+            assert not pause_statistics[camera_id].is_paused
+            assert pause_statistics[camera_id].paused_seconds >= 1.1
+            # a frame interval to grab it, plus a little to get it here
+            assert pause_statistics[camera_id].resume_latency_seconds < 2 / FRAMERATE
+        assert 'skellycam_resume_latency_seconds{camera_id=' in get_capture_metrics().to_prometheus_text()
+    finally:
+        camera_group.close()
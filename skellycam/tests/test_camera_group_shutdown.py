@@ -0,0 +1,34 @@
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.group.strategies.strategies import Strategy
+from skellycam.opencv.sources.synthetic_video_capture import create_synthetic_camera_ids
+
+
+def test_camera_group_closes_and_restarts_within_a_second():
+    camera_ids = create_synthetic_camera_ids(4)
+    camera_group = CameraGroup(camera_config_dictionary={
+        camera_id: CameraConfig(camera_id=camera_id, resolution_width=64, resolution_height=48, framerate=30)
+        for camera_id in camera_ids
+    })
+    camera_group.start()
+    try:
+        camera_group.restart()
+        assert camera_group.is_capturing
+        assert camera_group.teardown_duration_seconds < 1.0
+        assert camera_group.startup_duration_seconds < 1.0
+    finally:
+        camera_group.close()
+    assert not camera_group.is_capturing
+    assert camera_group.teardown_duration_seconds < 1.0
+
+
+def test_same_process_cameras_close_within_a_second():
+    camera_ids = create_synthetic_camera_ids(4)
+    camera_group = CameraGroup(camera_config_dictionary={
+        camera_id: CameraConfig(camera_id=camera_id, resolution_width=64, resolution_height=48, framerate=30)
+        for camera_id in camera_ids
+    }, strategy=Strategy.SAME_PROCESS)
+    camera_group.start()
+    camera_group.close()
+    assert not camera_group.is_capturing
+    assert camera_group.teardown_duration_seconds < 1.0
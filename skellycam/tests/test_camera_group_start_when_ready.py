@@ -0,0 +1,70 @@
+import time
+
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.group.strategies.strategies import Strategy
+from skellycam.opencv.sources.synthetic_video_capture import create_synthetic_camera_id
+
+
+def _start_with_a_slow_camera(strategy: Strategy):
+    fast_camera_id = create_synthetic_camera_id(0)
+    slow_camera_id = create_synthetic_camera_id(1, open_delay_ms=1500)
+    camera_group = CameraGroup(camera_config_dictionary={
+        camera_id: CameraConfig(camera_id=camera_id, resolution_width=64, resolution_height=48, framerate=30)
+        for camera_id in [fast_camera_id, slow_camera_id]
+    }, strategy=strategy, cameras_per_process=2, start_when_ready=True)
+
+    start_time_seconds = time.perf_counter()
+    camera_group.start()
+    try:
+        # frames from the fast camera, long before the slow one is up
+        fast_camera_frame = None
+        while fast_camera_frame is None and time.perf_counter() - start_time_seconds < 1.0:
+            fast_camera_frame = camera_group.latest_frames()[fast_camera_id]
+            time.sleep(0.01)
+        assert fast_camera_frame is not None
+        assert camera_group.live_camera_ids == [fast_camera_id]
+        assert not camera_group.is_ready_to_record
+
+        # ...and recording only waits for the cameras that are selected
+        camera_group.camera_config_dictionary[slow_camera_id].use_this_camera = False
+        assert camera_group.is_ready_to_record
+        camera_group.camera_config_dictionary[slow_camera_id].use_this_camera = True
+
+        # (startup durations are recorded by a background poll, so may land a moment after the camera is ready)
+        while len(camera_group.camera_startup_duration_seconds) < 2 and time.perf_counter() - start_time_seconds < 10.0:
+            time.sleep(0.05)
+        assert camera_group.live_camera_ids == [fast_camera_id, slow_camera_id]
+        camera_startup_duration_seconds = camera_group.camera_startup_duration_seconds
+        assert camera_startup_duration_seconds[fast_camera_id] < camera_startup_duration_seconds[slow_camera_id]
+        assert camera_startup_duration_seconds[slow_camera_id] >= 1.5
+    finally:
+        camera_group.close()
+
+
+def test_cameras_in_one_process_start_delivering_frames_as_soon_as_each_is_ready():
+    _start_with_a_slow_camera(Strategy.X_CAM_PER_PROCESS)
+
+
+def test_same_process_cameras_start_delivering_frames_as_soon_as_each_is_ready():
+    _start_with_a_slow_camera(Strategy.SAME_PROCESS)
+
+
+def test_restarting_before_the_cameras_are_all_up_again():
+    camera_id = create_synthetic_camera_id(0, open_delay_ms=500)
+    camera_group = CameraGroup(camera_config_dictionary={
+        camera_id: CameraConfig(camera_id=camera_id, resolution_width=64, resolution_height=48, framerate=30)
+    }, strategy=Strategy.SAME_PROCESS, start_when_ready=True)
+    camera_group.start()
+    try:
+        assert camera_group.startup_duration_seconds is None
+        start_time_seconds = time.perf_counter()
+        while camera_group.startup_duration_seconds is None and time.perf_counter() - start_time_seconds < 5.0:
+            time.sleep(0.05)
+        assert camera_group.startup_duration_seconds is not None
+
+        camera_group.restart()
+        # the previous start's duration doesn't stand in for this one's
+        assert camera_group.startup_duration_seconds is None
+    finally:
+        camera_group.close()
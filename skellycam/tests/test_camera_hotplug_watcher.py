@@ -0,0 +1,73 @@
+import queue
+
+import pytest
+
+from skellycam.detection.camera_hotplug_watcher import CameraDeviceEvent, CameraHotplugWatcher
+from skellycam.detection.private.inotify import is_inotify_available
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.group.strategies.strategies import Strategy
+from skellycam.opencv.sources.synthetic_video_capture import create_synthetic_camera_id
+
+USE_INOTIFY_PARAMETERS = [pytest.param(True, marks=pytest.mark.skipif(not is_inotify_available(),
+                                                                      reason="no inotify here")),
+                          False]
+
+
+@pytest.mark.parametrize("use_inotify", USE_INOTIFY_PARAMETERS)
+def test_cameras_appearing_and_vanishing_are_reported(tmp_path, use_inotify):
+    dev_root = tmp_path / "dev"
+    sysfs_root = tmp_path / "sys"
+    dev_root.mkdir()
+    (dev_root / "video0").touch()
+    # a UVC camera's metadata node - not a camera
+    (sysfs_root / "video3").mkdir(parents=True)
+    (sysfs_root / "video3" / "index").write_text("1\n")
+
+    camera_device_events = queue.Queue()
+    camera_hotplug_watcher = CameraHotplugWatcher(camera_device_events.put,
+                                                  dev_root=dev_root,
+                                                  sysfs_root=sysfs_root,
+                                                  use_inotify=use_inotify,
+                                                  poll_interval_seconds=0.05)
+    camera_hotplug_watcher.start()
+    try:
+        assert camera_hotplug_watcher.is_using_inotify == use_inotify
+        assert camera_hotplug_watcher.camera_ids == ["0"]
+
+        (dev_root / "video3").touch()
+        (dev_root / "video2").touch()
+        (dev_root / "tty7").touch()
+        assert camera_device_events.get(timeout=2.0) == CameraDeviceEvent(
+            event_type="added", camera_id="2", device_path=str(dev_root / "video2"))
+
+        (dev_root / "video0").unlink()
+        assert camera_device_events.get(timeout=2.0) == CameraDeviceEvent(
+            event_type="removed", camera_id="0", device_path=str(dev_root / "video0"))
+        assert camera_hotplug_watcher.camera_ids == ["2"]
+        assert camera_device_events.empty()
+    finally:
+        camera_hotplug_watcher.stop()
+
+
+def test_camera_group_adds_and_removes_just_the_camera_that_was_plugged_or_unplugged():
+    camera_ids = [create_synthetic_camera_id(0), create_synthetic_camera_id(1)]
+    handled_camera_device_events = []
+    camera_group = CameraGroup(camera_config_dictionary={
+        camera_ids[0]: CameraConfig(camera_id=camera_ids[0], resolution_width=64, resolution_height=48, framerate=30)
+    }, strategy=Strategy.SAME_PROCESS, on_camera_device_event=handled_camera_device_events.append)
+    camera_group.start()
+    try:
+        camera_group.handle_camera_device_event(
+            CameraDeviceEvent(event_type="added", camera_id=camera_ids[1], device_path=""))
+        assert camera_group.camera_ids == camera_ids
+        assert camera_group.check_if_camera_is_ready(camera_ids[1])
+
+        camera_group.handle_camera_device_event(
+            CameraDeviceEvent(event_type="removed", camera_id=camera_ids[0], device_path=""))
+        assert camera_group.camera_ids == [camera_ids[1]]
+        assert camera_group.is_capturing
+        assert [camera_device_event.event_type for camera_device_event in handled_camera_device_events] == [
+            "added", "removed"]
+    finally:
+        camera_group.close()
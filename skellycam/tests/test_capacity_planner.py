@@ -0,0 +1,49 @@
+from skellycam.benchmarks.capacity_planner import (
+    CapacityTrialConfig,
+    CapacityTrialResult,
+    recommend_configurations,
+    run_capacity_trial,
+)
+from skellycam.opencv.group.strategies.grouped_process_strategy import GroupedProcessStrategy
+
+
+def test_cameras_per_process_sets_the_number_of_processes():
+    grouped_process_strategy = GroupedProcessStrategy(["0", "1", "2"], cameras_per_process=2)
+
+    assert [process.camera_ids for process in grouped_process_strategy.processes] == [["0", "1"], ["2"]]
+
+
+def test_capacity_trial_with_synthetic_cameras():
+    trial_config = CapacityTrialConfig(number_of_cameras=2,
+                                       resolution_width=160,
+                                       resolution_height=120,
+                                       framerate=30,
+                                       strategy="same-process")
+
+    trial_result = run_capacity_trial(trial_config, duration_seconds=1.0)
+
+    assert trial_result.error is None
+    assert trial_result.minimum_frames_per_second > 20
+    assert trial_result.mean_latency_ms is not None
+    assert trial_result.total_cpu_percent > 0
+
+
+def test_recommendation_is_the_most_cameras_sustained_at_the_lowest_cpu():
+    def _trial_result(number_of_cameras, cameras_per_process, sustained, total_cpu_percent):
+        return CapacityTrialResult(config=CapacityTrialConfig(number_of_cameras=number_of_cameras,
+                                                              resolution_width=640,
+                                                              resolution_height=480,
+                                                              framerate=30,
+                                                              strategy="process",
+                                                              cameras_per_process=cameras_per_process),
+                                   sustained=sustained,
+                                   total_cpu_percent=total_cpu_percent)
+
+    recommendations = recommend_configurations([_trial_result(2, 1, True, 50),
+                                                _trial_result(4, 1, True, 120),
+                                                _trial_result(4, 2, True, 90),
+                                                _trial_result(8, 2, False, 200)])
+
+    assert len(recommendations) == 1
+    assert recommendations[0].maximum_sustained_cameras == 4
+    assert recommendations[0].cameras_per_process == 2
@@ -0,0 +1,62 @@
+import urllib.request
+
+import numpy as np
+
+from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.diagnostics.capture_metrics import CaptureMetrics, get_capture_metrics
+from skellycam.diagnostics.metrics_server import start_metrics_server
+from skellycam.opencv.video_recorder.video_recorder import VideoRecorder
+
+
+def _create_frame_payload(frame_number: int) -> FramePayload:
+    return FramePayload(success=True,
+                        image=np.zeros((10, 10, 3), dtype=np.uint8),
+                        timestamp_ns=frame_number * 33_000_000,
+                        number_of_frames_received=frame_number,
+                        camera_id="0")
+
+
+def test_capture_metrics_counts_deliveries_drops_and_recordings():
+    capture_metrics = CaptureMetrics()
+    video_recorder = VideoRecorder()
+    capture_metrics.add_video_recorder(video_recorder)
+
+    # frames 3 and 4 never make it to the main process
+    for frame_number in [1, 2, 5, 6]:
+        frame_payload = _create_frame_payload(frame_number)
+        capture_metrics.add_delivered_frames({"0": frame_payload}, is_ipc=True)
+        video_recorder.append_frame_payload_to_list(frame_payload)
+        capture_metrics.add_recorded_frame("0")
+
+    camera_metrics = capture_metrics.get_camera_metrics()["0"]
+    assert camera_metrics.frames_grabbed == 6
+    assert camera_metrics.frames_delivered == 4
+    assert camera_metrics.frames_dropped == 2
+    assert camera_metrics.ipc_bytes == 4 * 300
+
+    prometheus_text = capture_metrics.to_prometheus_text()
+    assert 'skellycam_frames_dropped_total{camera_id="0"} 2\n' in prometheus_text
+    assert 'skellycam_frames_recorded_total{camera_id="0"} 4\n' in prometheus_text
+    assert 'skellycam_encoder_backlog_frames{camera_id="0"} 4\n' in prometheus_text
+    assert 'skellycam_recorder_memory_bytes{camera_id="0"} 1200\n' in prometheus_text
+    assert 'skellycam_frame_interval_seconds{camera_id="0",quantile="0.5"}' in prometheus_text
+
+
+def test_capture_metrics_survive_a_capture_restart():
+    capture_metrics = CaptureMetrics()
+    for frame_number in [1, 2, 3, 1, 2]:
+        capture_metrics.add_delivered_frames({"0": _create_frame_payload(frame_number)}, is_ipc=False)
+    assert capture_metrics.get_camera_metrics()["0"].frames_grabbed == 5
+    assert capture_metrics.get_camera_metrics()["0"].ipc_bytes == 0
+
+
+def test_metrics_server_serves_prometheus_text_on_localhost():
+    get_capture_metrics().add_delivered_frames({"metrics_server_test": _create_frame_payload(1)}, is_ipc=False)
+    metrics_server = start_metrics_server(port=0)
+    try:
+        assert metrics_server.url.startswith("http://127.0.0.1:")
+        with urllib.request.urlopen(metrics_server.url, timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert 'camera_id="metrics_server_test"' in response.read().decode("utf-8")
+    finally:
+        metrics_server.stop()
@@ -0,0 +1,30 @@
+from skellycam.opencv.camera.capture_pool import CapturePool
+from skellycam.tests.utilities.fake_capture import FakeCapture
+
+
+def test_capture_pool_hands_off_open_captures_once():
+    capture_pool = CapturePool()
+    capture = FakeCapture()
+    capture_pool.put("0", capture)
+
+    assert capture_pool.take("0") is capture
+    assert capture_pool.take("0") is None
+    assert not capture.released
+
+
+def test_capture_pool_discards_closed_and_replaced_captures():
+    capture_pool = CapturePool()
+    closed_capture = FakeCapture(is_opened=False)
+    capture_pool.put("0", closed_capture)
+    assert capture_pool.take("0") is None
+    assert closed_capture.released
+
+    first_capture = FakeCapture()
+    second_capture = FakeCapture()
+    capture_pool.put("1", first_capture)
+    capture_pool.put("1", second_capture)
+    assert first_capture.released
+
+    capture_pool.release_all()
+    assert second_capture.released
+    assert capture_pool.camera_ids == []
@@ -0,0 +1,14 @@
+from skellycam.benchmarks.startup_benchmark import measure_capture_process_startup
+from skellycam.opencv.group.strategies.capture_process_context import get_capture_process_context
+
+
+def test_capture_processes_start_and_report_their_startup_time():
+    capture_process_context = get_capture_process_context()
+    assert capture_process_context.get_start_method() in ["forkserver", "spawn"]
+
+    process_startup_result = measure_capture_process_startup(
+        start_method=capture_process_context.get_start_method(), repeats=2
+    )
+
+    assert process_startup_result.first_start_seconds > 0
+    assert process_startup_result.median_seconds > 0
@@ -0,0 +1,27 @@
+import logging
+import os
+import time
+
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.sources.synthetic_video_capture import create_synthetic_camera_id
+
+
+def test_capture_process_log_records_reach_the_parent(caplog):
+    caplog.set_level(logging.INFO)
+    camera_id = create_synthetic_camera_id(0)
+    camera_group = CameraGroup(camera_config_dictionary={
+        camera_id: CameraConfig(camera_id=camera_id, resolution_width=64, resolution_height=48, framerate=30)
+    })
+    camera_group.start()
+    try:
+        deadline_seconds = time.perf_counter() + 5.0
+        capture_process_records = []
+        while len(capture_process_records) == 0 and time.perf_counter() < deadline_seconds:
+            capture_process_records = [record for record in caplog.records
+                                       if record.process != os.getpid()
+                                       and "Starting frame loop capture" in record.getMessage()]
+            time.sleep(0.05)
+        assert len(capture_process_records) > 0
+    finally:
+        camera_group.close()
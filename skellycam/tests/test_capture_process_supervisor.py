@@ -0,0 +1,67 @@
+import os
+import signal
+import time
+
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.sources.synthetic_video_capture import create_synthetic_camera_ids
+
+
+def test_a_hung_capture_process_is_restarted():
+    camera_ids = create_synthetic_camera_ids(2)
+    camera_group = CameraGroup(camera_config_dictionary={
+        camera_id: CameraConfig(camera_id=camera_id, resolution_width=64, resolution_height=48, framerate=60)
+        for camera_id in camera_ids
+    }, cameras_per_process=1, heartbeat_deadline_seconds=0.5)
+    camera_group.start()
+    try:
+        hung_process = camera_group._strategy_class.processes[0]
+        os.kill(hung_process._process.pid, signal.SIGSTOP)
+
+        restart_statistics = camera_group.restart_statistics
+        deadline_seconds = time.perf_counter() + 20
+        while time.perf_counter() < deadline_seconds:
+            restart_statistics = camera_group.restart_statistics
+            if restart_statistics[camera_ids[0]].downtime_seconds > 0:
+                break
+            time.sleep(0.1)
+
+        assert restart_statistics[camera_ids[0]].number_of_restarts == 1
+        assert "heartbeat" in restart_statistics[camera_ids[0]].last_restart_reason
+        assert restart_statistics[camera_ids[0]].downtime_seconds >= 0.5
+        assert restart_statistics[camera_ids[1]].number_of_restarts == 0
+
+        # and its camera delivers frames again
+        frame_payload = None
+        deadline_seconds = time.perf_counter() + 5
+        while frame_payload is None and time.perf_counter() < deadline_seconds:
+            frame_payload = camera_group.get_by_cam_id(camera_ids[0])
+        assert frame_payload is not None
+    finally:
+        camera_group.close()
+
+
+def test_ctrl_c_leaves_shutting_down_the_capture_processes_to_the_parent():
+    camera_ids = create_synthetic_camera_ids(1)
+    camera_group = CameraGroup(camera_config_dictionary={
+        camera_id: CameraConfig(camera_id=camera_id, resolution_width=64, resolution_height=48, framerate=60)
+        for camera_id in camera_ids
+    }, heartbeat_deadline_seconds=0.5)
+    camera_group.start()
+    try:
+        capture_process = camera_group._strategy_class.processes[0]
+        # what Ctrl-C sends to every process in the terminal's process group - not to this one, though
+        os.kill(capture_process._process.pid, signal.SIGINT)
+        os.kill(capture_process._queue_communicator._mr_manager._process.pid, signal.SIGINT)
+        time.sleep(1.0)
+
+        assert capture_process._process.is_alive()
+        assert camera_group.restart_statistics[camera_ids[0]].number_of_restarts == 0
+        camera_group.latest_frames()  # whatever was already waiting
+        frame_payload = None
+        deadline_seconds = time.perf_counter() + 2
+        while frame_payload is None and time.perf_counter() < deadline_seconds:
+            frame_payload = camera_group.latest_frames()[camera_ids[0]]
+        assert frame_payload is not None
+    finally:
+        camera_group.close()
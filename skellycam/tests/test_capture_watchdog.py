@@ -0,0 +1,79 @@
+import threading
+import time
+
+from skellycam.opencv.camera.camera import Camera
+from skellycam.opencv.camera.capture_watchdog import ReconnectBackoff
+from skellycam.opencv.camera.internal_camera_thread import VideoCaptureThread
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.sources.synthetic_video_capture import create_synthetic_camera_id
+
+
+def test_reconnect_backoff_doubles_up_to_a_maximum():
+    reconnect_backoff = ReconnectBackoff(initial_delay_seconds=0.1, maximum_delay_seconds=0.5)
+    assert [reconnect_backoff.get_next_delay_seconds() for _ in range(5)] == [0.1, 0.2, 0.4, 0.5, 0.5]
+    reconnect_backoff.reset()
+    assert reconnect_backoff.get_next_delay_seconds() == 0.1
+
+
+def test_reconnect_backoff_keeps_going_for_a_camera_thats_gone_for_hours():
+    reconnect_backoff = ReconnectBackoff(initial_delay_seconds=0.1, maximum_delay_seconds=5.0)
+    delays_seconds = [reconnect_backoff.get_next_delay_seconds() for _ in range(5000)]
+    assert delays_seconds[-1] == 5.0
+
+
+def test_a_hung_camera_is_reconnected_in_place():
+    # after 20 frames `grab()` blocks for half a second, then fails - until the camera is reopened
+    camera_id = create_synthetic_camera_id(0, hang_after_frames=20, hang_timeout_ms=500)
+    video_capture_thread = VideoCaptureThread(
+        config=CameraConfig(camera_id=camera_id, resolution_width=64, resolution_height=48, framerate=100,
+                            frame_deadline_seconds=0.2))
+    video_capture_thread.start()
+    time.sleep(1.5)
+    video_capture_thread.stop()
+    video_capture_thread.join()
+
+    outage_updates = video_capture_thread.pop_outage_updates()
+    ended_outage_windows = [outage_window for outage_window in outage_updates
+                            if outage_window.end_timestamp_ns is not None]
+    assert len(ended_outage_windows) >= 1
+    assert "hung" in ended_outage_windows[0].reason
+    assert ended_outage_windows[0].number_of_reconnect_attempts == 1
+    assert ended_outage_windows[0].duration_seconds >= 0.4
+    assert video_capture_thread.latest_frame.number_of_frames_received > 20
+
+
+def test_closing_a_camera_that_never_opens_stops_it_retrying():
+    camera = Camera(CameraConfig(camera_id="987"))  # no such device
+    connect_thread = threading.Thread(target=camera.connect, daemon=True)
+    connect_thread.start()
+    time.sleep(0.5)
+    assert camera.is_connecting
+
+    camera.close()
+    connect_thread.join(timeout=2.0)
+    assert not connect_thread.is_alive()
+    assert not camera.is_capturing_frames
+
+
+def test_a_camera_stopped_while_it_opens_doesnt_start_capturing():
+    camera = Camera(CameraConfig(camera_id="987"))  # no such device
+    connect_thread = threading.Thread(target=camera.connect, daemon=True)
+    connect_thread.start()
+    time.sleep(0.5)
+
+    camera.stop_frame_capture()
+    connect_thread.join(timeout=2.0)
+    assert not connect_thread.is_alive()
+    assert camera._capture_thread is None
+
+
+def test_a_capture_thread_stopped_before_it_starts_doesnt_spin():
+    stop_event = threading.Event()
+    stop_event.set()
+    video_capture_thread = VideoCaptureThread(config=CameraConfig(camera_id="987"), stop_event=stop_event)
+    assert not video_capture_thread.is_open
+    number_of_attempts = video_capture_thread._reconnect_backoff.number_of_attempts
+    video_capture_thread.start()
+    video_capture_thread.join(timeout=1.0)
+    assert not video_capture_thread.is_alive()
+    assert video_capture_thread._reconnect_backoff.number_of_attempts == number_of_attempts
@@ -0,0 +1,44 @@
+import time
+
+import numpy as np
+
+from skellycam.system.clock.clock_service import (
+    ClockSample,
+    ClockService,
+    fit_clock_mapping,
+    load_clock_calibration,
+    take_clock_sample,
+)
+
+
+def test_fit_recovers_offset_and_drift():
+    # a monotonic clock running 50 ppm slow against the wall clock, sampled once a second for a minute
+    clock_samples = [ClockSample(monotonic_ns=1_000_000_000 + second * 1_000_000_000,
+                                 wall_ns=1_700_000_000_000_000_000 + int(second * 1_000_050_000),
+                                 uncertainty_ns=100,
+                                 process_id=1)
+                     for second in range(60)]
+    clock_mapping = fit_clock_mapping(clock_samples)
+    assert abs(clock_mapping.drift_ppm - 50) < 1e-3
+    assert clock_mapping.residual_max_ns < 1
+
+    wall_ns = clock_mapping.to_wall_ns(np.array([1_000_000_000, 31_000_000_000]))
+    assert np.allclose(wall_ns, [1_700_000_000_000_000_000, 1_700_000_000_000_000_000 + 30_001_500_000], atol=1)
+    assert abs(clock_mapping.to_monotonic_ns(wall_ns[1]) - 31_000_000_000) < 1
+
+
+def test_clock_service_maps_this_machine_s_clocks(tmp_path):
+    clock_service = ClockService(sample_interval_seconds=0.01)
+    clock_service.start()
+    time.sleep(0.1)
+    clock_service.stop()
+    assert len(clock_service.samples) >= 5
+
+    clock_sample = take_clock_sample()
+    # with one machine and one clock pair, the mapping should land within a millisecond of a fresh reading
+    assert abs(clock_service.to_wall_ns(clock_sample.monotonic_ns) - clock_sample.wall_ns) < 1e6
+
+    clock_service.add_process_sample("capture process", clock_sample)
+    clock_calibration = load_clock_calibration(clock_service.save(tmp_path).parent)
+    assert clock_calibration.mapping.number_of_samples == len(clock_service.samples)
+    assert abs(clock_calibration.process_offsets_ns["capture process"]) < 1e6
@@ -0,0 +1,30 @@
+import time
+
+from skellycam.detection.private.camera_capability_cache import CameraCapabilityCache
+from skellycam.detection.private.detect_possible_cameras import DetectPossibleCameras
+from skellycam.tests.utilities.fake_capture import FakeCapture
+
+
+def test_ports_are_probed_concurrently_with_a_timeout(monkeypatch, tmp_path):
+    probe_durations = {0: 0.3, 1: 0.3, 2: 0.3, 3: 2.0, 4: 0.1}
+    fake_captures = {cam_id: FakeCapture() for cam_id in probe_durations}
+
+    def fake_probe_port(cam_id, cv2_backend):
+        time.sleep(probe_durations[cam_id])
+        if cam_id == 4:
+            return None  # nothing at this port
+        return fake_captures[cam_id]
+
+    detector = DetectPossibleCameras(probe_timeout_seconds=1.0,
+                                     measure_modes=False,
+                                     capability_cache=CameraCapabilityCache(tmp_path / "cache.json"))
+    monkeypatch.setattr(detector, "_get_port_numbers_to_check", lambda: list(probe_durations.keys()))
+    monkeypatch.setattr(detector, "_probe_port", fake_probe_port)
+
+    start_time = time.perf_counter()
+    found_cameras = detector.find_available_cameras()
+    elapsed_time = time.perf_counter() - start_time
+
+    assert found_cameras.cameras_found_list == ["0", "1", "2"]
+    assert elapsed_time < 1.5
+    assert all(fake_captures[cam_id].released for cam_id in (0, 1, 2))
@@ -0,0 +1,83 @@
+import os
+from pathlib import Path
+
+from skellycam.detection.private.detect_possible_cameras import DetectPossibleCameras
+from skellycam.detection.private.enumerate_v4l2_devices import enumerate_v4l2_devices, find_camera_id_by_stable_id
+
+
+def _create_fake_video_node(sysfs_root: Path,
+                            node_name: str,
+                            name: str,
+                            index: int,
+                            usb_device_path: Path = None):
+    node_path = sysfs_root / node_name
+    node_path.mkdir(parents=True)
+    (node_path / "name").write_text(f"{name}\n")
+    (node_path / "index").write_text(f"{index}\n")
+    if usb_device_path is not None:
+        interface_path = usb_device_path / "1-1:1.0"
+        interface_path.mkdir(parents=True, exist_ok=True)
+        os.symlink(interface_path, node_path / "device")
+
+
+def _create_fake_usb_device(root: Path, vendor_id: str, product_id: str, serial: str = None) -> Path:
+    usb_device_path = root / "devices" / f"usb-{vendor_id}-{product_id}"
+    usb_device_path.mkdir(parents=True)
+    (usb_device_path / "idVendor").write_text(vendor_id)
+    (usb_device_path / "idProduct").write_text(product_id)
+    if serial is not None:
+        (usb_device_path / "serial").write_text(serial)
+    return usb_device_path
+
+
+def _create_fake_sysfs_tree(root: Path):
+    sysfs_root = root / "sys" / "class" / "video4linux"
+    dev_v4l_root = root / "dev" / "v4l"
+    (dev_v4l_root / "by-id").mkdir(parents=True)
+    (dev_v4l_root / "by-path").mkdir(parents=True)
+
+    # camera with a by-id link, plus its metadata node
+    _create_fake_video_node(sysfs_root, "video0", "HD Webcam C920", index=0)
+    _create_fake_video_node(sysfs_root, "video1", "HD Webcam C920", index=1)
+    os.symlink("../../video0", dev_v4l_root / "by-id" / "usb-Logitech_HD_Webcam_C920_ABCD1234-video-index0")
+    os.symlink("../../video1", dev_v4l_root / "by-id" / "usb-Logitech_HD_Webcam_C920_ABCD1234-video-index1")
+
+    # camera only identifiable through its usb serial
+    serial_usb_device_path = _create_fake_usb_device(root, "046d", "0825", serial="F00D")
+    _create_fake_video_node(sysfs_root, "video2", "Webcam C270", index=0, usb_device_path=serial_usb_device_path)
+
+    # camera without a serial number - falls back to the port it is plugged into
+    _create_fake_video_node(sysfs_root, "video10", "Generic Camera", index=0,
+                            usb_device_path=_create_fake_usb_device(root, "1234", "5678"))
+    os.symlink("../../video10", dev_v4l_root / "by-path" / "pci-0000:00:14.0-usb-0:2:1.0-video-index0")
+
+    return sysfs_root, dev_v4l_root
+
+
+def test_enumerate_v4l2_devices_lists_capture_nodes_with_stable_ids(tmp_path):
+    sysfs_root, dev_v4l_root = _create_fake_sysfs_tree(tmp_path)
+
+    devices = enumerate_v4l2_devices(sysfs_root=sysfs_root, dev_v4l_root=dev_v4l_root)
+
+    assert [device.camera_id for device in devices] == ["0", "2", "10"]
+    assert [device.stable_id for device in devices] == [
+        "usb-Logitech_HD_Webcam_C920_ABCD1234-video-index0",
+        "usb-046d:0825-F00D",
+        "pci-0000:00:14.0-usb-0:2:1.0-video-index0",
+    ]
+    assert devices[0].name == "HD Webcam C920"
+    assert devices[2].device_path == "/dev/video10"
+    assert find_camera_id_by_stable_id("usb-046d:0825-F00D", devices=devices) == "2"
+
+
+def test_enumerate_v4l2_devices_without_sysfs(tmp_path):
+    assert enumerate_v4l2_devices(sysfs_root=tmp_path / "missing", dev_v4l_root=tmp_path / "missing") == []
+
+
+def test_detection_only_probes_enumerated_devices(tmp_path, monkeypatch):
+    sysfs_root, dev_v4l_root = _create_fake_sysfs_tree(tmp_path)
+    monkeypatch.setattr("platform.system", lambda: "Linux")
+
+    detector = DetectPossibleCameras(sysfs_root=str(sysfs_root), dev_v4l_root=str(dev_v4l_root))
+
+    assert detector._get_port_numbers_to_check() == [0, 2, 10]
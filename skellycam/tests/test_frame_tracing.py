@@ -0,0 +1,67 @@
+import json
+
+from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.diagnostics.chrome_trace_export import create_chrome_trace_events, export_chrome_trace
+from skellycam.diagnostics.frame_tracing import (
+    FrameStage,
+    clear_recorded_frame_traces,
+    get_recorded_frame_traces,
+    mark_frame_stage,
+    record_frame_trace,
+)
+
+CAPTURE_PROCESS_ID = 100
+CONSUMER_PROCESS_ID = 200
+
+
+def _create_traced_frame_payload(camera_id: str, frame_number: int) -> FramePayload:
+    start_ns = frame_number * 1_000_000
+    return FramePayload(success=True,
+                        camera_id=camera_id,
+                        number_of_frames_received=frame_number,
+                        stage_marks=[(FrameStage.GRAB_START, start_ns, CAPTURE_PROCESS_ID),
+                                     (FrameStage.GRAB_END, start_ns + 10_000, CAPTURE_PROCESS_ID),
+                                     (FrameStage.RETRIEVE_END, start_ns + 15_000, CAPTURE_PROCESS_ID),
+                                     (FrameStage.ENQUEUE, start_ns + 20_000, CAPTURE_PROCESS_ID),
+                                     (FrameStage.DEQUEUE, start_ns + 120_000, CONSUMER_PROCESS_ID)])
+
+
+def test_untraced_frames_are_left_alone():
+    clear_recorded_frame_traces()
+    frame_payload = FramePayload(success=True, camera_id="0")
+    mark_frame_stage(frame_payload, FrameStage.DISPLAY)
+    record_frame_trace(frame_payload)
+    assert frame_payload.stage_marks is None
+    assert get_recorded_frame_traces() == []
+
+
+def test_ring_buffer_keeps_the_latest_frames_and_later_stages():
+    clear_recorded_frame_traces(buffer_size=3)
+    frame_payloads = [_create_traced_frame_payload("0", frame_number) for frame_number in range(5)]
+    for frame_payload in frame_payloads:
+        record_frame_trace(frame_payload)
+    mark_frame_stage(frame_payloads[-1], FrameStage.RECORD)
+
+    frame_traces = get_recorded_frame_traces()
+    assert [frame_trace.frame_number for frame_trace in frame_traces] == [2, 3, 4]
+    assert frame_traces[-1].stage_marks[-1][0] == FrameStage.RECORD
+    clear_recorded_frame_traces(buffer_size=10_000)
+
+
+def test_chrome_trace_has_a_track_per_camera_and_process(tmp_path):
+    clear_recorded_frame_traces()
+    for camera_id in ["0", "1"]:
+        for frame_number in range(3):
+            record_frame_trace(_create_traced_frame_payload(camera_id, frame_number))
+
+    events = create_chrome_trace_events(get_recorded_frame_traces())
+    spans = [event for event in events if event["ph"] == "X"]
+    assert {span["name"] for span in spans} == {"grab", "retrieve", "enqueue", "queue"}
+    assert {(span["pid"], span["tid"]) for span in spans} == {(CAPTURE_PROCESS_ID, 0), (CAPTURE_PROCESS_ID, 1),
+                                                              (CONSUMER_PROCESS_ID, 0), (CONSUMER_PROCESS_ID, 1)}
+    queue_span = next(span for span in spans if span["name"] == "queue")
+    assert queue_span["dur"] == 100.0  # microseconds
+
+    trace_file_path = export_chrome_trace(tmp_path / "trace.json")
+    assert len(json.loads(trace_file_path.read_text())["traceEvents"]) == len(events)
+    clear_recorded_frame_traces()
@@ -0,0 +1,7 @@
+from skellycam.benchmarks.startup_benchmark import IMPORT_STATEMENTS, measure_import
+
+
+def test_core_import_does_not_load_gui_or_plotting_modules():
+    import_timing_result = measure_import(name="core", import_statement=IMPORT_STATEMENTS["core"], repeats=1)
+
+    assert import_timing_result.heavy_modules_loaded == []
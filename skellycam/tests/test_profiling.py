@@ -0,0 +1,58 @@
+import time
+import tracemalloc
+
+import pytest
+
+from skellycam.diagnostics.profiling import (
+    PROFILE_ENVIRONMENT_VARIABLE,
+    ProfilingRequest,
+    ProfilingSession,
+    get_profiling_request_from_environment,
+    parse_profile_modes,
+)
+
+
+def test_profiling_session_dumps_every_mode_when_its_window_ends(tmp_path):
+    profiling_request = ProfilingRequest(modes=["cpu", "sampling", "memory"],
+                                         duration_seconds=0.2,
+                                         output_folder_path=str(tmp_path))
+    profiling_session = ProfilingSession(role="test_loop", profiling_request=profiling_request,
+                                         camera_ids=["0", "synthetic:1?jitter_ms=2"])
+    profiling_session.start()
+    while profiling_session.check():
+        sum(number ** 2 for number in range(1000))
+        time.sleep(0.001)
+
+    file_names = sorted(path.name for path in tmp_path.iterdir())
+    assert sorted(path.name for path in profiling_session.profile_file_paths) == file_names
+    assert all(file_name.startswith("test_loop_cameras_0-synthetic1jitterms2_") for file_name in file_names)
+    assert sorted(file_name.split("_")[-1] for file_name in file_names) == [
+        "cpu.prof", "cpu.txt", "memory.tracemalloc", "memory.txt", "sampling.folded"]
+    sampling_file_path = next(path for path in profiling_session.profile_file_paths if path.suffix == ".folded")
+    assert "test_profiling_session_dumps_every_mode_when_its_window_ends" in sampling_file_path.read_text()
+
+
+def test_overlapping_sessions_each_get_a_memory_snapshot(tmp_path):
+    profiling_sessions = [ProfilingSession(role=role,
+                                           profiling_request=ProfilingRequest(modes=["memory"], duration_seconds=10,
+                                                                              output_folder_path=str(tmp_path)))
+                          for role in ["gui_frame_loop", "save_worker"]]
+    for profiling_session in profiling_sessions:
+        profiling_session.start()
+    for profiling_session in profiling_sessions:
+        profiling_session.stop()
+
+    for profiling_session in profiling_sessions:
+        assert any(path.name.endswith("memory.tracemalloc") for path in profiling_session.profile_file_paths)
+    assert not tracemalloc.is_tracing()
+
+
+def test_profile_modes_come_from_the_environment(monkeypatch):
+    monkeypatch.delenv(PROFILE_ENVIRONMENT_VARIABLE, raising=False)
+    assert get_profiling_request_from_environment() is None
+
+    monkeypatch.setenv(PROFILE_ENVIRONMENT_VARIABLE, "cpu, memory")
+    assert get_profiling_request_from_environment().modes == ["cpu", "memory"]
+
+    with pytest.raises(ValueError):
+        parse_profile_modes("cpu,gpu")
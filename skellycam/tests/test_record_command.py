@@ -0,0 +1,23 @@
+from skellycam.cli.record_command import HeadlessRecorder
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.sources.synthetic_video_capture import create_synthetic_camera_ids
+
+
+def test_a_recording_that_fails_to_start_still_closes_its_cameras(monkeypatch, tmp_path):
+    started_camera_groups = []
+    start = CameraGroup.start
+
+    def start_then_fail(camera_group: CameraGroup):
+        start(camera_group)  # the capture processes are up...
+        started_camera_groups.append(camera_group)
+        raise RuntimeError("failed partway through starting")  # ...but the rest of starting failed
+
+    monkeypatch.setattr(CameraGroup, "start", start_then_fail)
+    recording_summary = HeadlessRecorder(camera_ids=create_synthetic_camera_ids(1),
+                                         duration_seconds=1.0,
+                                         output_folder_path=str(tmp_path)).record()
+
+    assert not recording_summary.success
+    assert "failed partway through starting" in recording_summary.error
+    assert started_camera_groups[0].exit_event.is_set()
+    assert not started_camera_groups[0].is_capturing
@@ -0,0 +1,35 @@
+from skellycam.cli.recording_statistics import RecordingStatisticsTracker
+from skellycam.detection.models.frame_payload import FramePayload
+
+
+def test_recording_statistics_count_drops_and_latency():
+    statistics_tracker = RecordingStatisticsTracker(camera_ids=["0"])
+    for frame_number in [1, 2, 5, 6]:  # frames 3 and 4 never made it out of the capture process
+        statistics_tracker.add_frame(
+            FramePayload(success=True,
+                         camera_id="0",
+                         number_of_frames_received=frame_number,
+                         timestamp_ns=frame_number * 1_000_000),
+            received_timestamp_ns=frame_number * 1_000_000 + 2_000_000,
+        )
+
+    interval_statistics = statistics_tracker.get_interval_statistics()["0"]
+    total_statistics = statistics_tracker.get_total_statistics()["0"]
+
+    assert interval_statistics.frames_received == 4
+    assert interval_statistics.frames_dropped == 2
+    assert interval_statistics.p95_latency_ms == 2.0
+    assert total_statistics.frames_dropped == 2
+    assert total_statistics.mean_latency_ms == 2.0
+    assert statistics_tracker.get_interval_statistics()["0"].frames_received == 0
+
+
+def test_mean_latency_only_averages_frames_with_a_capture_timestamp():
+    statistics_tracker = RecordingStatisticsTracker(camera_ids=["0"])
+    statistics_tracker.add_frame(FramePayload(success=True, camera_id="0", timestamp_ns=1_000_000),
+                                 received_timestamp_ns=5_000_000)
+    statistics_tracker.add_frame(FramePayload(success=True, camera_id="0"), received_timestamp_ns=6_000_000)
+
+    total_statistics = statistics_tracker.get_total_statistics()["0"]
+    assert total_statistics.frames_received == 2
+    assert total_statistics.mean_latency_ms == 4.0
@@ -0,0 +1,110 @@
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from skellycam.opencv.camera.camera import Camera
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.group.strategies.strategies import Strategy
+from skellycam.opencv.sources.create_video_capture import create_video_capture
+from skellycam.opencv.sources.replay_video_capture import create_replay_camera_ids
+from skellycam.opencv.video_recorder.video_recorder import VideoRecorder
+
+
+def _create_fake_recording(synchronized_videos_folder_path: Path, first_timestamps_ns, number_of_frames=10):
+    """Videos with the same layout as `save_synchronized_videos` - frames 10 ms apart"""
+    for camera_number, first_timestamp_ns in enumerate(first_timestamps_ns):
+        video_file_path = synchronized_videos_folder_path / f"Camera_{str(camera_number).zfill(3)}_synchronized.mp4"
+        video_recorder = VideoRecorder()
+        video_recorder.save_image_list_to_disk(
+            image_list=[np.full((48, 64, 3), frame_number * 20, dtype=np.uint8) for frame_number in range(number_of_frames)],
+            path_to_save_video_file=video_file_path,
+            frames_per_second=100,
+        )
+        video_recorder._save_timestamps(
+            timestamps_npy=first_timestamp_ns + np.arange(number_of_frames) * 10_000_000,
+            video_file_save_path=video_file_path,
+        )
+
+
+def test_replay_keeps_the_recorded_timing_between_cameras(tmp_path):
+    _create_fake_recording(tmp_path, first_timestamps_ns=[5_000_000_000, 5_004_000_000])
+    start_time = time.perf_counter()
+    camera_ids = create_replay_camera_ids(tmp_path, speed=2, start_delay_seconds=0.05)
+
+    captures = [create_video_capture(camera_id, cv2.CAP_ANY) for camera_id in camera_ids]
+    replay_timestamps_ns = [[], []]
+    for _ in range(10):
+        for capture, camera_timestamps_ns in zip(captures, replay_timestamps_ns):
+            success, image = capture.read()
+            assert success and image.shape == (48, 64, 3)
+            camera_timestamps_ns.append(capture.latest_timestamp_ns)
+    elapsed_time = time.perf_counter() - start_time
+
+    assert elapsed_time >= 0.05 + 9 * 0.005  # paced, at twice the recorded speed
+    assert np.all(np.diff(replay_timestamps_ns[0]) == 5_000_000)
+    assert replay_timestamps_ns[1][0] - replay_timestamps_ns[0][0] == 2_000_000
+    assert captures[0].read() == (False, None)  # end of the recording
+
+
+def test_camera_uses_replayed_timestamps(tmp_path):
+    _create_fake_recording(tmp_path, first_timestamps_ns=[1_000_000_000])
+    camera_id = create_replay_camera_ids(tmp_path, speed=1, loop=True)[0]
+
+    camera = Camera(CameraConfig(camera_id=camera_id))
+    camera.connect()
+    frame_timestamps_ns = []
+    deadline = time.perf_counter() + 2
+    while len(frame_timestamps_ns) < 3 and time.perf_counter() < deadline:
+        if camera.new_frame_ready:
+            frame_timestamps_ns.append(camera.latest_frame.timestamp_ns)
+    camera.close()
+
+    assert len(frame_timestamps_ns) == 3
+    assert all((timestamp_ns - frame_timestamps_ns[0]) % 10_000_000 == 0 for timestamp_ns in frame_timestamps_ns)
+
+
+def test_a_replay_that_runs_out_stops_rather_than_being_reconnected(tmp_path):
+    _create_fake_recording(tmp_path, first_timestamps_ns=[1_000_000_000])
+    # anchored - the process's replay clock may already have been started (by the other tests' replays)
+    camera_id = create_replay_camera_ids(tmp_path, speed=1, loop=False, start_delay_seconds=0.3)[0]
+
+    camera = Camera(CameraConfig(camera_id=camera_id))
+    camera.connect()
+    frame_timestamps_ns = []
+    # longer than the frame deadline - a stalled camera would have been reopened (and replayed again) by now
+    deadline = time.perf_counter() + 1.5
+    while time.perf_counter() < deadline:
+        if camera.new_frame_ready:
+            frame_timestamps_ns.append(camera.latest_frame.timestamp_ns)
+        time.sleep(0.001)
+    is_capturing_frames = camera.is_capturing_frames
+    outage_updates = camera.pop_outage_updates()
+    camera.close()
+
+    assert len(frame_timestamps_ns) == 10  # the first frame included - connecting doesn't use it up
+    assert np.all(np.diff(frame_timestamps_ns) > 0)
+    assert not is_capturing_frames
+    assert outage_updates == []
+
+
+def test_each_camera_group_replays_at_the_recorded_pace(tmp_path):
+    _create_fake_recording(tmp_path, first_timestamps_ns=[1_000_000_000], number_of_frames=20)
+    camera_id = create_replay_camera_ids(tmp_path, speed=1, loop=False)[0]
+
+    for _ in range(2):  # the second group mustn't replay on the clock the first one started
+        camera_group = CameraGroup(camera_config_dictionary={camera_id: CameraConfig(camera_id=camera_id)},
+                                   strategy=Strategy.SAME_PROCESS)
+        camera_group.start()
+        delivery_times_seconds = []
+        deadline = time.perf_counter() + 1.5
+        while time.perf_counter() < deadline:
+            if camera_group.latest_frames().get(camera_id) is not None:
+                delivery_times_seconds.append(time.perf_counter())
+            time.sleep(0.001)
+        camera_group.close()
+
+        assert len(delivery_times_seconds) == 20
+        assert delivery_times_seconds[-1] - delivery_times_seconds[0] >= 0.15  # 19 frames, 10 ms apart
@@ -0,0 +1,63 @@
+from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.opencv.group.sync_quality_monitor import SyncQualityMonitor
+
+FRAME_PERIOD_NS = 33_333_333
+
+
+def _create_frame_payload(camera_id: str, timestamp_ns: float) -> FramePayload:
+    return FramePayload(success=True, camera_id=camera_id, timestamp_ns=timestamp_ns)
+
+
+def test_sync_quality_finds_the_lagging_camera():
+    sync_quality_monitor = SyncQualityMonitor(["0", "1", "2"])
+    for frame_number in range(100):
+        frame_timestamp_ns = frame_number * FRAME_PERIOD_NS
+        # camera 2's frames are 10ms behind, and camera 1 alternates 1ms early/late
+        sync_quality_monitor.add_frames({
+            "0": _create_frame_payload("0", frame_timestamp_ns),
+            "1": _create_frame_payload("1", frame_timestamp_ns + (1e6 if frame_number % 2 else -1e6)),
+            "2": _create_frame_payload("2", frame_timestamp_ns - 10e6),
+        })
+
+    sync_quality_report = sync_quality_monitor.get_report()
+    assert sync_quality_report.number_of_rounds == 100
+    assert sync_quality_report.lagging_camera_id == "2"
+    assert 10.0 <= sync_quality_report.median_skew_ms <= 11.0
+    assert sync_quality_report.max_skew_ms == 11.0
+    assert round(sync_quality_report.frame_period_ms, 1) == 33.3
+    assert round(sync_quality_report.cameras["2"].median_offset_ms) == -10
+    assert sync_quality_report.cameras["0"].frame_interval_jitter_ms < 0.01
+    assert 1.9 < sync_quality_report.cameras["1"].frame_interval_jitter_ms < 2.1
+
+
+def test_a_round_waits_for_every_camera():
+    sync_quality_monitor = SyncQualityMonitor(["0", "1"])
+    for frame_number in range(5):
+        sync_quality_monitor.add_frames({"0": _create_frame_payload("0", frame_number * FRAME_PERIOD_NS),
+                                         "1": None})
+    assert sync_quality_monitor.get_report().number_of_rounds == 0
+    assert sync_quality_monitor.get_report().median_skew_ms is None
+
+    # only camera 0's newest frame counts
+    sync_quality_monitor.add_frames({"1": _create_frame_payload("1", 4 * FRAME_PERIOD_NS + 2e6)})
+    assert sync_quality_monitor.get_report().number_of_rounds == 1
+    assert sync_quality_monitor.get_report().median_skew_ms == 2.0
+
+
+def test_grab_latency_only_counts_drivers_on_our_clock():
+    sync_quality_monitor = SyncQualityMonitor(["v4l2", "other_clock"])
+    for frame_number in range(10):
+        post_grab_timestamp_ns = 10_000_000_000 + frame_number * FRAME_PERIOD_NS
+        sync_quality_monitor.add_frames({
+            # a driver buffering two frames stale
+            "v4l2": FramePayload(timestamp_ns=post_grab_timestamp_ns,
+                                 post_grab_timestamp_ns=post_grab_timestamp_ns,
+                                 driver_timestamp_ns=post_grab_timestamp_ns - 2 * FRAME_PERIOD_NS),
+            "other_clock": FramePayload(timestamp_ns=post_grab_timestamp_ns,
+                                        post_grab_timestamp_ns=post_grab_timestamp_ns,
+                                        driver_timestamp_ns=frame_number * FRAME_PERIOD_NS),
+        })
+
+    sync_quality_report = sync_quality_monitor.get_report()
+    assert round(sync_quality_report.cameras["v4l2"].median_grab_latency_ms, 1) == 66.7
+    assert sync_quality_report.cameras["other_clock"].median_grab_latency_ms is None
@@ -0,0 +1,102 @@
+import time
+from pathlib import Path
+
+import cv2
+
+from skellycam.opencv.camera.models.camera_config import CameraConfig
+from skellycam.opencv.config.apply_config import apply_configuration
+from skellycam.opencv.group.camera_group import CameraGroup
+from skellycam.opencv.sources.create_video_capture import create_video_capture
+from skellycam.opencv.sources.synthetic_video_capture import (
+    create_synthetic_camera_id,
+    create_synthetic_camera_ids,
+    parse_synthetic_camera_id,
+)
+from skellycam.detection.models.frame_payload import FramePayload
+from skellycam.opencv.video_recorder.save_synchronized_videos import get_frame_timestamps, save_synchronized_videos
+from skellycam.opencv.video_recorder.video_recorder import VideoRecorder
+
+
+def test_synthetic_video_capture_applies_config_and_paces_frames():
+    camera_id = create_synthetic_camera_id(3, clock_offset_ms=100, drop_probability=0.0)
+    assert parse_synthetic_camera_id(camera_id).index == 3
+
+    capture = create_video_capture(camera_id, cv2.CAP_ANY)
+    apply_configuration(capture,
+                        CameraConfig(camera_id=camera_id, resolution_width=320, resolution_height=240, framerate=100))
+
+    start_time = time.perf_counter()
+    for _ in range(11):
+        success, image = capture.read()
+    elapsed_time = time.perf_counter() - start_time
+
+    assert success
+    assert image.shape == (240, 320, 3)
+    assert 0.09 <= elapsed_time < 0.5
+    assert capture.get(cv2.CAP_PROP_POS_MSEC) == 100 + capture.get(cv2.CAP_PROP_POS_FRAMES) * 10
+
+    apply_configuration(capture, CameraConfig(camera_id=camera_id, low_latency=True))
+    assert capture.get(cv2.CAP_PROP_BUFFERSIZE) == 1
+
+    capture.release()
+    assert not capture.isOpened()
+    assert capture.read() == (False, None)
+
+
+def test_camera_group_records_synchronized_videos_from_synthetic_cameras(tmp_path):
+    camera_ids = create_synthetic_camera_ids(2, jitter_ms=1)
+    camera_group = CameraGroup(camera_config_dictionary={
+        camera_id: CameraConfig(camera_id=camera_id, resolution_width=320, resolution_height=240, framerate=60)
+        for camera_id in camera_ids
+    })
+    video_recorder_dictionary = {camera_id: VideoRecorder() for camera_id in camera_ids}
+
+    camera_group.start()
+    try:
+        recording_start_time = time.perf_counter()
+        while time.perf_counter() - recording_start_time < 1.0:
+            for camera_id, frame_payload in camera_group.latest_frames().items():
+                if frame_payload is not None:
+                    video_recorder_dictionary[camera_id].append_frame_payload_to_list(frame_payload)
+    finally:
+        camera_group.close()
+
+    for video_recorder in video_recorder_dictionary.values():
+        assert video_recorder.number_of_frames > 30
+        frame_payload = video_recorder.frame_payload_list[-1]
+        assert frame_payload.pre_grab_timestamp_ns <= frame_payload.post_grab_timestamp_ns <= frame_payload.timestamp_ns
+        assert frame_payload.driver_timestamp_ns is not None
+
+    save_synchronized_videos(dictionary_of_video_recorders=video_recorder_dictionary,
+                             folder_to_save_videos=tmp_path,
+                             create_diagnostic_plots_bool=False,
+                             timestamp_attribute="driver_timestamp_ns")
+
+    assert len(list(Path(tmp_path).glob("*.mp4"))) == 2
+
+
+def test_driver_timestamps_on_a_camera_clock_are_moved_onto_the_host_clock():
+    # a camera clock 5 seconds ahead, with our post-grab reads jittering by a couple of milliseconds
+    frame_list = [FramePayload(timestamp_ns=frame_number * 33_000_000 + 9_000_000,
+                               post_grab_timestamp_ns=frame_number * 33_000_000 + jitter_ns,
+                               driver_timestamp_ns=5_000_000_000 + frame_number * 33_000_000)
+                  for frame_number, jitter_ns in enumerate([0, 2_000_000, 0, 1_000_000, 0])]
+    frame_list.append(FramePayload(timestamp_ns=5 * 33_000_000 + 9_000_000))  # no driver timestamp
+
+    timestamps = get_frame_timestamps(frame_list, "driver_timestamp_ns")
+    assert list(timestamps[:5]) == [frame_number * 33_000_000 for frame_number in range(5)]
+    assert timestamps[5] == 5 * 33_000_000 + 9_000_000
+
+
+def test_driver_timestamps_on_the_host_clock_keep_each_cameras_latency():
+    # both cameras exposed at the same moments, one just takes 20 ms longer to hand its frames over
+    timestamps_by_latency = {}
+    for grab_latency_ns in [5_000_000, 25_000_000]:
+        frame_list = [FramePayload(timestamp_ns=frame_number * 33_000_000 + grab_latency_ns + 9_000_000,
+                                   post_grab_timestamp_ns=frame_number * 33_000_000 + grab_latency_ns,
+                                   driver_timestamp_ns=frame_number * 33_000_000)
+                      for frame_number in range(5)]
+        timestamps_by_latency[grab_latency_ns] = get_frame_timestamps(frame_list, "driver_timestamp_ns")
+
+    assert list(timestamps_by_latency[5_000_000]) == [frame_number * 33_000_000 for frame_number in range(5)]
+    assert list(timestamps_by_latency[5_000_000]) == list(timestamps_by_latency[25_000_000])
@@ -0,0 +1,12 @@
+class FakeCapture:
+    """Stands in for a `cv2.VideoCapture` where only opening/releasing matters"""
+
+    def __init__(self, is_opened: bool = True):
+        self._is_opened = is_opened
+        self.released = False
+
+    def isOpened(self):
+        return self._is_opened and not self.released
+
+    def release(self):
+        self.released = True